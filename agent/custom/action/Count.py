@@ -11,6 +11,8 @@ from maa.context import Context
 from maa.custom_action import CustomAction
 import json
 
+from utils.logger import logger
+
 
 class Count(CustomAction):
     """
@@ -64,9 +66,9 @@ class Count(CustomAction):
 
             # 运行播报
             if target_count == 0 and (current_count % 10 == 0 or current_count == 1):
-                print(f"当前运行次数为{current_count}, 无限循环中...")
+                logger.info("当前运行次数为{}, 无限循环中...", current_count)
             elif (current_count % 10 == 0 or current_count == 1) and target_count > 0:
-                print(f"当前运行次数为{current_count}, 目标次数为{target_count}")
+                logger.info("当前运行次数为{}, 目标次数为{}", current_count, target_count)
 
             self._run_nodes(context, else_node)
 
@@ -74,8 +76,8 @@ class Count(CustomAction):
             self._reset_nodes(context=context, nodes=argv.node_name, reset_count=0)
 
             # 运行播报
-            print(
-                f"{argv.node_name}已达到目标次数{target_count}，执行后续节点{next_node}"
+            logger.info(
+                "{}已达到目标次数{}，执行后续节点{}", argv.node_name, target_count, next_node
             )
             self._run_nodes(context, argv_dict.get("next_node"))
 
@@ -132,7 +134,7 @@ class Count(CustomAction):
                 }
             )
             if reset_count==0:
-                print(f"\"{node}\"节点已重置count为{count}！")
+                logger.info("\"{}\"节点已重置count为{}！", node, count)
 
             # if reset_count == 0:
             #     node_custom_action_param_check = (
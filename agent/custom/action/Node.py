@@ -4,15 +4,20 @@ from maa.agent.agent_server import AgentServer
 from maa.custom_action import CustomAction
 from maa.context import Context
 
-from utils import logger
+from utils.logger import logger
+from utils.node_index import get_node_index
 
 class DisableNode(CustomAction):
     """
     将特定 node 设置为 disable 状态 。
+    支持按名称、前缀、glob、正则批量选择，所有命中节点合并为一次 override。
 
-    参数格式:
+    参数格式（以下字段均可为字符串或字符串列表，至少提供一个）:
     {
-        "node_name": "结点名称"
+        "node_name": "结点名称",
+        "prefix": "MaoXian_",
+        "glob": "MaoXian_*",
+        "regex": "^MaoXian_(Is|Find)_"
     }
     """
 
@@ -22,9 +27,24 @@ class DisableNode(CustomAction):
         argv: CustomAction.RunArg,
     ) -> CustomAction.RunResult:
 
-        node_name = json.loads(argv.custom_action_param)["node_name"]
+        param = json.loads(argv.custom_action_param)
+        node_names = param.get("node_name", [])
+        if isinstance(node_names, str):
+            node_names = [node_names]
+        patterns = {key: param.get(key) for key in ("prefix", "glob", "regex")}
+
+        # 显式给出的节点名原样保留；仅在使用模式时才需要节点索引
+        targets = list(dict.fromkeys(node_names))
+        if any(patterns.values()):
+            index = get_node_index(context.tasker.resource)
+            targets += [n for n in index.select(**patterns) if n not in node_names]
+
+        if not targets:
+            logger.warning(f"DisableNode 未匹配到任何节点: {param}")
+            return CustomAction.RunResult(success=True)
 
-        context.override_pipeline({f"{node_name}": {"enabled": False}})
+        logger.debug(f"DisableNode: {len(targets)} 个节点 {targets}")
+        context.override_pipeline({name: {"enabled": False} for name in targets})
 
         return CustomAction.RunResult(success=True)
 
@@ -8,8 +8,7 @@ import json
 from maa.context import Context
 from maa.custom_action import CustomAction
 from datetime import datetime
-from PIL import Image
-from utils import logger
+from utils.logger import logger
 
 
 class ScreenShot(CustomAction):
@@ -46,6 +45,9 @@ class ScreenShot(CustomAction):
             rgb_array = screen_array
             logger.warning("当前截图并非三通道")
 
+        # PIL 只有截图时才用到，延迟导入以缩短 agent 启动时间
+        from PIL import Image
+
         img = Image.fromarray(rgb_array)
 
         save_dir = json.loads(argv.custom_action_param)["save_dir"]
@@ -70,32 +70,13 @@ Pipeline JSON 调用示例：
 
 import json
 import time
-import logging
-import sys
 from typing import Optional, Union
 
 from maa.agent.agent_server import AgentServer
 from maa.custom_action import CustomAction
 from maa.context import Context
 
-
-def _setup_logger() -> logging.Logger:
-    log = logging.getLogger("MAAProject")
-    log.setLevel(logging.DEBUG)
-
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(logging.DEBUG)
-
-    fmt = logging.Formatter(
-        "[%(asctime)s][%(levelname)s] %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-    handler.setFormatter(fmt)
-    log.addHandler(handler)
-    return log
-
-
-logger = _setup_logger()
+from utils.logger import logger
 
 
 @AgentServer.custom_action("TraverseAndClick")
@@ -111,7 +92,7 @@ class TraverseAndClick(CustomAction):
         try:
             param: dict = json.loads(argv.custom_action_param)
         except (json.JSONDecodeError, TypeError) as e:
-            logger.error(f"[TraverseAndClick] 参数解析失败: {e}")
+            logger.error("[TraverseAndClick] 参数解析失败: {}", e)
             return CustomAction.RunResult(success=False)
 
         method: str           = param.get("method", "template")          # "template" | "ocr"
@@ -150,7 +131,7 @@ class TraverseAndClick(CustomAction):
 
         while max_rounds < 0 or round_count < max_rounds:
             round_count += 1
-            logger.info(f"[TraverseAndClick] ── 第 {round_count} 轮 ──")
+            logger.info("[TraverseAndClick] ── 第 {} 轮 ──", round_count)
 
             # 1. 截图
             img = context.tasker.controller.post_screencap().wait().get()
@@ -166,11 +147,11 @@ class TraverseAndClick(CustomAction):
                     time.sleep(round_delay)
                 continue
 
-            logger.info(f"[TraverseAndClick] 本轮匹配到 {len(matches)} 个目标")
+            logger.info("[TraverseAndClick] 本轮匹配到 {} 个目标", len(matches))
 
             # 3. 遍历每个匹配项
             for idx, (cx, cy) in enumerate(matches):
-                logger.info(f"[TraverseAndClick]   [{idx + 1}/{len(matches)}] 点击 ({cx}, {cy})")
+                logger.info("[TraverseAndClick]   [{}/{}] 点击 ({}, {})", idx + 1, len(matches), cx, cy)
 
                 # 点击匹配区域中心
                 context.tasker.controller.post_click(cx, cy).wait()
@@ -190,14 +171,14 @@ class TraverseAndClick(CustomAction):
 
             # 5. 不满足终止条件，执行 task_after_round，然后继续下一轮
             if task_after_round:
-                logger.info(f"[TraverseAndClick] 本轮结束，执行 {task_after_round}")
+                logger.info("[TraverseAndClick] 本轮结束，执行 {}", task_after_round)
                 context.run_task(task_after_round)
 
             # 6. 等待后进入下一轮
             if round_delay > 0:
                 time.sleep(round_delay)
 
-        logger.info(f"[TraverseAndClick] 共执行 {round_count} 轮，结束")
+        logger.info("[TraverseAndClick] 共执行 {} 轮，结束", round_count)
         return CustomAction.RunResult(success=True)
 
     # ────────────────────────────────────────────────────────────
@@ -225,7 +206,7 @@ class TraverseAndClick(CustomAction):
         elif method == "ocr":
             centers = self._match_ocr_all(context, img, ocr_text, threshold, roi)
         else:
-            logger.warning(f"[TraverseAndClick] 未知识别方式: {method}")
+            logger.warning("[TraverseAndClick] 未知识别方式: {}", method)
 
         return centers
 
@@ -312,7 +293,11 @@ class TraverseAndClick(CustomAction):
 
             cx = box[0] + box[2] // 2
             cy = box[1] + box[3] // 2
-            logger.debug(f"[TraverseAndClick] {kind} 命中: box={box}, score={score:.3f}, center=({cx},{cy})")
+            # 每个命中一条，参数延迟到确实输出时才格式化
+            logger.debug(
+                "[TraverseAndClick] {} 命中: box={}, score={:.3f}, center=({},{})",
+                kind, box, score, cx, cy,
+            )
             centers.append((cx, cy))
 
         return centers
@@ -14,8 +14,6 @@ Agent入口
 
 import os
 import sys
-import json
-import subprocess
 from pathlib import Path
 
 # utf-8
@@ -35,8 +33,21 @@ print(f"set cwd: {os.getcwd()}")
 if current_script_dir not in sys.path:
     sys.path.insert(0, current_script_dir)
 
+# 启动计时起点；若由虚拟环境重启而来，则沿用上一进程的起点
+from utils.startup_timer import StartupTimer
+
+startup_timer = StartupTimer()
+
+# 导入耗时统计需尽早开启，才能覆盖 loguru、maa 等模块
+from utils import import_profile
+
+if import_profile.is_requested():
+    import_profile.enable()
+
 from utils.logger import logger
 
+startup_timer.mark("bootstrap")
+
 VENV_NAME = ".venv"  # 虚拟环境目录的名称
 VENV_DIR = Path(project_root_dir) / VENV_NAME
 
@@ -70,6 +81,8 @@ def ensure_venv_and_relaunch_if_needed():
         return
 
     if not VENV_DIR.exists():
+        import subprocess
+
         logger.info(f"正在 {VENV_DIR} 创建虚拟环境...")
         try:
             # 使用当前运行此脚本的Python（系统/外部Python）
@@ -92,23 +105,6 @@ def ensure_venv_and_relaunch_if_needed():
             logger.error("无法在没有虚拟环境的情况下继续。正在退出。")
             sys.exit(1)
 
-    if sys.platform.startswith("win"):
-        python_in_venv = VENV_DIR / "Scripts" / "python.exe"
-    else:
-        python3_path = VENV_DIR / "bin" / "python3"
-        python_path = VENV_DIR / "bin" / "python"
-        if python3_path.exists():
-            python_in_venv = python3_path
-        elif python_path.exists():
-            python_in_venv = python_path
-        else:
-            python_in_venv = python3_path  # 默认使用python3，让后续错误处理捕获
-
-    if not python_in_venv.exists():
-        logger.error(f"在虚拟环境 {python_in_venv} 中未找到Python解释器。")
-        logger.error("虚拟环境创建可能失败或虚拟环境结构异常。")
-        sys.exit(1)
-
     logger.info(f"正在使用虚拟环境Python重新启动")
 
     try:
@@ -116,19 +112,13 @@ def ensure_venv_and_relaunch_if_needed():
         # sys.argv[0] may be a relative path (e.g. './../agent/main.py') which
         # resolves differently when cwd changes. Use the absolute path of
         # the currently running file (`current_file_path`) to avoid that.
-        script_abs = current_file_path
-        args = sys.argv[1:]
-        cmd = [str(python_in_venv), str(script_abs)] + args
-        logger.info(f"执行命令: {' '.join(cmd)}")
-
-        result = subprocess.run(
-            cmd,
-            cwd=os.getcwd(),
-            env=os.environ.copy(),
-            check=False,  # 不在非零退出码时抛出异常
-        )
-        # 退出时使用子进程的退出码
-        sys.exit(result.returncode)
+        from utils.venv import relaunch_in_venv
+
+        startup_timer.mark("venv_prepare")
+        startup_timer.export_env()
+
+        # POSIX 下 exec 原地替换当前进程；Windows 下以子进程方式运行并透传退出码
+        relaunch_in_venv(VENV_DIR, current_file_path, sys.argv[1:])
 
     except Exception as e:
         logger.exception(f"在虚拟环境中重新启动脚本失败: {e}")
@@ -144,6 +134,9 @@ def read_config(config_name: str, default_config: dict) -> dict:
     """
     通用配置文件读取函数
 
+    配置经 utils.config 注册表缓存，文件 mtime/size 不变时不会重复解析；
+    文件不存在时写出默认配置。
+
     Args:
         config_name: 配置文件名（不含.json后缀）
         default_config: 默认配置字典
@@ -151,30 +144,17 @@ def read_config(config_name: str, default_config: dict) -> dict:
     Returns:
         配置字典
     """
-    config_dir = Path("./config")
-    config_dir.mkdir(exist_ok=True)
-    config_path = config_dir / f"{config_name}.json"
+    from utils.config import get_config
 
-    if not config_path.exists():
-        try:
-            with open(config_path, "w", encoding="utf-8") as f:
-                json.dump(default_config, f, indent=4, ensure_ascii=False)
-        except Exception:
-            logger.debug(f"无法写入 {config_name}.json，使用默认配置")
-        return default_config
-
-    try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        logger.exception(f"读取 {config_name}.json 失败，使用默认配置")
-        return default_config
+    return get_config(config_name, default_config)
 
 
 def read_interface_version(interface_file_name="./interface.json") -> str:
     interface_path = Path(project_root_dir) / interface_file_name
     assets_interface_path = Path(project_root_dir) / "assets" / interface_file_name
 
+    from utils import jsonc
+
     target_path = None
     if interface_path.exists():
         target_path = interface_path
@@ -186,9 +166,8 @@ def read_interface_version(interface_file_name="./interface.json") -> str:
         return "unknown"
 
     try:
-        with open(target_path, "r", encoding="utf-8") as f:
-            interface_data = json.load(f)
-            return interface_data.get("version", "unknown")
+        interface_data = jsonc.load(target_path)
+        return interface_data.get("version", "unknown")
     except Exception:
         logger.exception(f"读取interface.json版本失败，文件路径：{target_path}")
         return "unknown"
@@ -199,6 +178,9 @@ def read_pip_config() -> dict:
         "enable_pip_install": True,
         "mirror": "https://pypi.tuna.tsinghua.edu.cn/simple",
         "backup_mirror": "https://mirrors.ustc.edu.cn/pypi/simple",
+        "extra_mirrors": [],
+        "mirror_probe_timeout": 3,
+        "mirror_cache_ttl": 21600,
     }
     return read_config("pip_config", default_config)
 
@@ -207,8 +189,9 @@ def read_hot_update_config() -> dict:
     """
     读取热更配置
     """
-    default_config = {"enable_hot_update": True}
-    return read_config("hot_update", default_config)
+    from utils.manifest_checker import hot_update_config
+
+    return hot_update_config()
 
 
 # -----
@@ -221,8 +204,8 @@ def find_local_wheels_dir():
     project_root = Path(project_root_dir)
     deps_dir = project_root / "deps"
 
-    if deps_dir.exists() and any(deps_dir.glob("*.whl")):
-        whl_count = len(list(deps_dir.glob("*.whl")))
+    whl_count = sum(1 for _ in deps_dir.glob("*.whl")) if deps_dir.exists() else 0
+    if whl_count:
         logger.debug(f"发现本地deps目录包含 {whl_count} 个 whl 文件")
         return deps_dir
 
@@ -231,6 +214,8 @@ def find_local_wheels_dir():
 
 
 def _run_pip_command(cmd_args: list, operation_name: str) -> bool:
+    import subprocess
+
     try:
         logger.info(f"开始 {operation_name}")
         logger.debug(f"执行命令: {' '.join(cmd_args)}")
@@ -288,6 +273,21 @@ def install_requirements(
     # 查找本地deps目录
     deps_dir = find_local_wheels_dir()
     if deps_dir:
+        from utils.wheelhouse import install_from_wheelhouse
+
+        # 有 wheelhouse 索引时直接按文件安装，跳过 pip 的依赖解析
+        result = install_from_wheelhouse(
+            deps_dir,
+            lambda args: _run_pip_command(
+                [sys.executable, "-m", "pip", *args, "--break-system-packages"],
+                "从 wheelhouse 索引安装依赖",
+            ),
+        )
+        if result:
+            return True
+        if result is False:
+            logger.warning("wheelhouse 索引安装失败，回退到 pip 解析安装")
+
         logger.debug(f"使用本地 whl 文件安装，目录: {deps_dir}")
 
         cmd = [
@@ -311,37 +311,51 @@ def install_requirements(
             logger.warning("本地deps安装失败，回退到纯在线安装")
 
     # 回退到在线安装
-    primary_mirror = pip_config.get("mirror", "") if pip_config else ""
-    backup_mirror = pip_config.get("backup_mirror", "") if pip_config else ""
-
-    if primary_mirror:
-        # 使用主镜像源，只添加一个备用源避免冲突
-        cmd = [
-            sys.executable,
-            "-m",
-            "pip",
-            "install",
-            "-U",
-            "-r",
-            str(req_path),
-            "--no-warn-script-location",
-            "--break-system-packages",
-            "-i",
-            primary_mirror,
-        ]
-
-        # 只添加一个备用源
-        if backup_mirror:
-            cmd.extend(["--extra-index-url", backup_mirror])
-            logger.info(f"使用主源 {primary_mirror} 和备用源 {backup_mirror} 安装依赖")
-        else:
-            logger.info(f"使用主源 {primary_mirror} 安装依赖")
+    mirrors = []
+    if pip_config:
+        mirrors = [pip_config.get("mirror", ""), pip_config.get("backup_mirror", "")]
+        mirrors += pip_config.get("extra_mirrors", [])
+    mirrors = [m for m in mirrors if m]
+
+    if mirrors:
+        from utils.mirror_selector import rank_mirrors, recheck_mirror
+
+        # 并发探测所有镜像源，延迟最低的优先；结果缓存在 config/ 中
+        cache_file = Path("./config") / "pip_mirror_cache.json"
+        probe_timeout = pip_config.get("mirror_probe_timeout", 3)
+        ranked = rank_mirrors(
+            mirrors,
+            cache_file,
+            ttl=pip_config.get("mirror_cache_ttl", 6 * 3600),
+            timeout=probe_timeout,
+        )
 
-        if _run_pip_command(cmd, f"从 {req_path.name} 安装依赖"):
-            return True
-        else:
-            logger.error("在线安装失败")
-            return False
+        for mirror in ranked:
+            cmd = [
+                sys.executable,
+                "-m",
+                "pip",
+                "install",
+                "-U",
+                "-r",
+                str(req_path),
+                "--no-warn-script-location",
+                "--break-system-packages",
+                "-i",
+                mirror,
+            ]
+            logger.info(f"使用镜像源 {mirror} 安装依赖")
+
+            if _run_pip_command(cmd, f"从 {req_path.name} 安装依赖"):
+                return True
+            # 只有镜像源本身不可达时才换下一个；否则换源也无济于事
+            if recheck_mirror(mirror, cache_file, probe_timeout):
+                logger.error(f"镜像源 {mirror} 可以访问，安装失败与镜像源无关")
+                return False
+            logger.warning(f"镜像源 {mirror} 不可达，尝试下一个镜像源")
+
+        logger.error("在线安装失败")
+        return False
     else:
         # 如果没有配置主镜像源，使用pip的本地全局配置
         cmd = [
@@ -371,8 +385,19 @@ def check_and_install_dependencies():
     logger.debug(f"启用 pip 安装依赖: {enable_pip_install}")
 
     if enable_pip_install:
+        from utils.dependency import is_up_to_date, record_fingerprint
+
+        req_path = Path(project_root_dir) / "requirements.txt"
+        deps_dir = find_local_wheels_dir()
+        state_file = Path("./config") / "deps_fingerprint.json"
+
+        if is_up_to_date(req_path, deps_dir, state_file):
+            logger.info("依赖未变化且已满足，跳过 pip 安装")
+            return
+
         logger.info("开始安装/更新依赖")
         if install_requirements(pip_config=pip_config):
+            record_fingerprint(req_path, deps_dir, state_file)
             logger.info("依赖检查和安装完成")
         else:
             logger.warning("依赖安装失败，程序可能无法正常运行")
@@ -405,72 +430,60 @@ def agent(is_dev_mode=False):
             if not attr_name.startswith("_"):
                 globals()[attr_name] = getattr(utils, attr_name)
 
+        startup_timer.mark("module_reload")
+
         if is_dev_mode:
             from utils.logger import change_console_level
 
             change_console_level("DEBUG")
             logger.info("开发模式：日志等级已设置为DEBUG")
 
-        # if not is_dev_mode:
-        #     # ========== 版本检查（始终执行） ==========
-        #     from utils.version_checker import check_resource_version
-
-        #     version_info = check_resource_version()
-        #     if not version_info["is_latest"]:
-        #         logger.warning("检测到资源有新版本!")
-        #         logger.warning(f"当前资源版本: {version_info['current_version']}")
-        #         logger.warning(f"最新资源版本: {version_info['latest_version']}")
-        #     elif version_info["error"]:
-        #         logger.debug(f"资源版本检查遇到问题: {version_info['error']}")
-
-        #     # ========== 热更新：基于 manifest 时间戳优化 ==========
-        #     hot_update_conf = read_hot_update_config()
-        #     if not hot_update_conf.get("enable_hot_update", True):
-        #         logger.info("已配置为跳过部分资源热更")
-        #     else:
-        #         from utils.manifest_checker import (
-        #             check_manifest_updates,
-        #             save_manifest_cache_from_result,
-        #         )
-
-        #         manifest_result = check_manifest_updates()
-
-        #         # 如果没有任何更新，跳过热更新
-        #         if manifest_result["success"] and not manifest_result["has_any_update"]:
-        #             logger.debug("资源无更新，跳过热更新")
-        #         else:
-        #             # 有更新或检查失败，执行热更新流程
-        #             updated_manifests = manifest_result.get("updated_manifests", [])
-
-        #             if updated_manifests or not manifest_result["success"]:
-        #                 from utils.resource_updater import check_and_update_resources
-
-        #                 # 只更新有变化的 manifest
-        #                 manifests = (
-        #                     updated_manifests if manifest_result["success"] else None
-        #                 )
-        #                 if manifests:
-        #                     logger.debug(f"开始更新 {len(manifests)} 个资源清单...")
-        #                 else:
-        #                     logger.debug("开始检查所有资源...")
-
-        #                 update_result = check_and_update_resources(
-        #                     resource_manifests=manifests
-        #                 )
-        #                 if update_result and update_result.get("updated_files"):
-        #                     pass
-        #                 elif update_result and update_result.get("error"):
-        #                     logger.debug(
-        #                         f"热更部分资源更新遇到问题: {update_result['error']}"
-        #                     )
-        #                 else:
-        #                     logger.debug("热更部分资源已是最新")
-        #             else:
-        #                 logger.debug("所有 manifest 无更新，跳过热更新")
-
-        #         # 检查成功后保存 manifest 缓存（无论是否有更新）
-        #         save_manifest_cache_from_result(manifest_result)
-        #     # ========== 热更新结束 ==========
+        if not is_dev_mode:
+            # ========== 热更新：基于 manifest 时间戳与文件哈希的增量更新 ==========
+            hot_update_conf = read_hot_update_config()
+            if not hot_update_conf.get("enable_hot_update", True):
+                logger.info("已配置为跳过部分资源热更")
+            elif not hot_update_conf.get("manifest_url"):
+                logger.debug("未配置 manifest_url，跳过热更新")
+            else:
+                from utils.manifest_checker import (
+                    check_manifest_updates,
+                    save_manifest_cache_from_result,
+                )
+
+                manifest_result = check_manifest_updates()
+                update_ok = manifest_result["success"]
+
+                # 如果没有任何更新，跳过热更新
+                if manifest_result["success"] and not manifest_result["has_any_update"]:
+                    logger.debug("资源无更新，跳过热更新")
+                else:
+                    from utils.resource_updater import check_and_update_resources
+
+                    # 检查成功时只更新有变化的 manifest，失败时重新检查全部资源
+                    if manifest_result["success"]:
+                        manifests = manifest_result["updated_manifests"]
+                        logger.debug(f"开始更新 {len(manifests)} 个资源清单...")
+                        update_result = check_and_update_resources(
+                            resource_manifests=manifests,
+                            manifests=manifest_result["manifests"],
+                        )
+                    else:
+                        logger.debug(f"manifest 检查遇到问题: {manifest_result['error']}")
+                        logger.debug("开始检查所有资源...")
+                        update_result = check_and_update_resources()
+
+                    if update_result.get("error"):
+                        update_ok = False
+                        logger.debug(f"热更部分资源更新遇到问题: {update_result['error']}")
+                    elif not update_result.get("updated_files"):
+                        logger.debug("热更部分资源已是最新")
+
+                # 仅在全部更新成功后保存 manifest 缓存，失败时下次仍会重新检查
+                if update_ok:
+                    save_manifest_cache_from_result(manifest_result)
+            # ========== 热更新结束 ==========
+            startup_timer.mark("hot_update")
 
         from maa.agent.agent_server import AgentServer
         from maa.toolkit import Toolkit
@@ -478,7 +491,32 @@ def agent(is_dev_mode=False):
         import custom
         import Agent_file
 
+        import_profile.report()
+        startup_timer.mark("import_custom")
+
+        from utils.supervisor import parse_socket_ids, supervise
+
+        # --supervise <socket_id>...：一次启动托管多个 MAA 实例
+        socket_ids = parse_socket_ids(sys.argv[1:])
+
+        # 开发模式下修改 custom/action/*.py 后无需重启 agent，任务之间自动重载
+        # （多实例模式下 worker 由 fork 产生，不会继承监视线程，因此不启用）
+        from utils import hot_reload
+
+        if socket_ids is None and (is_dev_mode or hot_reload.is_requested()):
+            hot_reload.install(Path(current_script_dir) / "custom" / "action")
+
+        # 每次动作执行记录 task_id / 节点 / 耗时到 debug/events，分析见 tools/query_events.py
+        from utils import events
+
+        events.instrument_actions()
+
         Toolkit.init_option("./")
+        startup_timer.mark("toolkit_init")
+
+        if socket_ids is not None:
+            startup_timer.dump(Path(project_root_dir) / "debug", dev_mode=is_dev_mode, supervise=len(socket_ids))
+            sys.exit(supervise(socket_ids, current_script_dir))
 
         if len(sys.argv) < 2:
             logger.error("缺少必要的 socket_id 参数")
@@ -488,7 +526,15 @@ def agent(is_dev_mode=False):
         logger.debug(f"socket_id: {socket_id}")
 
         AgentServer.start_up(socket_id)
+        startup_timer.mark("server_start_up")
+        startup_timer.dump(Path(project_root_dir) / "debug", dev_mode=is_dev_mode)
         logger.info("AgentServer启动")
+
+        if not is_dev_mode:
+            # 版本检查在服务启动后于后台进行，TTL 内使用缓存，不影响任务执行
+            from utils.version_checker import start_background_check
+
+            start_background_check()
         AgentServer.join()
         AgentServer.shut_down()
         logger.info("AgentServer关闭")
@@ -509,12 +555,15 @@ def agent(is_dev_mode=False):
 def main():
     current_version = read_interface_version()
     is_dev_mode = current_version == "DEBUG"
+    startup_timer.mark("read_interface")
 
     # 如果是Linux系统或开发模式，启动虚拟环境
     if sys.platform.startswith("linux") or is_dev_mode:
         ensure_venv_and_relaunch_if_needed()
+        startup_timer.mark("venv_check")
 
     check_and_install_dependencies()
+    startup_timer.mark("dependency_check")
 
     if is_dev_mode:
         os.chdir(Path("./assets"))
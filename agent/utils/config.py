@@ -0,0 +1,140 @@
+"""
+配置注册表（config/<name>.json）：
+- 每个配置文件只解析一次，之后仅在 mtime / size 变化时重新加载
+- 两次检查之间有最小间隔，动作热路径上的读取只是一次字典查找
+- 以默认配置为准做校验：缺失的键补默认值，类型不符的键回退默认值并告警
+- 文件不存在时写出默认配置，方便用户修改
+
+用法:
+    from utils.config import get_config, get_value
+
+    delay = get_value("tunables", "click_delay", 0.3)
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+
+from .logger import logger
+
+# agent/utils/config.py -> 项目根目录（开发模式下 cwd 会切到 assets，不能依赖相对路径）
+_PROJECT_DIR = Path(__file__).resolve().parent.parent.parent
+CONFIG_DIR = _PROJECT_DIR / "config"
+
+# 两次 stat 之间的最小间隔（秒）
+CHECK_INTERVAL = 1.0
+
+
+def _validate(name: str, data, defaults: dict) -> dict:
+    if not isinstance(data, dict):
+        logger.warning(f"{name}.json 顶层不是对象，使用默认配置")
+        return dict(defaults)
+
+    result = dict(defaults)
+    for key, value in data.items():
+        default = defaults.get(key)
+        if default is not None and value is not None and not _same_kind(default, value):
+            logger.warning(
+                f"{name}.json 中 {key} 的类型应为 {type(default).__name__}，"
+                f"实际为 {type(value).__name__}，使用默认值 {default!r}"
+            )
+            continue
+        result[key] = value
+    return result
+
+
+def _same_kind(default, value) -> bool:
+    # bool 是 int 的子类，需要单独区分；int 与 float 视为同一类
+    if isinstance(default, bool) or isinstance(value, bool):
+        return isinstance(default, bool) and isinstance(value, bool)
+    if isinstance(default, (int, float)):
+        return isinstance(value, (int, float))
+    return isinstance(value, type(default))
+
+
+class _Entry:
+    __slots__ = ("data", "defaults", "signature", "checked_at")
+
+    def __init__(self, defaults: dict):
+        self.data: dict = dict(defaults)
+        self.defaults = defaults
+        self.signature: tuple | None = None
+        self.checked_at = float("-inf")
+
+
+class ConfigRegistry:
+    def __init__(self, config_dir: Path = CONFIG_DIR, check_interval: float = CHECK_INTERVAL):
+        self.config_dir = Path(config_dir)
+        self.check_interval = check_interval
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, defaults: dict | None = None) -> dict:
+        """
+        返回配置字典（只读使用，不要原地修改）。
+        首次调用时传入的 defaults 会被记住，之后可省略。
+        """
+        entry = self._entries.get(name)
+        if entry is not None and time.monotonic() - entry.checked_at < self.check_interval:
+            return entry.data
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = self._entries[name] = _Entry(defaults or {})
+            elif defaults and not entry.defaults:
+                entry.defaults = defaults
+                entry.signature = None
+            self._refresh(name, entry)
+            return entry.data
+
+    def value(self, name: str, key: str, default=None):
+        return self.get(name).get(key, default)
+
+    def _refresh(self, name: str, entry: _Entry) -> None:
+        entry.checked_at = time.monotonic()
+        path = self.config_dir / f"{name}.json"
+
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            if entry.signature != ("missing",):
+                self._write_defaults(name, path, entry.defaults)
+                entry.data = dict(entry.defaults)
+                entry.signature = ("missing",)
+            return
+
+        signature = (st.st_mtime_ns, st.st_size)
+        if signature == entry.signature:
+            return
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry.data = _validate(name, json.load(f), entry.defaults)
+            logger.debug(f"已加载配置 {name}.json")
+        except Exception:
+            logger.exception(f"读取 {name}.json 失败，使用默认配置")
+            entry.data = dict(entry.defaults)
+        entry.signature = signature
+
+    def _write_defaults(self, name: str, path: Path, defaults: dict) -> None:
+        if not defaults:
+            return
+        try:
+            self.config_dir.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(defaults, f, indent=4, ensure_ascii=False)
+        except Exception:
+            logger.debug(f"无法写入 {name}.json，使用默认配置")
+
+
+registry = ConfigRegistry()
+
+
+def get_config(name: str, defaults: dict | None = None) -> dict:
+    return registry.get(name, defaults)
+
+
+def get_value(name: str, key: str, default=None):
+    return registry.value(name, key, default)
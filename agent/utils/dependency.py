@@ -0,0 +1,124 @@
+"""
+依赖指纹：
+- 指纹 = requirements.txt 内容 + deps/ 下 whl 文件列表 + 当前解释器 的哈希
+- 通过 importlib.metadata 检查已安装的分发包是否满足 requirements.txt
+- 指纹未变且已安装集合满足要求时跳过 pip，避免每次启动都拉起 pip 子进程
+"""
+
+import hashlib
+import json
+import re
+import sys
+from importlib import metadata
+from pathlib import Path
+
+from .logger import logger
+
+# name[extras] specifier ; marker
+_REQ_LINE = re.compile(
+    r"^(?P<name>[A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*(?P<spec>[^;]*?)\s*(?:;(?P<marker>.*))?$"
+)
+
+
+def _normalize(name: str) -> str:
+    """PEP 503 名称规范化。"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def compute_fingerprint(req_file: Path, deps_dir: Path | None = None) -> str:
+    """计算依赖指纹。whl 只取文件名和大小，不读取文件内容。"""
+    h = hashlib.sha256()
+    h.update(sys.executable.encode("utf-8"))
+    h.update(sys.version.encode("utf-8"))
+    h.update(req_file.read_bytes() if req_file.exists() else b"")
+    if deps_dir is not None and deps_dir.is_dir():
+        for whl in sorted(deps_dir.glob("*.whl")):
+            h.update(f"{whl.name}:{whl.stat().st_size}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def find_unsatisfied(req_file: Path) -> list[str] | None:
+    """
+    返回 requirements.txt 中未被满足的条目。
+    遇到无法在本地判断的写法（-r、URL、本地路径等）返回 None，交由 pip 处理。
+    """
+    try:
+        from packaging.markers import Marker
+        from packaging.specifiers import SpecifierSet
+    except ImportError:
+        Marker = SpecifierSet = None
+
+    unsatisfied = []
+    for raw in req_file.read_text(encoding="utf-8").splitlines():
+        line = raw.split(" #", 1)[0].strip()
+        if not line or line.startswith("#"):
+            continue
+        m = _REQ_LINE.match(line)
+        if m is None or line.startswith("-"):
+            return None
+
+        marker = (m.group("marker") or "").strip()
+        if marker and Marker is not None and not Marker(marker).evaluate():
+            continue
+
+        try:
+            installed = metadata.version(_normalize(m.group("name")))
+        except metadata.PackageNotFoundError:
+            unsatisfied.append(line)
+            continue
+
+        spec = m.group("spec").strip()
+        if not spec:
+            continue
+        if SpecifierSet is not None:
+            if not SpecifierSet(spec).contains(installed, prereleases=True):
+                unsatisfied.append(line)
+        elif spec.startswith("==") and "," not in spec:
+            if spec[2:].strip() != installed:
+                unsatisfied.append(line)
+        else:
+            # 没有 packaging 时无法比较范围约束
+            return None
+
+    return unsatisfied
+
+
+def _load_state(state_file: Path) -> dict:
+    try:
+        with open(state_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def is_up_to_date(req_file: Path, deps_dir: Path | None, state_file: Path) -> bool:
+    """指纹与上次成功安装一致，且已安装分发包满足 requirements.txt。"""
+    if not req_file.exists():
+        return False
+
+    recorded = _load_state(state_file).get(sys.executable)
+    fingerprint = compute_fingerprint(req_file, deps_dir)
+    if recorded != fingerprint:
+        logger.debug("依赖指纹已变化，需要运行 pip")
+        return False
+
+    unsatisfied = find_unsatisfied(req_file)
+    if unsatisfied is None:
+        logger.debug("requirements.txt 包含无法本地校验的条目，需要运行 pip")
+        return False
+    if unsatisfied:
+        logger.debug(f"以下依赖未满足: {unsatisfied}")
+        return False
+    return True
+
+
+def record_fingerprint(req_file: Path, deps_dir: Path | None, state_file: Path) -> None:
+    """pip 安装成功后记录当前解释器的依赖指纹。"""
+    state = _load_state(state_file)
+    state[sys.executable] = compute_fingerprint(req_file, deps_dir)
+    try:
+        state_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(state_file, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=4, ensure_ascii=False)
+    except OSError:
+        logger.debug(f"无法写入依赖指纹: {state_file}")
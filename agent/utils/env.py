@@ -1,16 +1,20 @@
 """
 环境管理工具：
 - 虚拟环境自动创建与切换（开发模式 / Linux 下生效）
-- 依赖安装（本地 whl 优先，失败后回退到镜像源）
+- 依赖安装（本地 whl 优先，失败后回退到镜像源；依赖指纹未变化时跳过）
 - 读取 interface.json 版本号判断是否为开发模式
 """
 
-import json
 import subprocess
 import sys
 from pathlib import Path
 
+from . import jsonc
+from .dependency import is_up_to_date, record_fingerprint
 from .logger import logger
+from .mirror_selector import mark_unreachable, rank_mirrors
+from .venv import relaunch_in_venv
+from .wheelhouse import install_from_wheelhouse
 
 # ── 路径常量 ──────────────────────────────────────────────────────
 _UTILS_DIR = Path(__file__).parent          # agent/utils/
@@ -54,77 +58,22 @@ _VENV_DIR    = _PROJECT_DIR / ".venv"    # .venv 建在项目根，不污染系
 _DEPS_DIR    = _AGENT_DIR / "deps"       # 打包后本地 whl 目录
 _REQ_FILE    = _PROJECT_DIR / "requirements.txt"
 _INTERFACE   = _find_interface(_PROJECT_DIR)
+_DEPS_STATE  = _PROJECT_DIR / "config" / "deps_fingerprint.json"
+_MIRROR_CACHE = _PROJECT_DIR / "config" / "pip_mirror_cache.json"
+_MIRRORS = [
+    "https://pypi.tuna.tsinghua.edu.cn/simple",
+    "https://mirrors.ustc.edu.cn/pypi/simple",
+]
 
 
 # ── 版本读取 ──────────────────────────────────────────────────────
 
-def _parse_jsonc(text: str) -> dict:
-    """
-    解析 JSONC（JSON with Comments）格式，支持：
-    - // 单行注释（包括行尾注释，如 "key": value // 注释）
-    - /* */ 块注释
-    - 尾逗号（trailing comma，如 [..., ] 或 {..., }）
-    标准 json 模块不支持以上特性，需预处理。
-    """
-    import re
-
-    # ① 用状态机逐字符扫描，正确跳过字符串内容，去除注释
-    result = []
-    i = 0
-    n = len(text)
-    while i < n:
-        c = text[i]
-
-        # 进入字符串
-        if c == '"':
-            result.append(c)
-            i += 1
-            while i < n:
-                sc = text[i]
-                result.append(sc)
-                if sc == "\\" :
-                    # 转义字符，连同下一个字符一起保留
-                    i += 1
-                    if i < n:
-                        result.append(text[i])
-                elif sc == '"':
-                    # 字符串结束
-                    break
-                i += 1
-            i += 1
-            continue
-
-        # 块注释 /* ... */
-        if text[i:i+2] == "/*":
-            i += 2
-            while i < n and text[i:i+2] != "*/":
-                i += 1
-            i += 2
-            continue
-
-        # 单行注释 //（包括行尾注释）
-        if text[i:i+2] == "//":
-            while i < n and text[i] != "\n":
-                i += 1
-            continue
-
-        result.append(c)
-        i += 1
-
-    cleaned = "".join(result)
-
-    # ② 去除尾逗号：, 后面只跟空白和 ] 或 }
-    cleaned = re.sub(r",\s*([}\]])", r"\1", cleaned)
-
-    return json.loads(cleaned)
-
-
 def read_interface_version() -> str:
     """读取 interface.json（支持 JSONC 注释和尾逗号）中的 version 字段。"""
     try:
         with open(_INTERFACE, encoding="utf-8") as f:
             raw = f.read()
-        data = _parse_jsonc(raw)
+        data = jsonc.loads(raw)
         return data.get("version", "")
     except Exception as e:
         logger.warning(f"读取 interface.json 失败: {e}")
@@ -152,22 +101,9 @@ def ensure_venv_and_relaunch_if_needed() -> None:
         logger.info(f"创建虚拟环境: {_VENV_DIR}")
         subprocess.check_call([sys.executable, "-m", "venv", str(_VENV_DIR)])
 
-    # 找到 venv 内的 python
-    if sys.platform.startswith("win"):
-        venv_python = _VENV_DIR / "Scripts" / "python.exe"
-    else:
-        venv_python = _VENV_DIR / "bin" / "python3"
-        if not venv_python.exists():
-            venv_python = _VENV_DIR / "bin" / "python"
-
-    if not venv_python.exists():
-        logger.error(f"找不到虚拟环境 Python: {venv_python}")
-        sys.exit(1)
-
     # 用 venv 的 python 重新启动，传递所有原始参数（包括 socket_id）
     logger.info("切换到虚拟环境重新启动...")
-    result = subprocess.run([str(venv_python)] + sys.argv)
-    sys.exit(result.returncode)
+    relaunch_in_venv(_VENV_DIR, sys.argv[0], sys.argv[1:])
 
 
 # ── 依赖安装 ──────────────────────────────────────────────────────
@@ -176,7 +112,7 @@ def install_requirements() -> bool:
     """
     按优先级安装依赖：
     1. agent/deps/ 目录中的本地 whl（离线优先，打包发布时使用）
-    2. 清华镜像源（在线安装）
+    2. 清华 / 中科大镜像源（在线安装，延迟低者优先）
     3. pip 全局配置（用户自定义源兜底）
 
     依赖安装到当前 Python 环境（开发模式下即 .venv，不污染系统）。
@@ -186,6 +122,11 @@ def install_requirements() -> bool:
         logger.debug(f"requirements.txt 不存在，跳过安装: {_REQ_FILE}")
         return True
 
+    # 指纹未变且已安装集合满足要求，无需再启动 pip
+    if is_up_to_date(_REQ_FILE, _DEPS_DIR, _DEPS_STATE):
+        logger.debug("依赖未变化且已满足，跳过安装")
+        return True
+
     python = sys.executable
     req    = str(_REQ_FILE)
 
@@ -198,8 +139,17 @@ def install_requirements() -> bool:
         logger.debug("pip 不可用（embed Python），跳过安装，依赖应已预装")
         return True
 
-    # 策略 1：本地 whl（打包发布场景）
+    # 策略 1：本地 whl（打包发布场景），有 wheelhouse 索引时直接按文件安装
     if _DEPS_DIR.exists() and any(_DEPS_DIR.glob("*.whl")):
+        extra = ["--break-system-packages"] if sys.platform.startswith("linux") else []
+        result = install_from_wheelhouse(
+            _DEPS_DIR,
+            lambda args: subprocess.run([python, "-m", "pip", *args, *extra]).returncode == 0,
+        )
+        if result:
+            record_fingerprint(_REQ_FILE, _DEPS_DIR, _DEPS_STATE)
+            return True
+
         logger.info("使用本地 whl 安装依赖...")
         ret = subprocess.run([
             python, "-m", "pip", "install",
@@ -210,24 +160,27 @@ def install_requirements() -> bool:
         ])
         if ret.returncode == 0:
             logger.info("本地依赖安装成功")
+            record_fingerprint(_REQ_FILE, _DEPS_DIR, _DEPS_STATE)
             return True
         logger.warning("本地 whl 安装失败，回退到镜像源")
 
-    # 策略 2：清华 + 中科大镜像源
-    logger.info("使用清华镜像源安装依赖...")
-    cmd = [
-        python, "-m", "pip", "install",
-        "-r", req,
-        "-i", "https://pypi.tuna.tsinghua.edu.cn/simple",
-        "--extra-index-url", "https://mirrors.ustc.edu.cn/pypi/simple",
-        "--no-warn-script-location",
-    ]
-    if sys.platform.startswith("linux"):
-        cmd.append("--break-system-packages")
+    # 策略 2：清华 / 中科大镜像源，并发探测后延迟最低的优先
+    for mirror in rank_mirrors(_MIRRORS, _MIRROR_CACHE):
+        logger.info(f"使用镜像源 {mirror} 安装依赖...")
+        cmd = [
+            python, "-m", "pip", "install",
+            "-r", req,
+            "-i", mirror,
+            "--no-warn-script-location",
+        ]
+        if sys.platform.startswith("linux"):
+            cmd.append("--break-system-packages")
 
-    if subprocess.run(cmd).returncode == 0:
-        logger.info("镜像源依赖安装成功")
-        return True
+        if subprocess.run(cmd).returncode == 0:
+            logger.info("镜像源依赖安装成功")
+            record_fingerprint(_REQ_FILE, _DEPS_DIR, _DEPS_STATE)
+            return True
+        mark_unreachable(mirror, _MIRROR_CACHE)
 
     # 策略 3：pip 全局配置兜底
     logger.warning("镜像源失败，使用 pip 全局配置兜底...")
@@ -237,6 +190,7 @@ def install_requirements() -> bool:
 
     if subprocess.run(cmd2).returncode == 0:
         logger.info("依赖安装成功")
+        record_fingerprint(_REQ_FILE, _DEPS_DIR, _DEPS_STATE)
         return True
 
     logger.error("依赖安装全部失败，请手动执行: pip install -r requirements.txt")
@@ -0,0 +1,223 @@
+"""
+结构化事件日志（仅依赖标准库）：
+- emit() 只把事件字典放入 SimpleQueue，序列化和写文件都在独立的写线程中完成
+- 每行一个 JSON，写入 debug/events/events-YYYY-MM-DD.jsonl；
+  每批事件用一次追加写入，多实例 worker 共用同一文件也不会出现半行
+- instrument_actions() 为已注册的自定义动作记录 task_id / 节点 / 动作名 / 耗时 / 是否成功
+- 与文本日志一样保留两周：写线程启动时删除更早的事件文件；
+  单日文件超过 MAX_FILE_BYTES 后当天不再写入（最后写一条 events_truncated）
+- 进程正常退出时由 atexit 写完剩余事件；用 os._exit 退出前需先调用 flush()
+- 设置 MAA_AGENT_EVENTS=0 关闭
+查询与统计见 tools/query_events.py。
+
+用法:
+    from utils import events
+
+    events.emit("ocr_miss", node=argv.node_name, target=text)
+    with events.timer("swipe", node=argv.node_name) as ev:
+        ...
+        ev["pages"] = pages
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+_ENV_SWITCH = "MAA_AGENT_EVENTS"
+# agent/utils/events.py -> 项目根目录（开发模式下 cwd 会切到 assets，不能依赖相对路径）
+EVENT_DIR = Path(__file__).resolve().parent.parent.parent / "debug" / "events"
+# 写线程每次最多合并写入的事件数
+BATCH_SIZE = 256
+# 与 logger 的 retention="2 weeks" 一致
+RETENTION_DAYS = 14
+MAX_FILE_BYTES = 20 * 1024 * 1024
+
+_STOP = object()
+
+
+def is_enabled() -> bool:
+    return os.environ.get(_ENV_SWITCH, "") != "0"
+
+
+class EventWriter:
+    def __init__(self, directory: Path = EVENT_DIR):
+        self.directory = Path(directory)
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_thread(self) -> queue.SimpleQueue:
+        # fork 出的 worker 不会继承写线程，按 pid 判断是否需要重新启动
+        if self._pid == os.getpid():
+            return self._queue
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.SimpleQueue()
+                self._thread = threading.Thread(target=self._loop, args=(self._queue,), name="event-writer", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+        return self._queue
+
+    def put(self, record: dict) -> None:
+        self._ensure_thread().put(record)
+
+    def prune(self) -> int:
+        """删除超过保留天数的事件文件，返回删除的数量。"""
+        cutoff = (datetime.now() - timedelta(days=RETENTION_DAYS)).strftime("%Y-%m-%d")
+        removed = 0
+        for path in self.directory.glob("events-*.jsonl"):
+            # 文件名中的日期可以直接按字符串比较
+            if path.stem[len("events-"):] < cutoff:
+                try:
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def _loop(self, q: queue.SimpleQueue) -> None:
+        pid = os.getpid()
+        self.prune()
+        while True:
+            batch = [q.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = [r for r in batch if r is not _STOP]
+            stop = len(records) != len(batch)
+            if records:
+                self._write(records, pid)
+            if stop:
+                return
+
+    def _write(self, records: list, pid: int) -> None:
+        day = datetime.fromtimestamp(records[0]["ts"]).strftime("%Y-%m-%d")
+        lines = []
+        for record in records:
+            ts = record.pop("ts")
+            line = {"time": datetime.fromtimestamp(ts).isoformat(timespec="milliseconds"), "ts": ts, "pid": pid}
+            line.update(record)
+            lines.append(json.dumps(line, ensure_ascii=False, default=str))
+        path = self.directory / f"events-{day}.jsonl"
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                size = os.fstat(fd).st_size
+                if size >= MAX_FILE_BYTES:
+                    return
+                if size + len(data) >= MAX_FILE_BYTES:
+                    # 这一批写完后当天的文件就到上限了，补一条标记说明之后的事件被丢弃
+                    marker = {"time": datetime.now().isoformat(timespec="milliseconds"), "ts": time.time(),
+                              "pid": pid, "event": "events_truncated", "max_bytes": MAX_FILE_BYTES}
+                    data += (json.dumps(marker) + "\n").encode("utf-8")
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+        except OSError:
+            # 事件日志只用于事后分析，写入失败不影响任务
+            pass
+
+    def close(self, timeout: float = 2.0) -> None:
+        """写完队列中剩余的事件后停止写线程。"""
+        if self._pid != os.getpid() or self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._pid = None
+
+
+_writer = EventWriter()
+_enabled = is_enabled()
+atexit.register(_writer.close)
+
+
+def flush(timeout: float = 2.0) -> None:
+    """写完队列中已有的事件；之后再 emit 会重新启动写线程。"""
+    _writer.close(timeout)
+
+
+def emit(event: str, **fields) -> None:
+    """记录一个事件；字段值需可被 JSON 序列化（否则按 str 写入）。"""
+    if not _enabled:
+        return
+    fields["ts"] = time.time()
+    fields["event"] = event
+    _writer.put(fields)
+
+
+@contextmanager
+def timer(event: str, **fields):
+    """
+    记录一段代码的耗时（duration_ms）和是否正常结束（ok）。
+    with 块内可以往返回的字典里补充字段。
+    """
+    start = time.perf_counter()
+    ok = False
+    try:
+        yield fields
+        ok = True
+    finally:
+        emit(event, duration_ms=round((time.perf_counter() - start) * 1000, 3), ok=ok, **fields)
+
+
+def _result_success(result) -> bool:
+    return bool(getattr(result, "success", result))
+
+
+def instrument_actions() -> int:
+    """
+    把 AgentServer 中已注册的动作换成计时代理，每次执行记录一条 action 事件。
+    需在 hot_reload.install 之后、AgentServer.start_up 之前调用，返回包装的动作数。
+    """
+    if not _enabled:
+        return 0
+
+    from maa.agent.agent_server import AgentServer
+    from maa.custom_action import CustomAction
+
+    class TimedAction(CustomAction):
+        event_timed = True
+
+        def __init__(self, name: str, target):
+            super().__init__()
+            self.name = name
+            self.target = target
+
+        def run(self, context, argv):
+            start = time.perf_counter()
+            success = False
+            try:
+                result = self.target.run(context, argv)
+                success = _result_success(result)
+                return result
+            finally:
+                task_detail = getattr(argv, "task_detail", None)
+                emit(
+                    "action",
+                    task_id=getattr(task_detail, "task_id", None),
+                    entry=getattr(task_detail, "entry", None),
+                    node=argv.node_name,
+                    action=self.name,
+                    duration_ms=round((time.perf_counter() - start) * 1000, 3),
+                    success=success,
+                )
+
+    count = 0
+    for name, action in list(AgentServer._custom_action_holder.items()):
+        if getattr(action, "event_timed", False):
+            continue
+        AgentServer.register_custom_action(name, TimedAction(name, action))
+        count += 1
+    return count
@@ -0,0 +1,172 @@
+"""
+自定义动作热重载（开发模式或设置 MAA_AGENT_HOT_RELOAD=1 时启用）：
+- 启动前把 AgentServer 中已注册的动作替换为代理，代理把 run 转发给当前实现
+- 后台线程轮询 custom/action/*.py 的 mtime，有变化时 importlib.reload 对应模块
+- 等到没有动作正在执行（任务之间）才切换实现，执行中的动作不受影响
+- 重载失败（语法错误等）时保留旧实现，文件再次修改后重试
+
+只处理 Python 动作代码；pipeline 资源由 MAA 客户端加载，仍需在客户端侧重新加载。
+"""
+
+import importlib
+import os
+import sys
+import threading
+from pathlib import Path
+
+from .logger import logger
+
+_ENV_SWITCH = "MAA_AGENT_HOT_RELOAD"
+POLL_INTERVAL = 1.0
+
+_reloader = None
+
+
+def is_requested() -> bool:
+    return os.environ.get(_ENV_SWITCH, "") not in ("", "0")
+
+
+def _action_base(cls: type, package: str) -> type | None:
+    """找到类继承链中第一个定义在被监视包里的类（Agent_file 中的注册类只是它的空子类）。"""
+    for klass in cls.__mro__:
+        if klass.__module__.startswith(package + "."):
+            return klass
+    return None
+
+
+class _Gate:
+    """统计正在执行的动作数，供重载线程等待空闲。"""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.active = 0
+
+    def __enter__(self):
+        with self.cond:
+            self.active += 1
+
+    def __exit__(self, *exc):
+        with self.cond:
+            self.active -= 1
+            if self.active == 0:
+                self.cond.notify_all()
+
+
+class Reloader:
+    def __init__(self, action_dir: Path, package: str = "custom.action", interval: float = POLL_INTERVAL):
+        self.action_dir = Path(action_dir)
+        self.package = package
+        self.interval = interval
+        self.gate = _Gate()
+        # 注册名 -> 代理
+        self.proxies: dict = {}
+        self._mtimes = self._scan()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _scan(self) -> dict[str, int]:
+        mtimes = {}
+        for path in self.action_dir.glob("*.py"):
+            try:
+                mtimes[path.stem] = path.stat().st_mtime_ns
+            except OSError:
+                continue
+        return mtimes
+
+    def wrap_registered(self) -> int:
+        """把 AgentServer 中已注册的动作换成代理，需在 AgentServer.start_up 之前调用。"""
+        from maa.agent.agent_server import AgentServer
+        from maa.custom_action import CustomAction
+
+        gate = self.gate
+
+        class ReloadableAction(CustomAction):
+            def __init__(self, name: str, target):
+                super().__init__()
+                self.name = name
+                self.target = target
+
+            def run(self, context, argv):
+                with gate:
+                    return self.target.run(context, argv)
+
+        for name, action in list(AgentServer._custom_action_holder.items()):
+            if isinstance(action, ReloadableAction):
+                continue
+            if _action_base(type(action), self.package) is None:
+                continue
+            proxy = ReloadableAction(name, action)
+            AgentServer.register_custom_action(name, proxy)
+            self.proxies[name] = proxy
+        return len(self.proxies)
+
+    def _reload(self, stems: list[str]) -> None:
+        # 持有条件变量期间新的动作会短暂等待，保证切换发生在两次执行之间
+        with self.gate.cond:
+            while self.gate.active:
+                self.gate.cond.wait()
+
+            for stem in stems:
+                module_name = f"{self.package}.{stem}"
+                module = sys.modules.get(module_name)
+                if module is None:
+                    continue
+                try:
+                    module = importlib.reload(module)
+                except Exception:
+                    logger.exception(f"重载 {module_name} 失败，继续使用旧实现")
+                    continue
+
+                for name, proxy in self.proxies.items():
+                    cls = type(proxy.target)
+                    base = _action_base(cls, self.package)
+                    if base is None or base.__module__ != module_name:
+                        continue
+                    new_base = getattr(module, base.__name__, None)
+                    if new_base is None:
+                        logger.warning(f"{module_name} 中已不存在 {base.__name__}，{name} 保持旧实现")
+                        continue
+                    try:
+                        new_cls = new_base if cls is base else type(cls.__name__, (new_base,), {})
+                        proxy.target = new_cls()
+                    except Exception:
+                        logger.exception(f"实例化 {new_base.__name__} 失败，{name} 保持旧实现")
+                        continue
+                    logger.info(f"已热重载自定义动作 {name} ({module_name})")
+
+    def poll(self) -> None:
+        mtimes = self._scan()
+        changed = [stem for stem, mtime in mtimes.items() if self._mtimes.get(stem) != mtime]
+        self._mtimes = mtimes
+        if changed:
+            self._reload(changed)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("热重载检查失败")
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="action-hot-reload", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def install(action_dir: Path, interval: float = POLL_INTERVAL) -> Reloader | None:
+    """包装已注册动作并启动监视线程，返回 Reloader；没有可重载的动作时返回 None。"""
+    global _reloader
+    if _reloader is not None:
+        return _reloader
+
+    reloader = Reloader(action_dir, interval=interval)
+    count = reloader.wrap_registered()
+    if not count:
+        return None
+    reloader.start()
+    _reloader = reloader
+    logger.info(f"自定义动作热重载已启用，监视 {action_dir}（{count} 个动作）")
+    return reloader
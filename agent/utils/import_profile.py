@@ -0,0 +1,117 @@
+"""
+导入耗时统计（仅依赖标准库）：
+- 设置环境变量 MAA_AGENT_IMPORT_PROFILE=1 后，在入口处调用 enable() 开始记录
+- 记录每个模块首次导入的累计耗时与自身耗时（去掉其内部再导入的子模块）
+- report() 把结果按累计耗时排序写入 debug/import_time.log
+- 设置 MAA_AGENT_IMPORT_BUDGET_MS 后，总导入耗时超出预算会给出警告
+
+与 python -X importtime 相比，不需要改动 MAA 拉起 agent 的命令行参数。
+"""
+
+import builtins
+import os
+import sys
+import threading
+import time
+from importlib.util import resolve_name
+from pathlib import Path
+
+_ENV_SWITCH = "MAA_AGENT_IMPORT_PROFILE"
+_ENV_BUDGET = "MAA_AGENT_IMPORT_BUDGET_MS"
+
+_original_import = builtins.__import__
+_local = threading.local()
+# 模块名 -> [累计耗时 ns, 自身耗时 ns, 导入深度]
+_records: dict[str, list[int]] = {}
+_enabled_at: float | None = None
+
+
+def is_requested() -> bool:
+    return os.environ.get(_ENV_SWITCH, "") not in ("", "0")
+
+
+def _absolute_name(name: str, globals_, level: int) -> str:
+    if level == 0:
+        return name
+    package = (globals_ or {}).get("__package__") or ""
+    try:
+        return resolve_name("." * level + name, package)
+    except (ImportError, ValueError):
+        return name
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    fullname = _absolute_name(name, globals, level)
+    if fullname in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+
+    # stack 中每一项记录当前正在导入模块的子模块耗时之和
+    stack.append(0)
+    start = time.perf_counter_ns()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter_ns() - start
+        children = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        if fullname not in _records:
+            _records[fullname] = [elapsed, elapsed - children, len(stack)]
+
+
+def enable() -> None:
+    """开始记录导入耗时。重复调用无副作用。"""
+    global _enabled_at
+    if builtins.__import__ is _timed_import:
+        return
+    _enabled_at = time.perf_counter()
+    builtins.__import__ = _timed_import
+
+
+def disable() -> None:
+    if builtins.__import__ is _timed_import:
+        builtins.__import__ = _original_import
+
+
+def report(log_dir: str = "debug", top: int = 40) -> float:
+    """
+    停止记录并输出报告，返回所有顶层导入的累计耗时（毫秒）。
+    未调用过 enable() 时直接返回 0。
+    """
+    if _enabled_at is None:
+        return 0.0
+    disable()
+
+    total_ms = sum(cum for cum, _, depth in _records.values() if depth == 0) / 1e6
+    rows = sorted(_records.items(), key=lambda item: item[1][0], reverse=True)
+
+    lines = [
+        f"# 导入统计: {len(_records)} 个模块, 顶层累计 {total_ms:.1f} ms",
+        f"{'cumulative_ms':>14} {'self_ms':>10}  module",
+    ]
+    for name, (cum, own, depth) in rows[:top]:
+        lines.append(f"{cum / 1e6:>14.2f} {own / 1e6:>10.2f}  {'  ' * depth}{name}")
+
+    try:
+        Path(log_dir).mkdir(parents=True, exist_ok=True)
+        with open(Path(log_dir) / "import_time.log", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+    except OSError:
+        pass
+
+    from .logger import logger
+
+    logger.info(f"导入耗时 {total_ms:.1f} ms，详情见 {log_dir}/import_time.log")
+    budget = os.environ.get(_ENV_BUDGET, "")
+    if budget:
+        try:
+            if total_ms > float(budget):
+                slowest = ", ".join(f"{n}={c / 1e6:.0f}ms" for n, (c, _, _) in rows[:5])
+                logger.warning(f"导入耗时 {total_ms:.1f} ms 超出预算 {budget} ms: {slowest}")
+        except ValueError:
+            logger.warning(f"{_ENV_BUDGET} 不是有效数字: {budget}")
+    return total_ms
@@ -0,0 +1,233 @@
+"""
+JSONC（JSON with Comments）解析，仅依赖标准库，agent 与 tools 共用：
+- 支持 // 行注释、/* */ 块注释和尾逗号（[..., ] / {..., }）
+- 先用一次正则搜索判断是否含注释 / 尾逗号，不含时直接交给 json 模块（大部分 pipeline 文件）
+- 含有时用一条正则整体扫描字符串、注释和尾逗号，不做逐字符的 Python 循环
+- 字符串内容原样保留，其中的 //、/*、' 和 # 不会被误判
+- 块注释中的换行会保留，解析出错时报告的行号与原文件一致
+
+解析缓存（默认关闭，单个文件只能省下约 0.1 ms，agent 启动时不值得往安装目录写缓存）：
+- load() / loads() 传 cache=True 时先查磁盘缓存，以内容哈希 + PARSER_VERSION + object_pairs_hook 为键，
+  命中时直接反序列化 pickle，不再做注释处理和 JSON 解析
+- 缓存目录默认为项目根的 .cache/jsonc，可用 MAA_JSONC_CACHE_DIR 指定，
+  MAA_JSONC_CACHE=0 关闭；缓存损坏或不可写时自动回退为直接解析
+- cached() 供 jsonc_cst 等其他解析器复用同一缓存目录
+- 条目超过 MAX_CACHE_ENTRIES 时按最近使用时间删除较旧的条目
+- 缓存是 pickle，读取即可执行任意代码：MAA_JSONC_CACHE_DIR 只能指向仅当前用户可写的目录
+
+用法:
+    from utils import jsonc
+
+    data = jsonc.load("assets/interface.json")
+    data = jsonc.loads(text, object_pairs_hook=OrderedDict)
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import re
+from pathlib import Path
+
+# 注释 / 尾逗号规则变化时递增，解析缓存以此区分新旧结果
+PARSER_VERSION = 2
+
+_CACHE_SWITCH = "MAA_JSONC_CACHE"
+_CACHE_DIR_ENV = "MAA_JSONC_CACHE_DIR"
+# agent/utils/jsonc.py -> 项目根目录
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent.parent / ".cache" / "jsonc"
+# 超过这个数量时清理到 3/4，文件每改一次就会留下一个旧条目
+MAX_CACHE_ENTRIES = 512
+
+# 注释的匹配方式唯一：行注释必须吃到行尾，块注释只能结束在第一个 */。
+# 否则下面 _TAIL 前瞻失败时会回溯到注释内部，把注释里的 ] / } 当成尾逗号的结束
+_COMMENT = r"//[^\n]*(?![^\n])|/\*[^*]*\*+(?:[^/*][^*]*\*+)*/"
+# 尾逗号之后直到 ] 或 } 的部分（中间可以有空白和注释）
+_TAIL = rf"(?:\s|{_COMMENT})*[\]}}]"
+_TOKENS = re.compile(
+    rf"""
+    # 原样保留的片段：普通字符、完整字符串、非注释的 /、非尾逗号的 ,
+    (?P<plain>(?:[^"/,]|"[^"\\]*(?:\\.[^"\\]*)*"|/(?![/*])|,(?!{_TAIL}))+)
+    |(?P<comment>{_COMMENT})
+    |,(?P<tail>{_TAIL})
+    """,
+    re.VERBOSE,
+)
+# 可能需要处理的位置；搜索不到则文本已是标准 JSON（字符串里的 // 只会多走一次完整扫描）
+_MAYBE_JSONC = re.compile(r"/[/*]|,\s*[\]}]")
+
+
+def _replace(match: re.Match) -> str:
+    plain = match.group("plain")
+    if plain is not None:
+        return plain
+    comment = match.group("comment")
+    if comment is not None:
+        # 块注释只保留换行，单行注释整体去掉
+        return "\n" * comment.count("\n")
+    # 尾逗号：去掉逗号，其后的注释同样去掉
+    return _TOKENS.sub(_replace, match.group("tail"))
+
+
+def strip(text: str) -> str:
+    """去掉注释和尾逗号，返回标准 JSON 文本。"""
+    if text.startswith("\ufeff"):
+        text = text[1:]
+    if _MAYBE_JSONC.search(text) is None:
+        return text
+    return _TOKENS.sub(_replace, text)
+
+
+def cache_dir() -> Path | None:
+    """当前使用的缓存目录，缓存关闭时返回 None。"""
+    if os.environ.get(_CACHE_SWITCH, "") == "0":
+        return None
+    return Path(os.environ.get(_CACHE_DIR_ENV) or DEFAULT_CACHE_DIR)
+
+
+def _cache_path(raw: bytes, kwargs: dict) -> Path | None:
+    directory = cache_dir()
+    if directory is None:
+        return None
+    # 只缓存默认解析和 object_pairs_hook 为类（dict / OrderedDict）的结果，其他参数无法可靠地作为键
+    hook = kwargs.get("object_pairs_hook")
+    if set(kwargs) - {"object_pairs_hook"} or not (hook is None or isinstance(hook, type)):
+        return None
+    hook_name = "" if hook is None else f"{hook.__module__}.{hook.__qualname__}"
+    return _entry_path(directory, raw, f"{PARSER_VERSION}\0{hook_name}")
+
+
+def _entry_path(directory: Path, raw: bytes, tag: str) -> Path:
+    digest = hashlib.blake2b(raw, digest_size=20)
+    digest.update(f"\0{tag}".encode())
+    return directory / f"{digest.hexdigest()}.pickle"
+
+
+def _read_cache(path: Path):
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+    except FileNotFoundError:
+        return False, None
+    except Exception:
+        # 缓存文件损坏（如写入中断），当作未命中，之后会被覆盖
+        return False, None
+    try:
+        # 以 mtime 作为最近使用时间，清理时保留常用的条目
+        os.utime(path)
+    except OSError:
+        pass
+    return True, data
+
+
+def _write_cache(path: Path, data) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return
+    _prune(path.parent)
+
+
+def _prune(directory: Path, limit: int | None = None) -> int:
+    """条目超过 limit 时删除最久未使用的，直到剩下 limit 的 3/4，返回删除的数量。"""
+    limit = MAX_CACHE_ENTRIES if limit is None else limit
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return 0
+    entries = [e for e in entries if e.name.endswith(".pickle")]
+    if len(entries) <= limit:
+        return 0
+
+    def mtime(entry):
+        try:
+            return entry.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    entries.sort(key=mtime)
+    removed = 0
+    for entry in entries[: len(entries) - limit * 3 // 4]:
+        try:
+            os.unlink(entry.path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def _cached_loads(text: str, raw: bytes, kwargs: dict):
+    path = _cache_path(raw, kwargs)
+    if path is None:
+        return json.loads(strip(text), **kwargs)
+    hit, data = _read_cache(path)
+    if hit:
+        return data
+    data = json.loads(strip(text), **kwargs)
+    _write_cache(path, data)
+    return data
+
+
+def cached(raw: bytes, tag: str, build):
+    """
+    其他解析器共用的缓存入口（如 jsonc_cst.parse）：以 raw 的内容哈希 + tag 为键，
+    未命中时调用 build() 并写入缓存。tag 需包含该解析器的版本号。
+    """
+    directory = cache_dir()
+    if directory is None:
+        return build()
+    path = _entry_path(directory, raw, tag)
+    hit, data = _read_cache(path)
+    if hit:
+        return data
+    data = build()
+    _write_cache(path, data)
+    return data
+
+
+def loads(text: str, cache: bool = False, **kwargs):
+    """
+    解析 JSONC 文本，kwargs 透传给 json.loads（如 object_pairs_hook）。
+    cache=True 时按文本内容查询 / 写入解析缓存。
+    """
+    if not cache:
+        return json.loads(strip(text), **kwargs)
+    return _cached_loads(text, text.encode("utf-8"), kwargs)
+
+
+def load(fp, encoding: str = "utf-8", cache: bool = False, **kwargs):
+    """
+    解析 JSONC 文件，fp 可以是路径或已打开的文本文件对象。
+    cache=True 时使用解析缓存，返回的对象每次都是新的副本，可以放心修改。
+    """
+    if hasattr(fp, "read"):
+        return loads(fp.read(), cache=cache, **kwargs)
+    with open(fp, "rb") as f:
+        raw = f.read()
+    text = raw.decode(encoding)
+    if not cache:
+        return json.loads(strip(text), **kwargs)
+    return _cached_loads(text, raw, kwargs)
+
+
+def clear_cache() -> int:
+    """删除缓存目录中的所有条目，返回删除的数量。"""
+    directory = cache_dir()
+    removed = 0
+    if directory is None or not directory.is_dir():
+        return removed
+    for entry in directory.glob("*.pickle"):
+        try:
+            entry.unlink()
+            removed += 1
+        except OSError:
+            pass
+    return removed
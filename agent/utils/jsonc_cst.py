@@ -0,0 +1,442 @@
+"""
+无损 JSONC 具体语法树（CST），仅依赖标准库：
+- 一次正则分词 + 递归下降解析，保留注释、空白、键顺序和尾逗号
+- dumps(parse(text)) == text，序列化只是按顺序拼接片段，O(n)
+- 支持就地修改：替换值、插入 / 删除成员，未改动的部分原样输出
+
+空白和注释（trivia）的归属：
+- 成员 / 元素之前的 trivia 记在 before，其中的整行注释即“写在该键之前的注释”
+- 值之后、逗号之后直到行尾的 trivia 记在 after_value / trail（行尾注释跟随该成员）
+- 最后一个成员之后到 } / ] 之前的 trivia 记在容器的 end
+
+用法:
+    from utils import jsonc_cst
+
+    doc = jsonc_cst.parse(text)                # 批量工具可传 cache=True 使用磁盘解析缓存
+    node = doc.value["SomeNode"]               # Object
+    node.set("next", '["A", "B"]')            # 以 JSONC 文本替换值
+    node.remove("is_sub")
+    text = doc.dumps()
+"""
+
+import json
+import re
+
+# (前导空白与注释, 记号)；记号为字符串、标点、字面量，或在文本末尾为空串
+_TOKEN = re.compile(
+    r"""
+    (\s*(?:(?://[^\n]*|/\*[\s\S]*?\*/)\s*)*)
+    ("[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]:,]|[^\s{}\[\]:,"/]+|$)
+    """,
+    re.VERBOSE,
+)
+_COMMENT = re.compile(r"//[^\n]*|/\*[\s\S]*?\*/")
+_LITERALS = {"true": True, "false": False, "null": None}
+# 语法树结构或分词规则变化时递增，使缓存中旧的 Document 失效
+CST_VERSION = 1
+_TRIVIA = re.compile(r"\s*(?:(?://[^\n]*|/\*[\s\S]*?\*/)\s*)*")
+
+
+class JSONCSyntaxError(ValueError):
+    def __init__(self, message: str, text: str, pos: int):
+        line = text.count("\n", 0, pos) + 1
+        column = pos - text.rfind("\n", 0, pos)
+        super().__init__(f"{message}: line {line} column {column} (char {pos})")
+        self.pos = pos
+        self.lineno = line
+        self.colno = column
+
+
+def _split_line(trivia: str) -> tuple[str, str]:
+    """把 trivia 拆成 (行尾部分, 从换行开始的其余部分)。"""
+    newline = trivia.find("\n")
+    if newline < 0:
+        return trivia, ""
+    return trivia[:newline], trivia[newline:]
+
+
+def line_comments(trivia: str) -> list[str]:
+    """trivia 中独占一行的注释（不含行尾注释），按原顺序返回。"""
+    result = []
+    for match in _COMMENT.finditer(trivia):
+        line_start = trivia.rfind("\n", 0, match.start())
+        if line_start >= 0 and not trivia[line_start + 1 : match.start()].strip():
+            result.append(match.group())
+    return result
+
+
+def indent_of(trivia: str) -> str:
+    """trivia 最后一行的缩进。"""
+    return trivia[trivia.rfind("\n") + 1 :] if "\n" in trivia else ""
+
+
+# -----
+# region 节点
+# -----
+
+
+class Scalar:
+    """字符串 / 数字 / true / false / null，保留原始文本。"""
+
+    __slots__ = ("raw",)
+
+    def __init__(self, raw: str):
+        self.raw = raw
+
+    def to_python(self):
+        raw = self.raw
+        # 常见情况直接转换，避免每个标量都调用一次 json.loads
+        if raw[0] == '"':
+            return raw[1:-1] if "\\" not in raw else json.loads(raw)
+        if raw in _LITERALS:
+            return _LITERALS[raw]
+        return json.loads(raw)
+
+    def _emit(self, out: list) -> None:
+        out.append(self.raw)
+
+
+class Item:
+    """数组元素：before + value + after_value + [,] + trail。"""
+
+    __slots__ = ("before", "value", "after_value", "comma", "trail")
+
+    def __init__(self, value, before: str = "", after_value: str = "", comma: bool = False, trail: str = ""):
+        self.before = before
+        self.value = value
+        self.after_value = after_value
+        self.comma = comma
+        self.trail = trail
+
+    def comments(self) -> list[str]:
+        return line_comments(self.before)
+
+    def _emit_tail(self, out: list) -> None:
+        self.value._emit(out)
+        out.append(self.after_value)
+        if self.comma:
+            out.append(",")
+        out.append(self.trail)
+
+    def _emit(self, out: list) -> None:
+        out.append(self.before)
+        self._emit_tail(out)
+
+
+class Member(Item):
+    """对象成员：before + "key" + after_key + : + before_value + value + ..."""
+
+    __slots__ = ("key_raw", "key", "after_key", "before_value")
+
+    def __init__(self, key_raw: str, value, before: str = "", after_key: str = "", before_value: str = " "):
+        # 解析时大量创建，直接赋值而不经过 Item.__init__
+        self.before = before
+        self.value = value
+        self.after_value = ""
+        self.comma = False
+        self.trail = ""
+        self.key_raw = key_raw
+        self.key = json.loads(key_raw)
+        self.after_key = after_key
+        self.before_value = before_value
+
+    def _emit(self, out: list) -> None:
+        out.append(self.before)
+        out.append(self.key_raw)
+        out.append(self.after_key)
+        out.append(":")
+        out.append(self.before_value)
+        self._emit_tail(out)
+
+
+class _Container:
+    __slots__ = ("children", "end")
+    _open = _close = ""
+
+    def __init__(self, children=None, end: str = ""):
+        self.children = children if children is not None else []
+        self.end = end
+
+    def __len__(self) -> int:
+        return len(self.children)
+
+    def _emit(self, out: list) -> None:
+        out.append(self._open)
+        for child in self.children:
+            child._emit(out)
+        out.append(self.end)
+        out.append(self._close)
+
+    def child_indent(self) -> str:
+        """子节点所在行的缩进，单行容器返回空串。"""
+        for child in self.children:
+            if "\n" in child.before:
+                return indent_of(child.before)
+        return ""
+
+    def _insert(self, index: int, child) -> None:
+        """插入子节点，并按同级的缩进 / 逗号风格补齐格式。"""
+        children = self.children
+        index = max(0, min(index, len(children)))
+        if not child.before:
+            indent = self.child_indent()
+            if indent or "\n" in self.end:
+                child.before = f"\n{indent}"
+            elif index > 0:
+                child.before = " "
+            elif children and not children[0].before:
+                children[0].before = " "
+        if index < len(children):
+            child.comma = True
+        elif children:
+            last = children[-1]
+            # 沿用原有的尾逗号风格
+            child.comma = last.comma
+            if not last.comma:
+                last.comma = True
+                # 原最后一个成员的行尾注释需要跟在逗号之后
+                last.trail, last.after_value = last.after_value + last.trail, ""
+        children.insert(index, child)
+
+    def _remove(self, index: int):
+        children = self.children
+        child = children.pop(index)
+        if index == len(children) and children and not child.comma:
+            # 删除的是最后一个成员：前一个成员不能留下多余的逗号
+            children[-1].comma = False
+        return child
+
+
+class Object(_Container):
+    __slots__ = ()
+    _open, _close = "{", "}"
+
+    def keys(self) -> list[str]:
+        return [m.key for m in self.children]
+
+    def index(self, key: str) -> int:
+        for i, member in enumerate(self.children):
+            if member.key == key:
+                return i
+        return -1
+
+    def member(self, key: str) -> Member | None:
+        i = self.index(key)
+        return self.children[i] if i >= 0 else None
+
+    def __contains__(self, key: str) -> bool:
+        return self.index(key) >= 0
+
+    def __getitem__(self, key: str):
+        member = self.member(key)
+        if member is None:
+            raise KeyError(key)
+        return member.value
+
+    def items(self):
+        return [(m.key, m.value) for m in self.children]
+
+    def set(self, key: str, value, index: int | None = None) -> Member:
+        """
+        设置成员的值。value 可以是节点或 JSONC 文本。
+        键已存在时只替换值（保留前后的注释与空白），否则插入到 index（默认末尾）。
+        """
+        node = value if isinstance(value, (Scalar, _Container)) else parse_value(value)
+        member = self.member(key)
+        if member is not None:
+            member.value = node
+            return member
+        member = Member(json.dumps(key, ensure_ascii=False), node)
+        self._insert(len(self.children) if index is None else index, member)
+        return member
+
+    def remove(self, key: str, keep_comments: bool = False) -> Member | None:
+        """删除成员；keep_comments=True 时写在该成员之前的整行注释留给下一个成员。"""
+        i = self.index(key)
+        if i < 0:
+            return None
+        member = self._remove(i)
+        if keep_comments and member.comments():
+            lead = member.before[: member.before.rfind("\n")]
+            if i < len(self.children):
+                self.children[i].before = lead + self.children[i].before
+            else:
+                self.end = lead + self.end
+        return member
+
+    def to_python(self, object_pairs_hook=dict):
+        return object_pairs_hook((m.key, _to_python(m.value, object_pairs_hook)) for m in self.children)
+
+
+class Array(_Container):
+    __slots__ = ()
+    _open, _close = "[", "]"
+
+    def __getitem__(self, index: int):
+        return self.children[index].value
+
+    def values(self) -> list:
+        return [item.value for item in self.children]
+
+    def insert(self, index: int, value) -> Item:
+        node = value if isinstance(value, (Scalar, _Container)) else parse_value(value)
+        item = Item(node)
+        self._insert(index, item)
+        return item
+
+    def append(self, value) -> Item:
+        return self.insert(len(self.children), value)
+
+    def remove_at(self, index: int) -> Item:
+        return self._remove(index)
+
+    def to_python(self, object_pairs_hook=dict):
+        return [_to_python(item.value, object_pairs_hook) for item in self.children]
+
+
+def _to_python(node, object_pairs_hook=dict):
+    if isinstance(node, Scalar):
+        return node.to_python()
+    return node.to_python(object_pairs_hook)
+
+
+def to_python(node, object_pairs_hook=dict):
+    """把任意节点（Scalar / Object / Array）转换为 Python 对象。"""
+    return _to_python(node, object_pairs_hook)
+
+
+class Document:
+    """整个文件：before + value + after。"""
+
+    __slots__ = ("before", "value", "after")
+
+    def __init__(self, value, before: str = "", after: str = ""):
+        self.before = before
+        self.value = value
+        self.after = after
+
+    def dumps(self) -> str:
+        out = [self.before]
+        self.value._emit(out)
+        out.append(self.after)
+        return "".join(out)
+
+    def to_python(self, object_pairs_hook=dict):
+        return _to_python(self.value, object_pairs_hook)
+
+
+# -----
+# region 解析
+# -----
+
+
+class _Parser:
+    """
+    分词结果为 (前导 trivia, 记号) 列表：每个有效记号连同其前面的空白 / 注释一次匹配，
+    文本末尾的 trivia 挂在记号为空串的结束标记上。
+    """
+
+    __slots__ = ("text", "tokens", "pos")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = _TOKEN.findall(text)
+        if sum(len(pre) + len(token) for pre, token in self.tokens) != len(text):
+            # findall 会跳过无法匹配的字符，长度对不上说明存在非法字符，逐个匹配找出位置
+            pos = 0
+            while (m := _TOKEN.match(text, pos)) is not None and m.end() > pos:
+                pos = m.end()
+            raise JSONCSyntaxError("无法识别的字符", text, _TRIVIA.match(text, pos).end())
+        self.pos = 0
+
+    def offset(self, pos: int) -> int:
+        """第 pos 个记号（不含前导 trivia）在原文中的位置，仅在报错时计算。"""
+        consumed = sum(len(pre) + len(token) for pre, token in self.tokens[:pos])
+        return consumed + len(self.tokens[pos][0])
+
+    def error(self, message: str):
+        return JSONCSyntaxError(message, self.text, self.offset(self.pos))
+
+    def value(self):
+        token = self.tokens[self.pos][1]
+        if token == "{":
+            return self.container(Object(), True)
+        if token == "[":
+            return self.container(Array(), False)
+        if token and token not in "]}:,":
+            self.pos += 1
+            return Scalar(token)
+        raise self.error("此处应为值")
+
+    def container(self, node, member: bool):
+        tokens = self.tokens
+        close = node._close
+        self.pos += 1  # { 或 [
+        lead, token = tokens[self.pos]
+        while token != close:
+            if member:
+                if token[:1] != '"':
+                    raise self.error("此处应为字符串键")
+                self.pos += 1
+                after_key, colon = tokens[self.pos]
+                if colon != ":":
+                    raise self.error("此处应为 ':'")
+                self.pos += 1
+                child = Member(token, None, before=lead, after_key=after_key, before_value=tokens[self.pos][0])
+            else:
+                child = Item(None, before=lead)
+            child.value = self.value()
+
+            after_value, token = tokens[self.pos]
+            if token == ",":
+                self.pos += 1
+                child.after_value = after_value
+                child.comma = True
+                trivia, token = tokens[self.pos]
+                child.trail, lead = _split_line(trivia)
+            elif token == close:
+                child.after_value, lead = _split_line(after_value)
+            else:
+                raise self.error(f"此处应为 ',' 或 {close!r}")
+            node.children.append(child)
+        node.end = lead
+        self.pos += 1  # } 或 ]
+        return node
+
+
+def parse(text: str, cache: bool = False) -> Document:
+    """
+    解析 JSONC 文本为 Document。
+    cache=True 时使用 jsonc 的磁盘解析缓存（按文本内容哈希），每次返回新的副本，可以放心修改。
+    """
+    if cache:
+        from . import jsonc
+
+        return jsonc.cached(text.encode("utf-8"), f"cst{CST_VERSION}", lambda: _parse(text))
+    return _parse(text)
+
+
+def _parse(text: str) -> Document:
+    parser = _Parser(text)
+    before = parser.tokens[0][0] if parser.tokens else ""
+    value = parser.value()
+    after, token = parser.tokens[parser.pos]
+    if token or any(t for _, t in parser.tokens[parser.pos + 1 :]):
+        raise parser.error("多余的内容")
+    # 末尾可能有一个额外的空匹配
+    after += "".join(pre for pre, _ in parser.tokens[parser.pos + 1 :])
+    return Document(value, before=before, after=after)
+
+
+def parse_value(text: str):
+    """解析单个值（可含前后空白），用于构造替换用的节点。"""
+    return parse(text).value
+
+
+def dumps(node) -> str:
+    """序列化 Document 或任意节点。"""
+    if isinstance(node, Document):
+        return node.dumps()
+    out = []
+    node._emit(out)
+    return "".join(out)
@@ -1,21 +1,155 @@
+"""
+agent 日志：
+- 控制台输出简短格式，文件按天滚动，保留两周
+- 同一调用位置连续输出相同内容时只保留第一条，之后汇总为“上一条日志重复 N 次”
+- 同一调用位置在 RATE_WINDOW 秒内最多输出 RATE_LIMIT 条，超出部分丢弃并汇总条数
+- ERROR 及以上不做限流；带变量值的异常诊断（diagnose）只写入单独的 .error.log
+"""
+
+import atexit
 import os
 import sys
+import threading
+import time
+
+# 同一调用位置在 RATE_WINDOW 秒内最多输出的条数，0 表示不限流
+RATE_LIMIT = 50
+RATE_WINDOW = 10.0
+# 重复日志持续出现时，至少每隔这么久汇总一次
+REPEAT_REPORT_INTERVAL = 60.0
+# 不做限流的最低等级（ERROR）
+UNTHROTTLED_LEVEL = 40
+
+
+class _Site:
+    __slots__ = ("last_message", "repeats", "repeat_since", "window_start", "count", "dropped")
+
+    def __init__(self, now: float):
+        self.last_message = None
+        self.repeats = 0
+        self.repeat_since = now
+        self.window_start = now
+        self.count = 0
+        self.dropped = 0
+
+
+class LogThrottle:
+    """
+    按调用位置做重复折叠和限流，与具体日志库无关。
+    check() 返回 (是否输出, 需要先输出的汇总消息列表)。
+    """
+
+    def __init__(self, rate_limit: int = RATE_LIMIT, rate_window: float = RATE_WINDOW,
+                 repeat_interval: float = REPEAT_REPORT_INTERVAL):
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.repeat_interval = repeat_interval
+        self._sites = {}
+        self._lock = threading.Lock()
+
+    def _repeat_summary(self, site: _Site, summaries: list) -> None:
+        if site.repeats:
+            summaries.append(f"上一条日志重复 {site.repeats} 次")
+            site.repeats = 0
+
+    def _dropped_summary(self, site: _Site, summaries: list) -> None:
+        if site.dropped:
+            summaries.append(f"{self.rate_window:g} 秒内超出限流，丢弃 {site.dropped} 条")
+            site.dropped = 0
+
+    def check(self, key, level_no: int, message: str) -> tuple[bool, list[str]]:
+        if level_no >= UNTHROTTLED_LEVEL:
+            return True, []
+
+        now = time.monotonic()
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None:
+                site = self._sites[key] = _Site(now)
+
+            summaries = []
+            if message == site.last_message:
+                site.repeats += 1
+                if now - site.repeat_since >= self.repeat_interval:
+                    self._repeat_summary(site, summaries)
+                    site.repeat_since = now
+                return False, summaries
+
+            self._repeat_summary(site, summaries)
+            site.last_message = message
+            site.repeat_since = now
+
+            if self.rate_limit:
+                if now - site.window_start >= self.rate_window:
+                    self._dropped_summary(site, summaries)
+                    site.window_start = now
+                    site.count = 0
+                site.count += 1
+                if site.count > self.rate_limit:
+                    site.dropped += 1
+                    return False, summaries
+            return True, summaries
+
+    def flush(self) -> list[tuple[object, str]]:
+        """取出所有尚未输出的汇总，返回 [(调用位置, 消息)]。"""
+        result = []
+        with self._lock:
+            for key, site in self._sites.items():
+                summaries = []
+                self._repeat_summary(site, summaries)
+                self._dropped_summary(site, summaries)
+                result.extend((key, summary) for summary in summaries)
+        return result
+
 
 try:
     from loguru import logger as _logger
 
-    def setup_logger(log_dir="debug/custom", console_level="INFO"):
+    _throttle = LogThrottle()
+
+    def _emit_summary(record: dict, summary: str) -> None:
+        # 汇总消息沿用原调用位置，文件日志中 {name}:{function}:{line} 保持一致
+        site = {k: record[k] for k in ("name", "function", "line", "module", "file")}
+        _logger.bind(throttle_summary=True).patch(lambda r: r.update(site)).log(
+            record["level"].name, summary
+        )
+
+    def _throttle_patcher(record):
+        extra = record["extra"]
+        if extra.get("throttle_summary"):
+            return
+        key = (record["file"].path, record["line"])
+        accept, summaries = _throttle.check(key, record["level"].no, record["message"])
+        for summary in summaries:
+            _emit_summary(record, summary)
+        extra["suppressed"] = not accept
+
+    def _flush_throttle():
+        for (path, line), summary in _throttle.flush():
+            _logger.bind(throttle_summary=True).info(f"{summary} ({os.path.basename(path)}:{line})")
+
+    atexit.register(_flush_throttle)
+
+    def setup_logger(log_dir="debug/custom", console_level="INFO",
+                     rate_limit=RATE_LIMIT, rate_window=RATE_WINDOW):
         """设置 loguru logger
 
         Args:
             log_dir: 日志文件目录
             console_level: 控制台输出等级 (DEBUG, INFO, WARNING, ERROR)
+            rate_limit: 同一调用位置在 rate_window 秒内最多输出的条数，0 表示不限流
+            rate_window: 限流窗口（秒）
         """
         os.makedirs(log_dir, exist_ok=True)
         _logger.remove()
+        _throttle.rate_limit = rate_limit
+        _throttle.rate_window = rate_window
+        _logger.configure(patcher=_throttle_patcher)
 
         # 定义日志级别的简短格式
         def format_level(record):
+            if record["extra"].get("suppressed"):
+                return False
             level_map = {
                 "INFO": "info",
                 "ERROR": "err",
@@ -30,23 +164,43 @@ try:
             )
             return True
 
+        def not_suppressed(record):
+            return not record["extra"].get("suppressed")
+
         _logger.add(
             sys.stderr,
             format="<level>{extra[level_short]}</level>:<level>{message}</level>",
             colorize=True,
             level=console_level,
             filter=format_level,
+            enqueue=True,  # 写 stderr 管道放到后台线程，动作线程不被阻塞
+            diagnose=False,
         )
+        file_format = "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} | {message}"
         _logger.add(
             f"{log_dir}/{{time:YYYY-MM-DD}}.log",
             rotation="00:00",  # midnight
             retention="2 weeks",
             compression="zip",
             level="DEBUG",
-            format="{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} | {message}",
+            format=file_format,
+            filter=not_suppressed,
             encoding="utf-8",
             enqueue=True,
             backtrace=True,  # 包含完整的异常回溯信息
+            diagnose=False,
+        )
+        # 变量值诊断开销大且体积大，只对 ERROR 及以上单独记录
+        _logger.add(
+            f"{log_dir}/{{time:YYYY-MM-DD}}.error.log",
+            rotation="00:00",
+            retention="2 weeks",
+            compression="zip",
+            level="ERROR",
+            format=file_format,
+            encoding="utf-8",
+            enqueue=True,
+            backtrace=True,
             diagnose=True,  # 包含变量值信息
         )
         return _logger
@@ -77,8 +231,77 @@ except ImportError:
             )
             return super().format(record)
 
+    class ThrottleFilter(logging.Filter):
+        """与 loguru 分支相同的重复折叠和限流"""
+
+        def __init__(self):
+            super().__init__()
+            self.throttle = LogThrottle()
+
+        def filter(self, record):
+            if getattr(record, "throttle_summary", False):
+                return True
+            accept, summaries = self.throttle.check(
+                (record.pathname, record.lineno), record.levelno, record.getMessage()
+            )
+            for summary in summaries:
+                logging.root.log(record.levelno, summary, extra={"throttle_summary": True})
+            return accept
+
+    class _BraceMessage:
+        """延迟到真正输出时才用 str.format 格式化"""
+
+        __slots__ = ("fmt", "args", "kwargs")
+
+        def __init__(self, fmt, args, kwargs):
+            self.fmt = fmt
+            self.args = args
+            self.kwargs = kwargs
+
+        def __str__(self):
+            return str(self.fmt).format(*self.args, **self.kwargs)
+
+    class BraceLogger:
+        """让标准库 logging 接受与 loguru 相同的 logger.info("{}", x) 写法"""
+
+        def __init__(self, log):
+            self._log = log
+
+        def _emit(self, level, msg, args, kwargs, exc_info=False):
+            if self._log.isEnabledFor(level):
+                message = _BraceMessage(msg, args, kwargs) if args or kwargs else msg
+                self._log.log(level, message, exc_info=exc_info, stacklevel=3)
+
+        def debug(self, msg, *args, **kwargs):
+            self._emit(logging.DEBUG, msg, args, kwargs)
+
+        def info(self, msg, *args, **kwargs):
+            self._emit(logging.INFO, msg, args, kwargs)
+
+        success = info
+
+        def warning(self, msg, *args, **kwargs):
+            self._emit(logging.WARNING, msg, args, kwargs)
+
+        def error(self, msg, *args, **kwargs):
+            self._emit(logging.ERROR, msg, args, kwargs)
+
+        def critical(self, msg, *args, **kwargs):
+            self._emit(logging.CRITICAL, msg, args, kwargs)
+
+        def exception(self, msg, *args, **kwargs):
+            self._emit(logging.ERROR, msg, args, kwargs, exc_info=True)
+
     handler = logging.StreamHandler(sys.stderr)
     handler.setFormatter(ShortLevelFormatter("%(level_short)s:%(message)s"))
+    _throttle_filter = ThrottleFilter()
+    handler.addFilter(_throttle_filter)
+
+    def _flush_throttle():
+        for (path, line), summary in _throttle_filter.throttle.flush():
+            logging.root.info(f"{summary} ({os.path.basename(path)}:{line})", extra={"throttle_summary": True})
+
+    atexit.register(_flush_throttle)
     logging.root.addHandler(handler)
     logging.root.setLevel(logging.INFO)
-    logger = logging
+    logger = BraceLogger(logging.root)
@@ -0,0 +1,213 @@
+"""
+资源 manifest 检查：
+- 从 hot_update.json 的 manifest_url 开始，并发遍历整棵 manifest 树（连接池复用）
+- 与 config/manifest_cache.json 中记录的 updated 时间戳比较，找出有变化的 manifest
+- 根 manifest 时间戳未变时直接判定无更新，不再请求子 manifest
+
+manifest 结构:
+    {
+        "updated": 1700000000,
+        "directories": [{"name": "resource", "manifest": "resource/manifest.json"}],
+        "files": [{"name": "pipeline/a.json", "sha256": "..."}]
+    }
+子 manifest 路径相对 manifest_url 所在目录；manifest_cache.json 与
+tools/ci/generate_manifest_cache.py 生成的格式一致。
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+
+from .config import CONFIG_DIR, get_config
+from .logger import logger
+
+CACHE_FILE = CONFIG_DIR / "manifest_cache.json"
+ROOT_MANIFEST = "manifest.json"
+
+HOT_UPDATE_DEFAULTS = {
+    "enable_hot_update": True,
+    "manifest_url": "",
+    "ignored_dirs": ["images"],
+    "max_workers": 8,
+    "timeout": 10,
+}
+
+_session_lock = threading.Lock()
+_session = None
+
+
+def get_session(pool_size: int = 8):
+    """共享的 requests.Session，按连接池复用 keep-alive 连接。"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            # 国内服务器直连更快，不走系统代理
+            session.trust_env = False
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def hot_update_config() -> dict:
+    return get_config("hot_update", HOT_UPDATE_DEFAULTS)
+
+
+def base_url(manifest_url: str) -> str:
+    return manifest_url.rsplit("/", 1)[0]
+
+
+def _load_cache() -> dict:
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def fetch_manifest_tree(
+    manifest_url: str,
+    ignored_dirs=(),
+    max_workers: int = 8,
+    timeout: float = 10,
+    root: dict | None = None,
+) -> tuple[dict, dict]:
+    """
+    并发抓取整棵 manifest 树。
+    返回 ({manifest 路径: manifest 内容}, {manifest 路径: 错误信息})。
+    """
+    session = get_session(max_workers)
+    base = base_url(manifest_url)
+    manifests: dict[str, dict] = {}
+    errors: dict[str, str] = {}
+
+    def fetch(path: str) -> dict:
+        url = manifest_url if path == ROOT_MANIFEST else f"{base}/{path}"
+        response = session.get(url, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def children(manifest: dict) -> list[str]:
+        return [
+            d["manifest"]
+            for d in manifest.get("directories", [])
+            if d.get("manifest") and d.get("name") not in ignored_dirs
+        ]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        if root is None:
+            pending = {pool.submit(fetch, ROOT_MANIFEST): ROOT_MANIFEST}
+        else:
+            manifests[ROOT_MANIFEST] = root
+            pending = {pool.submit(fetch, p): p for p in children(root)}
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                try:
+                    manifest = future.result()
+                except Exception as e:
+                    errors[path] = str(e)
+                    continue
+                manifests[path] = manifest
+                for child in children(manifest):
+                    if child not in manifests and child not in pending.values():
+                        pending[pool.submit(fetch, child)] = child
+
+    return manifests, errors
+
+
+def check_manifest_updates() -> dict:
+    """
+    检查哪些 manifest 相对本地缓存有更新。
+
+    Returns:
+        {
+            "success": bool,
+            "has_any_update": bool,
+            "updated_manifests": [manifest 路径, ...],
+            "manifests": {manifest 路径: manifest 内容},
+            "error": str | None,
+        }
+    """
+    result = {
+        "success": False,
+        "has_any_update": False,
+        "updated_manifests": [],
+        "manifests": {},
+        "error": None,
+    }
+    conf = hot_update_config()
+    manifest_url = conf.get("manifest_url", "")
+    if not manifest_url:
+        result["error"] = "未配置 manifest_url"
+        return result
+
+    cache = _load_cache()
+    cached = cache.get("manifests", {})
+    timeout = conf.get("timeout", 10)
+
+    try:
+        root = get_session().get(manifest_url, timeout=timeout)
+        root.raise_for_status()
+        root_manifest = root.json()
+    except Exception as e:
+        result["error"] = f"获取根 manifest 失败: {e}"
+        return result
+
+    if cache and root_manifest.get("updated", 0) == cache.get("root_updated"):
+        result["success"] = True
+        result["manifests"] = {ROOT_MANIFEST: root_manifest}
+        return result
+
+    manifests, errors = fetch_manifest_tree(
+        manifest_url,
+        ignored_dirs=set(conf.get("ignored_dirs", [])),
+        max_workers=conf.get("max_workers", 8),
+        timeout=timeout,
+        root=root_manifest,
+    )
+    result["manifests"] = manifests
+    result["updated_manifests"] = [
+        path
+        for path, manifest in manifests.items()
+        if manifest.get("files") and cached.get(path) != manifest.get("updated", 0)
+    ]
+    result["has_any_update"] = bool(result["updated_manifests"])
+    result["success"] = not errors
+    if errors:
+        result["error"] = "; ".join(f"{p}: {e}" for p, e in errors.items())
+    logger.debug(
+        f"manifest 检查完成: 共 {len(manifests)} 个，{len(result['updated_manifests'])} 个有更新"
+    )
+    return result
+
+
+def save_manifest_cache_from_result(manifest_result: dict) -> None:
+    """把本次获取到的 manifest 时间戳写回缓存（仅合并成功获取的部分）。"""
+    manifests = manifest_result.get("manifests") or {}
+    if not manifests:
+        return
+
+    cache = _load_cache()
+    cached = cache.setdefault("manifests", {})
+    for path, manifest in manifests.items():
+        cached[path] = manifest.get("updated", 0)
+    # 只有整棵树都成功获取时才更新根时间戳，否则下次仍会完整检查
+    if manifest_result.get("success") and ROOT_MANIFEST in manifests:
+        cache["root_updated"] = manifests[ROOT_MANIFEST].get("updated", 0)
+
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2, ensure_ascii=False)
+    except OSError:
+        logger.debug(f"无法写入 manifest 缓存: {CACHE_FILE}")
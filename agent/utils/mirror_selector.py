@@ -0,0 +1,119 @@
+"""
+pip 镜像源选择（仅依赖标准库，安装依赖之前即可使用）：
+- 并发探测所有配置的索引地址，按响应延迟排序
+- 探测结果带 TTL 缓存在 config/ 下，缓存有效期内不再发起探测
+- 不可达的镜像排在最后，全部不可达时保持配置顺序
+- pip 安装失败后重新探测该镜像，仅在确实不可达时才换用下一个镜像
+"""
+
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .logger import logger
+
+DEFAULT_TTL = 6 * 3600
+DEFAULT_TIMEOUT = 3.0
+
+# 探测用的项目页面，体积小且所有 PyPI 镜像都会有
+_PROBE_PROJECT = "pip/"
+
+
+def probe_mirror(index_url: str, timeout: float = DEFAULT_TIMEOUT) -> float | None:
+    """请求 <index>/pip/ 并读取首个数据块，返回耗时（秒），失败返回 None。"""
+    url = index_url.rstrip("/") + "/" + _PROBE_PROJECT
+    # 不走系统代理：与 pip 的默认行为不同，但镜像源基本都是国内直连
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+    start = time.perf_counter()
+    try:
+        with opener.open(url, timeout=timeout) as response:
+            response.read(1024)
+    except Exception as e:
+        logger.debug(f"镜像源不可达 {index_url}: {e}")
+        return None
+    return time.perf_counter() - start
+
+
+def _load_cache(cache_file: Path) -> dict:
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache_file: Path, cache: dict) -> None:
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_file, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=4, ensure_ascii=False)
+    except OSError:
+        logger.debug(f"无法写入镜像源缓存: {cache_file}")
+
+
+def rank_mirrors(
+    mirrors: list[str],
+    cache_file: Path,
+    ttl: float = DEFAULT_TTL,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> list[str]:
+    """
+    返回按延迟从低到高排序的镜像列表。
+    仅对缓存缺失或过期的镜像并发探测，其余直接使用缓存结果。
+    """
+    mirrors = list(dict.fromkeys(m for m in mirrors if m))
+    if len(mirrors) <= 1:
+        return mirrors
+
+    now = time.time()
+    cache = _load_cache(cache_file)
+    stale = [
+        m for m in mirrors
+        if not isinstance(cache.get(m), dict)
+        or now - cache[m].get("checked_at", 0) > ttl
+    ]
+
+    if stale:
+        logger.debug(f"并发探测 {len(stale)} 个镜像源")
+        with ThreadPoolExecutor(max_workers=len(stale)) as pool:
+            latencies = list(pool.map(lambda m: probe_mirror(m, timeout), stale))
+        for mirror, latency in zip(stale, latencies):
+            cache[mirror] = {"latency": latency, "checked_at": now}
+        _save_cache(cache_file, cache)
+
+    def sort_key(item):
+        order, mirror = item
+        latency = cache.get(mirror, {}).get("latency")
+        # 不可达的排在最后，并保持配置顺序
+        return (latency is None, latency if latency is not None else 0.0, order)
+
+    ranked = [m for _, m in sorted(enumerate(mirrors), key=sort_key)]
+    logger.debug(
+        "镜像源延迟: "
+        + ", ".join(
+            f"{m}={cache[m]['latency'] * 1000:.0f}ms" if cache[m].get("latency") is not None else f"{m}=不可达"
+            for m in ranked
+        )
+    )
+    return ranked
+
+
+def mark_unreachable(mirror: str, cache_file: Path) -> None:
+    """pip 在该镜像上安装失败时调用，使其在 TTL 内排到最后。"""
+    cache = _load_cache(cache_file)
+    cache[mirror] = {"latency": None, "checked_at": time.time()}
+    _save_cache(cache_file, cache)
+
+
+def recheck_mirror(mirror: str, cache_file: Path, timeout: float = DEFAULT_TIMEOUT) -> bool:
+    """
+    pip 在该镜像上安装失败后调用：重新探测一次，不可达时标记为不可达并返回 False。
+    仍可达说明失败与镜像无关（依赖冲突、构建失败等），缓存保持不变并返回 True。
+    """
+    if probe_mirror(mirror, timeout) is not None:
+        return True
+    mark_unreachable(mirror, cache_file)
+    return False
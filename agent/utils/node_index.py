@@ -0,0 +1,115 @@
+"""
+节点名索引：
+- 基于已加载资源的 node_list 一次性构建有序索引
+- 按资源包 hash 缓存，同一资源包只构建一次
+- 支持 前缀 / glob / 正则 三种选择方式，选择结果同样缓存
+"""
+
+import bisect
+import fnmatch
+import re
+import threading
+
+# glob 通配符，出现在其中任一字符之前的部分可作为字面前缀缩小扫描范围
+_GLOB_MAGIC = re.compile(r"[*?\[]")
+
+
+class NodeIndex:
+    """已排序的节点名集合，提供按模式批量选择节点的能力。"""
+
+    def __init__(self, names):
+        self._names: list[str] = sorted(set(names))
+        self._selected: dict[tuple[str, str], tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        i = bisect.bisect_left(self._names, name)
+        return i < len(self._names) and self._names[i] == name
+
+    def _prefix_range(self, prefix: str) -> list[str]:
+        """二分定位以 prefix 开头的连续区间。"""
+        if not prefix:
+            return self._names
+        lo = bisect.bisect_left(self._names, prefix)
+        hi = bisect.bisect_left(self._names, prefix + "\U0010ffff", lo)
+        return self._names[lo:hi]
+
+    def prefix(self, prefix: str) -> tuple[str, ...]:
+        return self._cached("prefix", prefix, lambda: self._prefix_range(prefix))
+
+    def glob(self, pattern: str) -> tuple[str, ...]:
+        """fnmatch 风格匹配（区分大小写），如 "MaoXian_*"。"""
+
+        def _select():
+            m = _GLOB_MAGIC.search(pattern)
+            if m is None:
+                return [pattern] if pattern in self else []
+            matcher = re.compile(fnmatch.translate(pattern)).match
+            return [n for n in self._prefix_range(pattern[: m.start()]) if matcher(n)]
+
+        return self._cached("glob", pattern, _select)
+
+    def regex(self, pattern: str) -> tuple[str, ...]:
+        """正则匹配（re.search 语义，需要整名匹配请自行加 ^ 和 $）。"""
+
+        def _select():
+            searcher = re.compile(pattern).search
+            return [n for n in self._names if searcher(n)]
+
+        return self._cached("regex", pattern, _select)
+
+    def select(self, names=(), prefix=(), glob=(), regex=()) -> list[str]:
+        """
+        合并多种选择方式的结果，保持有序且去重。
+        每个参数都可以是单个字符串或字符串列表；names 中不存在的节点会被忽略。
+        """
+        selected: set[str] = set()
+        selected.update(n for n in _as_list(names) if n in self)
+        for p in _as_list(prefix):
+            selected.update(self.prefix(p))
+        for g in _as_list(glob):
+            selected.update(self.glob(g))
+        for r in _as_list(regex):
+            selected.update(self.regex(r))
+        return sorted(selected)
+
+    def _cached(self, kind: str, pattern: str, compute) -> tuple[str, ...]:
+        key = (kind, pattern)
+        result = self._selected.get(key)
+        if result is None:
+            result = tuple(compute())
+            self._selected[key] = result
+        return result
+
+
+def _as_list(value) -> list[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+# 资源包 hash -> 索引。同一 agent 进程内通常只会出现一两个资源包
+_INDEX_CACHE: dict[str, NodeIndex] = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def get_node_index(resource) -> NodeIndex:
+    """
+    获取资源对应的节点名索引（maa.resource.Resource 或同样提供 hash / node_list 的对象）。
+    资源包 hash 不变时直接复用缓存，不再跨 FFI 拉取完整的 node_list。
+    """
+    key = resource.hash
+    index = _INDEX_CACHE.get(key)
+    if index is not None:
+        return index
+
+    with _INDEX_LOCK:
+        index = _INDEX_CACHE.get(key)
+        if index is None:
+            index = NodeIndex(resource.node_list)
+            _INDEX_CACHE[key] = index
+    return index
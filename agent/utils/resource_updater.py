@@ -0,0 +1,241 @@
+"""
+增量资源热更新：
+- 对比 manifest 中每个文件的 sha256 与本地索引 config/resource_index.json
+- 只下载有变化的文件，并发数受 max_workers 限制，下载到暂存目录并校验哈希
+- 全部下载成功后才逐个 os.replace 替换到目标位置（同一文件系统内原子替换）
+- 任一文件下载失败则放弃本次替换；替换途中出错时把已替换的文件恢复为旧版本，
+  已有资源保持一致（旧文件先移到 BACKUP_DIR，成功后才删除）
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .config import CONFIG_DIR
+from .logger import logger
+from .manifest_checker import (
+    base_url,
+    fetch_manifest_tree,
+    get_session,
+    hot_update_config,
+)
+
+INDEX_FILE = CONFIG_DIR / "resource_index.json"
+# 资源根目录即项目根目录（与 config/ 同级，包含 resource/、interface.json 等）
+RESOURCE_ROOT = CONFIG_DIR.parent
+STAGING_DIR = RESOURCE_ROOT / ".hot_update"
+BACKUP_DIR = RESOURCE_ROOT / ".hot_update_backup"
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _load_index() -> dict:
+    try:
+        with open(INDEX_FILE, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        return index if isinstance(index, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(index: dict) -> None:
+    try:
+        INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = INDEX_FILE.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2, ensure_ascii=False, sort_keys=True)
+        tmp.replace(INDEX_FILE)
+    except OSError:
+        logger.debug(f"无法写入资源索引: {INDEX_FILE}")
+
+
+def _manifest_dir(manifest_path: str) -> str:
+    """manifest 所在目录，即其 files 的相对根；根 manifest 为空字符串。"""
+    return manifest_path.rsplit("/", 1)[0] if "/" in manifest_path else ""
+
+
+def collect_remote_files(manifests: dict, base: str) -> dict:
+    """
+    汇总 manifest 中的文件条目。
+    返回 {相对项目根的路径: (sha256, 下载地址)}。
+    """
+    files = {}
+    for manifest_path, manifest in manifests.items():
+        prefix = _manifest_dir(manifest_path)
+        for entry in manifest.get("files", []):
+            name = entry.get("path") or entry.get("name")
+            digest = (entry.get("sha256") or entry.get("hash") or "").lower()
+            if not name or not digest:
+                continue
+            rel = f"{prefix}/{name}" if prefix else name
+            files[rel] = (digest, entry.get("url") or f"{base}/{rel}")
+    return files
+
+
+def _safe_target(rel: str) -> Path | None:
+    target = (RESOURCE_ROOT / rel).resolve()
+    root = RESOURCE_ROOT.resolve()
+    if target != root and root in target.parents:
+        return target
+    return None
+
+
+def plan_updates(remote_files: dict, index: dict) -> list[str]:
+    """找出需要下载的文件。索引未记录或与远端不一致时，再用本地文件的实际哈希兜底。"""
+    changed = []
+    for rel, (digest, _) in remote_files.items():
+        if index.get(rel) == digest:
+            continue
+        target = _safe_target(rel)
+        if target is None:
+            logger.warning(f"忽略越界的资源路径: {rel}")
+            continue
+        if target.exists() and _sha256(target) == digest:
+            index[rel] = digest
+            continue
+        changed.append(rel)
+    return changed
+
+
+def _download(session, url: str, dest: Path, digest: str, timeout: float) -> None:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    h = hashlib.sha256()
+    with session.get(url, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        with open(dest, "wb") as f:
+            for chunk in response.iter_content(chunk_size=1 << 16):
+                h.update(chunk)
+                f.write(chunk)
+    if h.hexdigest() != digest:
+        raise ValueError(f"哈希不匹配: {url}")
+
+
+def _swap_in(changed: list[str], staging: Path, backup: Path) -> None:
+    """
+    把暂存目录中的文件逐个替换到目标位置。
+    中途失败时按相反顺序恢复已替换的文件（新增的文件删除），然后重新抛出异常。
+    """
+    done = []  # [(目标路径, 旧文件备份路径或 None)]
+    try:
+        for rel in changed:
+            target = _safe_target(rel)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            saved = None
+            if target.exists():
+                saved = backup / rel
+                saved.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(target, saved)
+            done.append((target, saved))
+            os.replace(staging / rel, target)
+    except OSError:
+        restored = True
+        for target, saved in reversed(done):
+            try:
+                if saved is not None:
+                    os.replace(saved, target)
+                elif target.exists():
+                    target.unlink()
+            except OSError as e:
+                restored = False
+                logger.warning(f"热更新回滚失败: {target}: {e}")
+        # 回滚不完整时保留备份，便于手动恢复
+        if restored:
+            shutil.rmtree(backup, ignore_errors=True)
+        raise
+    shutil.rmtree(backup, ignore_errors=True)
+
+
+def check_and_update_resources(
+    resource_manifests: list[str] | None = None,
+    manifests: dict | None = None,
+) -> dict:
+    """
+    下载并替换有变化的资源文件。
+
+    Args:
+        resource_manifests: 只处理这些 manifest 路径；None 表示处理全部
+        manifests: 已获取的 {manifest 路径: 内容}，缺省时重新抓取整棵树
+
+    Returns:
+        {"updated_files": [相对路径, ...], "error": str | None}
+    """
+    result = {"updated_files": [], "error": None}
+    conf = hot_update_config()
+    manifest_url = conf.get("manifest_url", "")
+    if not manifest_url:
+        result["error"] = "未配置 manifest_url"
+        return result
+
+    max_workers = conf.get("max_workers", 8)
+    timeout = conf.get("timeout", 10)
+
+    if manifests is None:
+        manifests, errors = fetch_manifest_tree(
+            manifest_url,
+            ignored_dirs=set(conf.get("ignored_dirs", [])),
+            max_workers=max_workers,
+            timeout=timeout,
+        )
+        if errors:
+            result["error"] = "; ".join(f"{p}: {e}" for p, e in errors.items())
+            return result
+    if resource_manifests is not None:
+        manifests = {p: manifests[p] for p in resource_manifests if p in manifests}
+
+    index = _load_index()
+    remote_files = collect_remote_files(manifests, base_url(manifest_url))
+    changed = plan_updates(remote_files, index)
+    if not changed:
+        _save_index(index)
+        return result
+
+    logger.info(f"热更新: {len(changed)} 个资源文件需要更新")
+    session = get_session(max_workers)
+    staging = STAGING_DIR
+    shutil.rmtree(staging, ignore_errors=True)
+
+    def fetch(rel: str):
+        digest, url = remote_files[rel]
+        _download(session, url, staging / rel, digest, timeout)
+
+    failures = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {rel: pool.submit(fetch, rel) for rel in changed}
+        for rel, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                failures[rel] = str(e)
+
+    if failures:
+        shutil.rmtree(staging, ignore_errors=True)
+        result["error"] = f"{len(failures)} 个文件下载失败: " + "; ".join(
+            f"{rel}: {err}" for rel, err in list(failures.items())[:5]
+        )
+        return result
+
+    # 暂存目录与资源在同一目录树下，os.replace 为原子操作
+    shutil.rmtree(BACKUP_DIR, ignore_errors=True)
+    try:
+        _swap_in(changed, staging, BACKUP_DIR)
+    except OSError as e:
+        result["error"] = f"替换资源文件失败，已恢复为更新前的版本: {e}"
+        return result
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    for rel in changed:
+        index[rel] = remote_files[rel][0]
+    result["updated_files"] = list(changed)
+    _save_index(index)
+    logger.info(f"热更新完成，已更新 {len(changed)} 个文件")
+    return result
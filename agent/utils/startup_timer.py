@@ -0,0 +1,76 @@
+"""
+启动阶段计时（仅依赖标准库）：
+- mark() 记录各阶段结束时刻（相对启动起点的单调时钟毫秒数）
+- 重启到虚拟环境时通过环境变量把起点和已记录的阶段传给新进程
+- dump() 每次启动向 debug/startup_timing.jsonl 追加一行 JSON
+汇总统计见 tools/startup_report.py。
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+_ENV_STATE = "MAA_AGENT_STARTUP_TIMING"
+
+
+class StartupTimer:
+    def __init__(self):
+        # time.monotonic 在 Linux/Windows/macOS 上都是系统级时钟，可跨进程比较
+        self.t0 = time.monotonic()
+        self.marks: list[tuple[str, float]] = []
+        self.relaunched = False
+
+        inherited = os.environ.pop(_ENV_STATE, "")
+        if inherited:
+            try:
+                state = json.loads(inherited)
+                self.t0 = float(state["t0"])
+                self.marks = [(name, float(ms)) for name, ms in state["marks"]]
+                self.relaunched = True
+            except (ValueError, KeyError, TypeError):
+                pass
+
+    def mark(self, phase: str) -> float:
+        """
+        记录阶段结束，返回距启动起点的毫秒数。
+        重启后的进程会重复经过部分阶段，其阶段名加 "relaunch/" 前缀以便区分。
+        """
+        elapsed = (time.monotonic() - self.t0) * 1000
+        if self.relaunched:
+            phase = f"relaunch/{phase}"
+        self.marks.append((phase, elapsed))
+        return elapsed
+
+    def export_env(self) -> None:
+        """写入环境变量，供 exec / 子进程重启后的进程继续计时。"""
+        os.environ[_ENV_STATE] = json.dumps({"t0": self.t0, "marks": self.marks})
+
+    def phases(self) -> dict[str, float]:
+        """各阶段自身耗时（毫秒），按记录顺序。"""
+        result = {}
+        prev = 0.0
+        for name, ms in self.marks:
+            result[name] = round(ms - prev, 2)
+            prev = ms
+        return result
+
+    def dump(self, log_dir: str | Path = "debug", **extra) -> None:
+        """追加一行启动记录；写入失败不影响启动。"""
+        record = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "pid": os.getpid(),
+            "platform": sys.platform,
+            "relaunched": self.relaunched,
+            "total_ms": round(self.marks[-1][1], 2) if self.marks else 0.0,
+            "phases": self.phases(),
+            **extra,
+        }
+        try:
+            Path(log_dir).mkdir(parents=True, exist_ok=True)
+            with open(Path(log_dir) / "startup_timing.jsonl", "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError:
+            pass
@@ -0,0 +1,215 @@
+"""
+多实例 agent 托管（一台机器上多个 MAA 实例共用一次启动）：
+- 父进程只做一次 venv / 依赖检查和模块导入（warm import）
+- POSIX 下为每个 socket_id fork 一个 worker，已导入的模块与父进程写时复制共享
+- Windows 不支持 fork，改用 multiprocessing spawn，每个 worker 自行导入
+- worker 启动约 30 秒后首次、之后定期记录各 worker 的内存占用（RSS / PSS）
+
+用法:
+    python main.py --supervise <socket_id> [<socket_id> ...]
+"""
+
+import os
+import signal
+import sys
+import time
+
+from . import events
+from .logger import logger
+
+SUPERVISE_FLAG = "--supervise"
+REPORT_INTERVAL = 300.0
+# 首次报告在 worker 完成连接、加载资源之后
+FIRST_REPORT_DELAY = 30.0
+
+
+def parse_socket_ids(argv: list[str]) -> list[str] | None:
+    """argv 中含 --supervise 时返回其后的 socket_id 列表，否则返回 None。"""
+    if SUPERVISE_FLAG not in argv:
+        return None
+    ids = argv[argv.index(SUPERVISE_FLAG) + 1 :]
+    return list(dict.fromkeys(i for i in ids if i and not i.startswith("-")))
+
+
+def memory_usage(pid: int) -> dict[str, int]:
+    """
+    返回进程内存占用（KiB）：rss 为常驻内存，pss 为按共享页均摊后的占用。
+    fork 出的 worker 共享父进程已导入的模块，pss 更能反映单个实例的真实开销。
+    无法获取时返回空字典。
+    """
+    usage = {}
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    usage["rss"] = int(line.split()[1])
+                    break
+        with open(f"/proc/{pid}/smaps_rollup", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    usage["pss"] = int(line.split()[1])
+                    break
+    except (OSError, ValueError, IndexError):
+        pass
+    if usage:
+        return usage
+
+    try:
+        import psutil  # 可选依赖，Windows / macOS 下使用
+
+        usage["rss"] = psutil.Process(pid).memory_info().rss // 1024
+    except Exception:
+        pass
+    return usage
+
+
+def _format_usage(usage: dict[str, int]) -> str:
+    if not usage:
+        return "未知"
+    return " ".join(f"{k.upper()}={v / 1024:.1f}MiB" for k, v in usage.items())
+
+
+def serve(socket_id: str) -> None:
+    """在当前进程中为一个 socket_id 运行 AgentServer 直到连接结束。"""
+    from maa.agent.agent_server import AgentServer
+
+    AgentServer.start_up(socket_id)
+    logger.info(f"AgentServer启动 (socket_id: {socket_id}, pid: {os.getpid()})")
+    AgentServer.join()
+    AgentServer.shut_down()
+    logger.info(f"AgentServer关闭 (socket_id: {socket_id})")
+
+
+def _spawn_entry(socket_id: str, agent_dir: str) -> None:
+    """spawn 模式 worker 入口：重新导入自定义动作后运行 AgentServer。"""
+    if agent_dir not in sys.path:
+        sys.path.insert(0, agent_dir)
+
+    from maa.toolkit import Toolkit
+
+    import Agent_file  # noqa: F401  注册自定义动作
+
+    events.instrument_actions()
+    Toolkit.init_option("./")
+    serve(socket_id)
+
+
+def _fork_worker(socket_id: str) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+
+    code = 0
+    try:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        serve(socket_id)
+    except BaseException:
+        logger.exception(f"worker {socket_id} 异常退出")
+        code = 1
+    finally:
+        # os._exit 不执行 atexit，事件队列和日志都需要在这里手动写完
+        events.flush()
+        try:
+            logger.complete()
+        except Exception:
+            pass
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+
+def _supervise_forked(socket_ids: list[str], report_interval: float) -> int:
+    workers = {_fork_worker(sid): sid for sid in socket_ids}
+    logger.info(
+        "已启动 worker: " + ", ".join(f"{sid}(pid {pid})" for pid, sid in workers.items())
+    )
+
+    def forward(signum, _frame):
+        for pid in workers:
+            try:
+                os.kill(pid, signum)
+            except OSError:
+                pass
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+
+    failed = 0
+    next_report = time.monotonic() + min(FIRST_REPORT_DELAY, report_interval)
+    while workers:
+        now = time.monotonic()
+        if now >= next_report:
+            report(workers)
+            next_report = now + report_interval
+
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            time.sleep(1.0)
+            continue
+
+        sid = workers.pop(pid, None)
+        if sid is None:
+            continue
+        code = os.waitstatus_to_exitcode(status)
+        failed += code != 0
+        logger.info(f"worker {sid}(pid {pid}) 已退出，退出码 {code}")
+
+    return 1 if failed else 0
+
+
+def _supervise_spawned(socket_ids: list[str], agent_dir: str, report_interval: float) -> int:
+    import multiprocessing
+
+    ctx = multiprocessing.get_context("spawn")
+    processes = {}
+    for sid in socket_ids:
+        process = ctx.Process(target=_spawn_entry, args=(sid, agent_dir), name=f"agent-{sid}")
+        process.start()
+        processes[sid] = process
+    logger.info(
+        "已启动 worker: " + ", ".join(f"{sid}(pid {p.pid})" for sid, p in processes.items())
+    )
+
+    failed = 0
+    next_report = time.monotonic() + min(FIRST_REPORT_DELAY, report_interval)
+    while processes:
+        now = time.monotonic()
+        if now >= next_report:
+            report({p.pid: sid for sid, p in processes.items()})
+            next_report = now + report_interval
+
+        for sid, process in list(processes.items()):
+            process.join(timeout=0.5)
+            if process.exitcode is None:
+                continue
+            del processes[sid]
+            failed += process.exitcode != 0
+            logger.info(f"worker {sid}(pid {process.pid}) 已退出，退出码 {process.exitcode}")
+
+    return 1 if failed else 0
+
+
+def report(workers: dict[int, str]) -> None:
+    """记录每个 worker 及父进程的内存占用。"""
+    lines = [f"supervisor(pid {os.getpid()}): {_format_usage(memory_usage(os.getpid()))}"]
+    for pid, sid in workers.items():
+        lines.append(f"{sid}(pid {pid}): {_format_usage(memory_usage(pid))}")
+    logger.info("内存占用 " + "; ".join(lines))
+
+
+def supervise(socket_ids: list[str], agent_dir: str, report_interval: float = REPORT_INTERVAL) -> int:
+    """
+    为每个 socket_id 启动一个 worker 并等待全部结束，返回退出码。
+    调用前应已导入 Agent_file 并完成 Toolkit.init_option（fork 模式下由 worker 继承）。
+    """
+    if not socket_ids:
+        logger.error("--supervise 后缺少 socket_id")
+        return 1
+
+    logger.info(f"多实例模式: {len(socket_ids)} 个 socket_id")
+    if hasattr(os, "fork"):
+        return _supervise_forked(socket_ids, report_interval)
+    return _supervise_spawned(socket_ids, agent_dir, report_interval)
@@ -0,0 +1,101 @@
+"""
+虚拟环境重启工具：
+- 缓存 venv 解释器路径，避免每次启动都探测 bin/python3 与 bin/python
+- 支持 exec 的平台上原地替换当前进程，不再保留一个等待子进程的父解释器
+- Windows 的 os.exec* 实际是「新建进程 + 退出」，会断开 MAA 持有的管道，仍使用子进程
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from .logger import logger
+
+# 缓存文件放在 venv 内，venv 被删除或重建时自然失效
+_CACHE_NAME = ".maa_python"
+
+
+def _probe_venv_python(venv_dir: Path) -> Path | None:
+    if sys.platform.startswith("win"):
+        candidates = [venv_dir / "Scripts" / "python.exe"]
+    else:
+        candidates = [venv_dir / "bin" / "python3", venv_dir / "bin" / "python"]
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def resolve_venv_python(venv_dir: Path, use_cache: bool = True) -> Path | None:
+    """返回 venv 内的 Python 解释器路径，找不到时返回 None。"""
+    cache_file = venv_dir / _CACHE_NAME
+    if use_cache:
+        try:
+            cached = cache_file.read_text(encoding="utf-8").strip()
+        except OSError:
+            cached = ""
+        if cached:
+            return Path(cached)
+
+    python = _probe_venv_python(venv_dir)
+    if python is not None:
+        try:
+            cache_file.write_text(str(python), encoding="utf-8")
+        except OSError:
+            logger.debug(f"无法写入解释器缓存: {cache_file}")
+    return python
+
+
+def _flush_logs() -> None:
+    """exec 不会执行 atexit，替换进程前先把日志和标准输出刷干净。"""
+    complete = getattr(logger, "complete", None)
+    if complete is not None:
+        complete()
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+
+def _reprobe(venv_dir: Path, stale: str, error: OSError) -> str:
+    """缓存的解释器路径已失效（venv 被重建）时清除缓存并重新探测，找不到可用的解释器则退出。"""
+    try:
+        (venv_dir / _CACHE_NAME).unlink()
+    except OSError:
+        pass
+    python = resolve_venv_python(venv_dir, use_cache=False)
+    if python is None or str(python) == stale:
+        logger.error(f"启动虚拟环境 Python 失败: {error}")
+        sys.exit(1)
+    logger.debug(f"解释器缓存已失效，重新探测到: {python}")
+    return str(python)
+
+
+def relaunch_in_venv(venv_dir: Path, script: str, args: list[str]):
+    """
+    使用 venv 解释器重新运行 script，本函数不会返回。
+    POSIX 下通过 os.execv 原地替换当前进程（pid、stdio 管道保持不变）；
+    Windows 下启动子进程并以其退出码退出。
+    两种方式下缓存的解释器路径失效时都会重新探测一次。
+    """
+    python = resolve_venv_python(venv_dir)
+    if python is None:
+        logger.error(f"在虚拟环境 {venv_dir} 中未找到Python解释器。")
+        sys.exit(1)
+
+    cmd = [str(python), script, *args]
+    logger.info(f"执行命令: {' '.join(cmd)}")
+
+    if os.name == "posix":
+        _flush_logs()
+        try:
+            os.execv(cmd[0], cmd)
+        except OSError as e:
+            cmd[0] = _reprobe(venv_dir, cmd[0], e)
+            os.execv(cmd[0], cmd)
+
+    try:
+        result = subprocess.run(cmd, cwd=os.getcwd(), env=os.environ.copy(), check=False)
+    except OSError as e:
+        cmd[0] = _reprobe(venv_dir, cmd[0], e)
+        result = subprocess.run(cmd, cwd=os.getcwd(), env=os.environ.copy(), check=False)
+    sys.exit(result.returncode)
@@ -0,0 +1,158 @@
+"""
+资源版本检查：
+- 对比 interface.json 中的 version 与 GitHub 最新 release 的 tag
+- 结果缓存在 config/version_cache.json，TTL 内直接使用缓存，不发起网络请求
+- 缓存过期后带 If-None-Match 条件请求，304 时只刷新检查时间
+- start_background_check() 在后台线程中执行，不阻塞 AgentServer 启动和任务执行
+"""
+
+import json
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from .config import CONFIG_DIR, get_config
+from .logger import logger
+
+CACHE_FILE = CONFIG_DIR / "version_cache.json"
+INTERFACE_FILE = CONFIG_DIR.parent / "interface.json"
+
+VERSION_CHECK_DEFAULTS = {
+    "enable_version_check": True,
+    "api_url": "https://api.github.com/repos/21dczhang/MAAGirlsWar/releases/latest",
+    "ttl": 21600,
+    "timeout": 5,
+}
+
+
+def _load_cache() -> dict:
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache: dict) -> None:
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=4, ensure_ascii=False)
+    except OSError:
+        logger.debug(f"无法写入版本缓存: {CACHE_FILE}")
+
+
+def current_version() -> str:
+    try:
+        with open(INTERFACE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f).get("version", "unknown")
+    except (OSError, ValueError):
+        return "unknown"
+
+
+def _version_key(version: str) -> tuple:
+    return tuple(int(n) for n in re.findall(r"\d+", version))
+
+
+def is_newer(latest: str, current: str) -> bool:
+    """任一版本号解析不出数字（如 interface.json 缺失时的 "unknown"）时无法比较，不报告更新。"""
+    latest_key, current_key = _version_key(latest), _version_key(current)
+    if not latest_key or not current_key:
+        return False
+    return latest_key > current_key
+
+
+def _fetch_latest(api_url: str, etag: str | None, timeout: float) -> tuple[str | None, str | None]:
+    """
+    请求最新 release。返回 (tag, etag)；服务端返回 304 时 tag 为 None。
+    """
+    request = urllib.request.Request(
+        api_url,
+        headers={"Accept": "application/vnd.github+json", "User-Agent": "MAAGirlsWar-agent"},
+    )
+    if etag:
+        request.add_header("If-None-Match", etag)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            data = json.load(response)
+            return data.get("tag_name") or data.get("name"), response.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, etag
+        raise
+
+
+def check_resource_version(force: bool = False) -> dict:
+    """
+    检查资源是否为最新版本。
+
+    Returns:
+        {
+            "is_latest": bool,
+            "current_version": str,
+            "latest_version": str | None,
+            "from_cache": bool,
+            "error": str | None,
+        }
+    """
+    conf = get_config("version_check", VERSION_CHECK_DEFAULTS)
+    current = current_version()
+    result = {
+        "is_latest": True,
+        "current_version": current,
+        "latest_version": None,
+        "from_cache": False,
+        "error": None,
+    }
+
+    cache = _load_cache()
+    # 缓存只对同一个 api_url 有效
+    if cache.get("api_url") != conf["api_url"]:
+        cache = {}
+    fresh = time.time() - cache.get("checked_at", 0) < conf["ttl"]
+
+    if cache.get("latest_version") and fresh and not force:
+        result["from_cache"] = True
+    else:
+        try:
+            latest, etag = _fetch_latest(conf["api_url"], cache.get("etag"), conf["timeout"])
+        except Exception as e:
+            result["error"] = str(e)
+            return result
+        if latest is not None:
+            cache["latest_version"] = latest
+        cache.update(api_url=conf["api_url"], etag=etag, checked_at=time.time())
+        _save_cache(cache)
+
+    latest = cache.get("latest_version")
+    result["latest_version"] = latest
+    if latest:
+        result["is_latest"] = not is_newer(latest, current)
+    return result
+
+
+def _check_and_log() -> None:
+    try:
+        version_info = check_resource_version()
+    except Exception:
+        logger.exception("资源版本检查失败")
+        return
+
+    if not version_info["is_latest"]:
+        logger.warning("检测到资源有新版本!")
+        logger.warning(f"当前资源版本: {version_info['current_version']}")
+        logger.warning(f"最新资源版本: {version_info['latest_version']}")
+    elif version_info["error"]:
+        logger.debug(f"资源版本检查遇到问题: {version_info['error']}")
+
+
+def start_background_check() -> threading.Thread | None:
+    """在后台线程中检查版本并记录日志，未启用时返回 None。"""
+    if not get_config("version_check", VERSION_CHECK_DEFAULTS).get("enable_version_check", True):
+        return None
+    thread = threading.Thread(target=_check_and_log, name="version-check", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,200 @@
+"""
+本地 wheelhouse 索引（deps/wheelhouse.json，由 tools/ci/download_deps.py 生成）：
+- 按 解释器-平台（如 cp312-win_amd64）记录每个分发包对应的 whl 文件、版本和 sha256
+- Linux 上 sysconfig 的平台为 linux_<arch>，manylinux 条目在 glibc 版本满足时同样匹配
+- 启动时只对比索引与已安装版本，缺失或版本不符的包直接按文件安装
+- 使用 pip install --no-deps --no-index <whl...>，不经过 pip 的依赖解析
+- 索引缺失、平台不匹配或校验失败时返回 None，由调用方回退到原有安装流程
+"""
+
+import hashlib
+import json
+import platform
+import re
+import sys
+import sysconfig
+from importlib import metadata
+from pathlib import Path
+
+from .logger import logger
+
+INDEX_NAME = "wheelhouse.json"
+INDEX_VERSION = 2
+
+_WHEEL_NAME = re.compile(
+    r"^(?P<name>[^-]+)-(?P<version>[^-]+)(?:-(?P<build>\d[^-]*))?"
+    r"-(?P<python>[^-]+)-(?P<abi>[^-]+)-(?P<platform>[^-]+)\.whl$"
+)
+
+
+def _normalize(name: str) -> str:
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _wheel_supported(filename: str) -> bool:
+    """
+    检查 whl 文件名中的 python / abi 标签是否适用于当前解释器。
+    平台标签在选择索引条目时已经匹配过，这里不再检查。
+    """
+    m = _WHEEL_NAME.match(filename)
+    if m is None:
+        return False
+    major, minor = sys.version_info[:2]
+    pythons = set(m.group("python").split("."))
+    abi = m.group("abi")
+
+    if pythons & {f"cp{major}{minor}", f"py{major}{minor}", f"py{major}"}:
+        return abi in ("none", "abi3", f"cp{major}{minor}")
+    # abi3 轮子适用于不低于其声明版本的 CPython
+    return abi == "abi3" and any(
+        p.startswith(f"cp{major}") and p[3:].isdigit() and int(p[3:]) <= minor
+        for p in pythons
+    )
+
+
+def _arch(platform_tag: str) -> str:
+    for arch in ("x86_64", "universal2"):
+        if platform_tag.endswith(arch):
+            return arch
+    return platform_tag.rsplit("_", 1)[-1]
+
+
+_MANYLINUX = re.compile(r"^manylinux(?:_(?P<major>\d+)_(?P<minor>\d+)|(?P<legacy>1|2010|2014))_(?P<arch>.+)$")
+# 旧式 manylinux 标签对应的 glibc 版本（PEP 600）
+_MANYLINUX_LEGACY = {"1": (2, 5), "2010": (2, 12), "2014": (2, 17)}
+
+
+def _glibc_version() -> tuple[int, int] | None:
+    name, version = platform.libc_ver()
+    if name != "glibc":
+        return None
+    try:
+        major, minor = version.split(".")[:2]
+        return int(major), int(minor)
+    except ValueError:
+        return None
+
+
+def _platform_matches(tag: str, current: str) -> bool:
+    """
+    索引条目的平台标签是否适用于当前平台。
+    macOS 的最低系统版本号不同（10_9 / 11_0）但架构一致时视为匹配；
+    manylinux 要求架构一致且所需的 glibc 版本不高于当前系统。
+    """
+    if tag == current:
+        return True
+    if current.startswith("macosx") and tag.startswith("macosx"):
+        return _arch(tag) == _arch(current)
+    if current.startswith("linux_"):
+        m = _MANYLINUX.match(tag)
+        if m is None or m.group("arch") != current[len("linux_"):]:
+            return False
+        glibc = _glibc_version()
+        if m.group("legacy"):
+            required = _MANYLINUX_LEGACY[m.group("legacy")]
+        else:
+            required = (int(m.group("major")), int(m.group("minor")))
+        return glibc is not None and glibc >= required
+    return False
+
+
+def _current_platform_keys(index_platforms) -> list[str]:
+    """在索引里挑出与当前解释器版本和平台匹配的条目，与平台标签完全一致的排在前面。"""
+    current = sysconfig.get_platform().replace("-", "_").replace(".", "_")
+    python = f"cp{sys.version_info[0]}{sys.version_info[1]}"
+    keys = []
+    for key, entry in index_platforms.items():
+        tag = entry.get("platform", key)
+        if entry.get("python") != python or not _platform_matches(tag, current):
+            continue
+        if tag == current:
+            keys.insert(0, key)
+        else:
+            keys.append(key)
+    return keys
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_index(deps_dir: Path) -> dict | None:
+    try:
+        with open(deps_dir / INDEX_NAME, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != INDEX_VERSION:
+        return None
+    return index
+
+
+def plan_install(deps_dir: Path) -> list[Path] | None:
+    """
+    根据索引计算需要安装的 whl 列表。
+    返回 [] 表示索引中的包均已安装且版本一致；返回 None 表示无法使用索引。
+    """
+    index = load_index(deps_dir)
+    if index is None:
+        return None
+
+    platforms = index.get("platforms", {})
+    keys = _current_platform_keys(platforms)
+    if not keys:
+        logger.debug(f"wheelhouse 索引中没有当前平台 {sysconfig.get_platform()}")
+        return None
+    entry = platforms[keys[0]]
+
+    wheels = entry.get("wheels", {})
+    missing = [r for r in index.get("requirements", []) if _normalize(r) not in wheels]
+    if missing:
+        logger.debug(f"wheelhouse 索引缺少依赖: {missing}")
+        return None
+
+    to_install = []
+    for name, info in wheels.items():
+        if not _wheel_supported(info["file"]):
+            logger.debug(f"wheelhouse 中的 {info['file']} 不适用于当前解释器")
+            return None
+        try:
+            if metadata.version(name) == info["version"]:
+                continue
+        except metadata.PackageNotFoundError:
+            pass
+
+        path = deps_dir / entry.get("dir", "") / info["file"]
+        if not path.exists() or _sha256(path) != info["sha256"]:
+            logger.warning(f"wheelhouse 文件缺失或校验失败: {path}")
+            return None
+        to_install.append(path)
+
+    return to_install
+
+
+def install_from_wheelhouse(deps_dir: Path, run_pip) -> bool | None:
+    """
+    按索引直接安装 whl。
+    run_pip(args: list[str]) -> bool 负责实际调用 pip（便于沿用调用方的输出处理）。
+    返回 True/False 表示安装结果，None 表示索引不可用需回退。
+    """
+    wheels = plan_install(deps_dir)
+    if wheels is None:
+        return None
+    if not wheels:
+        logger.debug("wheelhouse 中的依赖均已安装")
+        return True
+
+    logger.info(f"从 wheelhouse 安装 {len(wheels)} 个 whl")
+    return run_pip(
+        [
+            "install",
+            "--no-deps",
+            "--no-index",
+            "--no-warn-script-location",
+            *[str(w) for w in wheels],
+        ]
+    )
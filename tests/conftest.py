@@ -0,0 +1,8 @@
+import sys
+
+
+def pytest_sessionfinish(session, exitstatus):
+    # agent 的 logger 在退出时还会输出限流汇总，此时 pytest 已关闭捕获的 stderr
+    module = sys.modules.get("utils.logger")
+    if module is not None and hasattr(module.logger, "remove"):
+        module.logger.remove()
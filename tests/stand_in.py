@@ -0,0 +1,115 @@
+"""
+测试用的本地 HTTP 服务，代替远程 API / 镜像源 / 资源服务器。
+
+    with StandIn({"/api/manifest.json": {"updated": 1}}, latency=0.05) as server:
+        url = server.url("/api/manifest.json")
+
+routes 的值可以是 dict / list（按 JSON 返回）、str / bytes，
+或 (状态码, 响应头, body) 元组；未列出的路径返回 404。
+200 响应自动带 ETag，请求带上匹配的 If-None-Match 时返回 304。
+"""
+
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _encode(body) -> bytes:
+    if isinstance(body, (dict, list)):
+        return json.dumps(body).encode("utf-8")
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    return body
+
+
+class StandIn:
+    def __init__(self, routes: dict | None = None, latency: float = 0.0):
+        self.routes = routes if routes is not None else {}
+        self.latency = latency
+        # [(方法, 路径, 请求头)]
+        self.requests = []
+        self.not_modified = 0
+        self.connections = set()
+        self._lock = threading.Lock()
+        self._server = None
+
+    def url(self, path: str = "") -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def count(self, path: str) -> int:
+        with self._lock:
+            return sum(1 for _, p, _ in self.requests if p == path)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.connections.clear()
+            self.not_modified = 0
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _respond(self, send_body: bool):
+                path = self.path.split("?", 1)[0]
+                with stand_in._lock:
+                    stand_in.requests.append((self.command, path, dict(self.headers)))
+                    stand_in.connections.add(self.client_address)
+                if stand_in.latency:
+                    time.sleep(stand_in.latency)
+
+                route = stand_in.routes.get(path)
+                if route is None:
+                    status, headers, body = 404, {}, b""
+                elif isinstance(route, tuple):
+                    status, headers, body = route[0], dict(route[1]), _encode(route[2])
+                else:
+                    status, headers, body = 200, {}, _encode(route)
+
+                if status == 200:
+                    etag = '"%s"' % hashlib.md5(body).hexdigest()
+                    headers.setdefault("ETag", etag)
+                    if self.headers.get("If-None-Match") == headers["ETag"]:
+                        with stand_in._lock:
+                            stand_in.not_modified += 1
+                        status, body = 304, b""
+
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._respond(True)
+
+            def do_HEAD(self):
+                self._respond(False)
+
+        return Handler
+
+    def start(self) -> "StandIn":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StandIn":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,124 @@
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tools" / "ci"))
+import generate_manifest_cache as gmc
+from stand_in import StandIn
+
+SUB_COUNT = 20
+LATENCY = 0.05
+
+
+def make_tree() -> dict:
+    routes = {
+        "/api/manifest.json": {
+            "updated": 1,
+            "directories": [
+                {"name": "images", "manifest": "images/manifest.json"},
+                {"name": "resource", "manifest": "resource/manifest.json"},
+            ],
+        },
+        "/api/resource/manifest.json": {
+            "updated": 2,
+            "directories": [
+                {"name": f"d{i}", "manifest": f"resource/d{i}/manifest.json"} for i in range(SUB_COUNT)
+            ],
+        },
+        "/api/images/manifest.json": {"updated": 3},
+    }
+    for i in range(SUB_COUNT):
+        routes[f"/api/resource/d{i}/manifest.json"] = {"updated": 100 + i, "files": [{"name": "a"}]}
+    return routes
+
+
+class GenerateManifestCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandIn(make_tree(), latency=LATENCY).start()
+        self.addCleanup(self.server.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.output_dir = Path(tmp.name)
+
+    def generate(self) -> tuple[bool, dict]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            ok = gmc.generate_manifest_cache(self.output_dir, self.server.url("/api"))
+        cache_file = self.output_dir / "manifest_cache.json"
+        cache = json.loads(cache_file.read_text(encoding="utf-8")) if cache_file.exists() else {}
+        return ok, cache
+
+    def test_concurrent_crawl(self):
+        start = time.perf_counter()
+        ok, cache = self.generate()
+        elapsed = time.perf_counter() - start
+
+        self.assertTrue(ok)
+        fetched = SUB_COUNT + 2
+        self.assertEqual(len(cache["manifests"]), fetched)
+        self.assertEqual(cache["root_updated"], 1)
+        self.assertEqual(cache["manifests"]["resource/d7/manifest.json"], 107)
+        # 忽略的目录不请求
+        self.assertNotIn("images/manifest.json", cache["manifests"])
+        self.assertEqual(self.server.count("/api/images/manifest.json"), 0)
+        self.assertNotIn("errors", cache)
+        # 串行至少需要 fetched * LATENCY
+        self.assertLess(elapsed, fetched * LATENCY * 0.6)
+        # keep-alive：连接数不超过线程数
+        self.assertLessEqual(len(self.server.connections), gmc.MAX_WORKERS)
+
+    def test_not_modified_reuses_validators(self):
+        _, first = self.generate()
+        self.server.reset()
+        ok, second = self.generate()
+
+        self.assertTrue(ok)
+        self.assertEqual(self.server.not_modified, len(first["manifests"]))
+        self.assertEqual(second["manifests"], first["manifests"])
+        self.assertEqual(second["root_updated"], 1)
+        for method, path, headers in self.server.requests:
+            self.assertIn("If-None-Match", headers, path)
+
+    def test_changed_manifest_is_refetched(self):
+        self.generate()
+        self.server.routes["/api/resource/d3/manifest.json"] = {"updated": 999}
+        self.server.reset()
+        _, cache = self.generate()
+
+        self.assertEqual(cache["manifests"]["resource/d3/manifest.json"], 999)
+        self.assertEqual(self.server.not_modified, SUB_COUNT + 1)
+
+    def test_failed_manifest_recorded(self):
+        del self.server.routes["/api/resource/d5/manifest.json"]
+        ok, cache = self.generate()
+
+        self.assertTrue(ok)
+        self.assertEqual(cache["root_updated"], 0)
+        self.assertEqual(list(cache["errors"]), ["resource/d5/manifest.json"])
+        self.assertIn("404", cache["errors"]["resource/d5/manifest.json"])
+        self.assertNotIn("resource/d5/manifest.json", cache["manifests"])
+        self.assertEqual(len(cache["manifests"]), SUB_COUNT + 1)
+
+    def test_root_failure_writes_nothing(self):
+        del self.server.routes["/api/manifest.json"]
+        ok, cache = self.generate()
+
+        self.assertFalse(ok)
+        self.assertEqual(cache, {})
+
+    def test_redirect_followed(self):
+        moved = self.server.routes.pop("/api/resource/d1/manifest.json")
+        self.server.routes["/api/resource/d1/manifest.json"] = (302, {"Location": "/moved/d1.json"}, "")
+        self.server.routes["/moved/d1.json"] = moved
+        _, cache = self.generate()
+
+        self.assertEqual(cache["manifests"]["resource/d1/manifest.json"], 101)
+        self.assertNotIn("errors", cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
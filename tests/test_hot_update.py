@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "agent"))
+from utils import manifest_checker, resource_updater
+from stand_in import StandIn
+
+FILES = {
+    "pipeline/a.json": b'{"A": {}}',
+    "pipeline/b.json": b'{"B": {}}',
+    "image/c.png": b"\x89PNG fake",
+}
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_routes(files: dict, root_updated: int = 1, resource_updated: int = 1) -> dict:
+    routes = {
+        "/api/manifest.json": {
+            "updated": root_updated,
+            "directories": [
+                {"name": "resource", "manifest": "resource/manifest.json"},
+                {"name": "images", "manifest": "images/manifest.json"},
+            ],
+        },
+        "/api/resource/manifest.json": {
+            "updated": resource_updated,
+            "files": [{"name": name, "sha256": sha256(data)} for name, data in files.items()],
+        },
+        "/api/images/manifest.json": {"updated": 1, "files": [{"name": "x.png", "sha256": "0" * 64}]},
+    }
+    for name, data in files.items():
+        routes[f"/api/resource/{name}"] = data
+    return routes
+
+
+class HotUpdateTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        config_dir = self.root / "config"
+
+        self.server = StandIn(make_routes(FILES)).start()
+        self.addCleanup(self.server.stop)
+        conf = dict(manifest_checker.HOT_UPDATE_DEFAULTS, manifest_url=self.server.url("/api/manifest.json"))
+
+        for patcher in (
+            mock.patch.object(manifest_checker, "CACHE_FILE", config_dir / "manifest_cache.json"),
+            mock.patch.object(manifest_checker, "hot_update_config", lambda: conf),
+            mock.patch.object(resource_updater, "hot_update_config", lambda: conf),
+            mock.patch.object(resource_updater, "INDEX_FILE", config_dir / "resource_index.json"),
+            mock.patch.object(resource_updater, "RESOURCE_ROOT", self.root),
+            mock.patch.object(resource_updater, "STAGING_DIR", self.root / ".hot_update"),
+            mock.patch.object(resource_updater, "BACKUP_DIR", self.root / ".hot_update_backup"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def local(self, rel: str) -> Path:
+        return self.root / "resource" / rel
+
+    def update(self) -> tuple[dict, dict]:
+        check = manifest_checker.check_manifest_updates()
+        result = resource_updater.check_and_update_resources(
+            resource_manifests=check["updated_manifests"], manifests=check["manifests"]
+        )
+        if check["success"] and not result["error"]:
+            manifest_checker.save_manifest_cache_from_result(check)
+        return check, result
+
+    def test_manifest_diff(self):
+        check, _ = self.update()
+        self.assertTrue(check["success"])
+        self.assertEqual(check["updated_manifests"], ["resource/manifest.json"])
+        self.assertEqual(self.server.count("/api/images/manifest.json"), 0)
+
+        # 根时间戳未变：只请求根 manifest
+        self.server.reset()
+        check, _ = self.update()
+        self.assertFalse(check["has_any_update"])
+        self.assertEqual([p for _, p, _ in self.server.requests], ["/api/manifest.json"])
+
+        # 子 manifest 变化：只有它出现在 updated_manifests 中
+        self.server.routes.update(make_routes(FILES, root_updated=2, resource_updated=2))
+        check = manifest_checker.check_manifest_updates()
+        self.assertEqual(check["updated_manifests"], ["resource/manifest.json"])
+
+    def test_download_and_verify(self):
+        _, result = self.update()
+        self.assertIsNone(result["error"])
+        self.assertEqual(sorted(result["updated_files"]), sorted(f"resource/{n}" for n in FILES))
+        for name, data in FILES.items():
+            self.assertEqual(self.local(name).read_bytes(), data)
+        self.assertFalse((self.root / ".hot_update").exists())
+
+        # 只有变化的文件会重新下载
+        files = dict(FILES, **{"pipeline/b.json": b'{"B": {"next": []}}'})
+        self.server.routes.update(make_routes(files, root_updated=2, resource_updated=2))
+        self.server.reset()
+        _, result = self.update()
+        self.assertEqual(result["updated_files"], ["resource/pipeline/b.json"])
+        self.assertEqual(self.server.count("/api/resource/pipeline/a.json"), 0)
+        self.assertEqual(self.local("pipeline/b.json").read_bytes(), files["pipeline/b.json"])
+
+    def test_hash_mismatch_keeps_old_files(self):
+        self.update()
+        files = dict(FILES, **{"pipeline/a.json": b"new a", "pipeline/b.json": b"new b"})
+        self.server.routes.update(make_routes(files, root_updated=2, resource_updated=2))
+        self.server.routes["/api/resource/pipeline/b.json"] = b"corrupted"
+
+        _, result = self.update()
+        self.assertIn("哈希不匹配", result["error"])
+        self.assertEqual(result["updated_files"], [])
+        self.assertEqual(self.local("pipeline/a.json").read_bytes(), FILES["pipeline/a.json"])
+        # 失败时不保存缓存，下次仍会检查
+        cache = json.loads(manifest_checker.CACHE_FILE.read_text(encoding="utf-8"))
+        self.assertEqual(cache["root_updated"], 1)
+
+    def test_swap_failure_rolls_back(self):
+        self.update()
+        files = dict(FILES, **{"pipeline/a.json": b"new a", "pipeline/new.json": b"added", "image/c.png": b"new c"})
+        self.server.routes.update(make_routes(files, root_updated=2, resource_updated=2))
+
+        real_replace = os.replace
+
+        def flaky_replace(src, dst):
+            if Path(src).name == "c.png" and ".hot_update" in Path(src).parts:
+                raise OSError("disk full")
+            return real_replace(src, dst)
+
+        with mock.patch.object(resource_updater.os, "replace", flaky_replace):
+            _, result = self.update()
+
+        self.assertIn("disk full", result["error"])
+        for name, data in FILES.items():
+            self.assertEqual(self.local(name).read_bytes(), data)
+        self.assertFalse(self.local("pipeline/new.json").exists())
+        self.assertFalse((self.root / ".hot_update_backup").exists())
+
+        # 之后的更新照常进行
+        _, result = self.update()
+        self.assertIsNone(result["error"])
+        self.assertEqual(self.local("image/c.png").read_bytes(), b"new c")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "agent"))
+from utils import mirror_selector
+from stand_in import StandIn
+
+PROBE_PATH = "/simple/pip/"
+PROBE_PAGE = "<html><body><a href='pip-24.0.tar.gz'>pip-24.0.tar.gz</a></body></html>"
+
+
+class RankMirrorsTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_file = Path(tmp.name) / "config" / "mirror_cache.json"
+
+        self.slow = StandIn({PROBE_PATH: PROBE_PAGE}, latency=0.3).start()
+        self.fast = StandIn({PROBE_PATH: PROBE_PAGE}, latency=0.0).start()
+        self.addCleanup(self.slow.stop)
+        self.addCleanup(self.fast.stop)
+        self.mirrors = [self.slow.url("/simple"), self.fast.url("/simple")]
+
+    def probes(self) -> int:
+        return self.slow.count(PROBE_PATH) + self.fast.count(PROBE_PATH)
+
+    def test_fastest_first(self):
+        ranked = mirror_selector.rank_mirrors(self.mirrors, self.cache_file)
+        self.assertEqual(ranked, [self.fast.url("/simple"), self.slow.url("/simple")])
+        self.assertEqual(self.probes(), 2)
+
+    def test_cache_reused_within_ttl(self):
+        first = mirror_selector.rank_mirrors(self.mirrors, self.cache_file)
+        cache = json.loads(self.cache_file.read_text(encoding="utf-8"))
+        self.assertEqual(set(cache), set(self.mirrors))
+
+        second = mirror_selector.rank_mirrors(self.mirrors, self.cache_file)
+        self.assertEqual(second, first)
+        self.assertEqual(self.probes(), 2)
+
+    def test_expired_cache_probes_again(self):
+        mirror_selector.rank_mirrors(self.mirrors, self.cache_file)
+        mirror_selector.rank_mirrors(self.mirrors, self.cache_file, ttl=0)
+        self.assertEqual(self.probes(), 4)
+
+    def test_unreachable_mirror_last(self):
+        self.fast.routes.clear()
+        ranked = mirror_selector.rank_mirrors(self.mirrors, self.cache_file)
+        self.assertEqual(ranked, [self.slow.url("/simple"), self.fast.url("/simple")])
+
+    def test_mark_unreachable(self):
+        mirror_selector.rank_mirrors(self.mirrors, self.cache_file)
+        mirror_selector.mark_unreachable(self.fast.url("/simple"), self.cache_file)
+        ranked = mirror_selector.rank_mirrors(self.mirrors, self.cache_file)
+        self.assertEqual(ranked[0], self.slow.url("/simple"))
+        self.assertEqual(self.probes(), 2)
+
+    def test_recheck_keeps_reachable_mirror(self):
+        mirror_selector.rank_mirrors(self.mirrors, self.cache_file)
+        self.assertTrue(mirror_selector.recheck_mirror(self.fast.url("/simple"), self.cache_file))
+        ranked = mirror_selector.rank_mirrors(self.mirrors, self.cache_file)
+        self.assertEqual(ranked[0], self.fast.url("/simple"))
+
+    def test_recheck_demotes_unreachable_mirror(self):
+        mirror_selector.rank_mirrors(self.mirrors, self.cache_file)
+        self.fast.routes.clear()
+        self.assertFalse(mirror_selector.recheck_mirror(self.fast.url("/simple"), self.cache_file))
+        ranked = mirror_selector.rank_mirrors(self.mirrors, self.cache_file)
+        self.assertEqual(ranked[0], self.slow.url("/simple"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "agent"))
+from utils import version_checker
+from stand_in import StandIn
+
+RELEASE_PATH = "/repos/owner/repo/releases/latest"
+
+
+class IsNewerTest(unittest.TestCase):
+    def test_compares_numeric_parts(self):
+        self.assertTrue(version_checker.is_newer("v1.2.10", "v1.2.9"))
+        self.assertFalse(version_checker.is_newer("v1.2.9", "1.2.9"))
+        self.assertFalse(version_checker.is_newer("v1.2.8", "v1.2.9"))
+
+    def test_unparseable_version_is_not_an_update(self):
+        self.assertFalse(version_checker.is_newer("v1.0.0", "unknown"))
+        self.assertFalse(version_checker.is_newer("v1.0.0", "DEBUG"))
+        self.assertFalse(version_checker.is_newer("latest", "v1.0.0"))
+
+
+class VersionCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        root = Path(tmp.name)
+        self.interface = root / "interface.json"
+        self.interface.write_text(json.dumps({"version": "v1.0.0"}), encoding="utf-8")
+
+        self.server = StandIn({RELEASE_PATH: {"tag_name": "v1.1.0"}}).start()
+        self.addCleanup(self.server.stop)
+        self.conf = dict(version_checker.VERSION_CHECK_DEFAULTS, api_url=self.server.url(RELEASE_PATH), ttl=3600)
+
+        for patcher in (
+            mock.patch.object(version_checker, "CACHE_FILE", root / "config" / "version_cache.json"),
+            mock.patch.object(version_checker, "INTERFACE_FILE", self.interface),
+            mock.patch.object(version_checker, "get_config", lambda name, defaults: self.conf),
+            mock.patch.dict(os.environ, {"no_proxy": "127.0.0.1,localhost", "NO_PROXY": "127.0.0.1,localhost"}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def expire_cache(self):
+        cache = json.loads(version_checker.CACHE_FILE.read_text(encoding="utf-8"))
+        cache["checked_at"] -= self.conf["ttl"] + 1
+        version_checker.CACHE_FILE.write_text(json.dumps(cache), encoding="utf-8")
+
+    def test_fetch_then_cache_within_ttl(self):
+        first = version_checker.check_resource_version()
+        self.assertFalse(first["is_latest"])
+        self.assertEqual(first["latest_version"], "v1.1.0")
+        self.assertFalse(first["from_cache"])
+
+        second = version_checker.check_resource_version()
+        self.assertTrue(second["from_cache"])
+        self.assertEqual(second["latest_version"], "v1.1.0")
+        self.assertEqual(self.server.count(RELEASE_PATH), 1)
+
+    def test_expired_cache_sends_conditional_request(self):
+        version_checker.check_resource_version()
+        self.expire_cache()
+
+        result = version_checker.check_resource_version()
+        self.assertEqual(self.server.not_modified, 1)
+        self.assertEqual(result["latest_version"], "v1.1.0")
+        _, _, headers = self.server.requests[-1]
+        self.assertIn("If-None-Match", headers)
+
+        # 304 刷新了检查时间，TTL 内不再请求
+        version_checker.check_resource_version()
+        self.assertEqual(self.server.count(RELEASE_PATH), 2)
+
+    def test_new_release_after_expiry(self):
+        version_checker.check_resource_version()
+        self.server.routes[RELEASE_PATH] = {"tag_name": "v1.2.0"}
+        self.expire_cache()
+
+        result = version_checker.check_resource_version()
+        self.assertEqual(result["latest_version"], "v1.2.0")
+        self.assertEqual(self.server.not_modified, 0)
+
+    def test_force_bypasses_ttl(self):
+        version_checker.check_resource_version()
+        version_checker.check_resource_version(force=True)
+        self.assertEqual(self.server.count(RELEASE_PATH), 2)
+
+    def test_unknown_current_version_reports_latest(self):
+        self.interface.unlink()
+        result = version_checker.check_resource_version()
+        self.assertEqual(result["current_version"], "unknown")
+        self.assertTrue(result["is_latest"])
+
+    def test_server_error_is_reported(self):
+        self.server.routes[RELEASE_PATH] = (500, {}, "")
+        result = version_checker.check_resource_version()
+        self.assertIsNotNone(result["error"])
+        self.assertTrue(result["is_latest"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,15 +5,33 @@ JSONC 格式化工具
 - 维护字段顺序（可自定义 FIELD_ORDER）
 - 只自动补全缺失的 focus 字段（值为 null），其他字段不补
 - 自动扫描 SCAN_DIR 目录下所有 .json / .jsonc 文件并原地修改
+- 已是规范格式的文件记录内容哈希（.cache/config_polisher.json），下次直接跳过
+- 文件较多时用进程池并行格式化
+
+使用方法:
+    python ConfigPolisher.py [文件或目录 ...] [--check] [--jobs N] [--no-cache]
+
+示例:
+    python tools/ConfigPolisher.py                       # 格式化 SCAN_DIR
+    python tools/ConfigPolisher.py assets --check        # 只输出差异，可用作 pre-commit 检查
 """
 
-import re
 import sys
 import json
 import os
+import time
+import difflib
+import hashlib
+import argparse
 from pathlib import Path
 from collections import OrderedDict
 
+# 复用 agent/utils/jsonc_cst.py 的无损 JSONC 语法树
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "agent"))
+from utils import jsonc_cst
+
+from _parallel import run_tasks
+
 # ============================================================
 # 🔧 自动扫描目录（相对于脚本所在目录）
 # ============================================================
@@ -49,124 +67,56 @@ SCAN_EXTENSIONS = {".json", ".jsonc"}
 class JSONCFormatter:
     def __init__(self, text, field_order=None, indent=4):
         self.original = text
+        self.doc = None
         self.field_order = field_order or []
         self.indent = indent
 
-    def _remove_line_comment(self, line):
-        in_string = False
-        i = 0
-        while i < len(line):
-            c = line[i]
-            if c == '\\' and in_string:
-                i += 2
-                continue
-            if c == '"':
-                in_string = not in_string
-            if not in_string and i + 1 < len(line) and line[i:i+2] == '//':
-                return line[:i]
-            i += 1
-        return line
-
-    def _strip_to_plain_json(self, text):
-        lines = [self._remove_line_comment(l) for l in text.split('\n')]
-        plain = '\n'.join(lines)
-        plain = re.sub(r',\s*([}\]])', r'\1', plain)
-        return plain
-
     def parse(self):
-        plain = self._strip_to_plain_json(self.original)
+        """解析为无损语法树，数据和注释都从同一棵树中读取"""
         try:
-            return json.loads(plain, object_pairs_hook=OrderedDict)
-        except json.JSONDecodeError as e:
+            self.doc = jsonc_cst.parse(self.original, cache=True)
+            return self.doc.to_python(OrderedDict)
+        except ValueError as e:
             raise ValueError(f"JSON 解析错误: {e}")
 
+    @staticmethod
+    def _comments(child):
+        return [c.rstrip() for c in child.comments()]
+
     def extract_comments_before_keys(self):
+        """收集顶层键及其下一层键之前的整行注释"""
         comment_map = {}
-        lines = self.original.split('\n')
-        pending = []
-        depth = 0
-        current_top = None
-
-        for line in lines:
-            s = line.strip()
-
-            if s.startswith('//'):
-                pending.append(s)
-                continue
-
-            if not s:
-                if pending:
-                    pending.append('')
-                continue
-
-            for ch in s:
-                if ch in '{[':
-                    depth += 1
-                elif ch in '}]':
-                    depth -= 1
-
-            if depth == 1:
-                m = re.match(r'^\s*"([^"]+)"\s*:', line)
-                if m:
-                    current_top = m.group(1)
-                    if pending:
-                        comment_map[f'top.{current_top}'] = [c for c in pending if c != '']
-                    pending = []
-            elif depth == 2 and current_top:
-                m = re.match(r'^\s*"([^"]+)"\s*:', line)
-                if m:
-                    subkey = m.group(1)
-                    if pending:
-                        comment_map[f'{current_top}.{subkey}'] = [c for c in pending if c != '']
-                    pending = []
-            else:
-                pending = []
+        root = self.doc.value
+        if not isinstance(root, jsonc_cst.Object):
+            return comment_map
+
+        for top in root.children:
+            comments = self._comments(top)
+            if comments:
+                comment_map[f'top.{top.key}'] = comments
+            if isinstance(top.value, jsonc_cst.Object):
+                for sub in top.value.children:
+                    comments = self._comments(sub)
+                    if comments:
+                        comment_map[f'{top.key}.{sub.key}'] = comments
 
         return comment_map
 
     def extract_array_comments(self, top_key, field_key):
-        lines = self.original.split('\n')
-        result = {}
-        top_found = field_found = False
-        depth = array_depth = element_index = 0
-        pending = []
-
-        for line in lines:
-            s = line.strip()
-
-            if not top_found:
-                if re.match(rf'^\s*"{re.escape(top_key)}"\s*:', line):
-                    top_found = True
-                    depth = 0
-                continue
-
-            if not field_found:
-                if re.match(rf'^\s*"{re.escape(field_key)}"\s*:\s*\[', line):
-                    field_found = True
-                    array_depth = 1
-                    continue
-                for ch in s:
-                    if ch == '{': depth += 1
-                    elif ch == '}': depth -= 1
-                if depth < 0:
-                    break
-                continue
-
-            for ch in s:
-                if ch == '[': array_depth += 1
-                elif ch == ']': array_depth -= 1
-
-            if array_depth <= 0:
-                break
-
-            if s.startswith('//'):
-                pending.append(s)
-            elif s and s not in ('[', ']'):
-                if pending:
-                    result[element_index] = pending[:]
-                    pending = []
-                element_index += 1
+        """收集 top_key.field_key 数组中每个元素之前的整行注释，返回 {元素下标: 注释列表}"""
+        root = self.doc.value
+        node = root.member(top_key) if isinstance(root, jsonc_cst.Object) else None
+        if node is None or not isinstance(node.value, jsonc_cst.Object):
+            return {}
+        field = node.value.member(field_key)
+        if field is None or not isinstance(field.value, jsonc_cst.Array):
+            return {}
 
+        result = {}
+        for index, item in enumerate(field.value.children):
+            comments = self._comments(item)
+            if comments:
+                result[index] = comments
         return result
 
     def reorder_fields(self, obj):
@@ -263,60 +213,168 @@ class JSONCFormatter:
         return '\n'.join(out)
 
 
-def process_file(path: Path) -> bool:
+def polish_text(text: str) -> tuple[str | None, str | None]:
+    """格式化一段文本，返回 (结果, 错误信息)；供进程池调用，必须是模块级函数"""
     try:
-        text = path.read_text(encoding='utf-8')
-    except Exception as e:
-        print(f"  ⚠️  读取失败: {e}")
-        return False
+        return JSONCFormatter(text, field_order=FIELD_ORDER).format(), None
+    except ValueError as e:
+        return None, str(e)
+
+
+# ============================================================
+# 增量缓存：记录已是规范格式的文件内容哈希，未变化的文件不再解析
+# 键中包含本脚本和 jsonc_cst 的源码哈希，格式规则变化后自动失效
+# ============================================================
+CACHE_FILE = Path(__file__).resolve().parent.parent / ".cache" / "config_polisher.json"
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _rules_key() -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(Path(__file__).read_bytes())
+    h.update(Path(jsonc_cst.__file__).read_bytes())
+    return h.hexdigest()
 
+
+def load_cache() -> dict:
     try:
-        formatter = JSONCFormatter(text, field_order=FIELD_ORDER)
-        result = formatter.format()
-    except ValueError as e:
-        print(f"  ❌ {e}")
-        return False
+        cache = json.loads(CACHE_FILE.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get('rules') != _rules_key():
+        return {}
+    return cache.get('files', {})
 
-    if result == text:
-        return False
 
-    path.write_text(result, encoding='utf-8')
-    return True
+def save_cache(files: dict) -> None:
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        CACHE_FILE.write_text(json.dumps({'rules': _rules_key(), 'files': files}), encoding='utf-8')
+    except OSError:
+        pass
 
 
-def main():
-    script_dir = Path(sys.argv[0]).resolve().parent
-    scan_path = (script_dir / SCAN_DIR).resolve()
+def collect_files(targets: list) -> list:
+    files = set()
+    for target in targets:
+        if target.is_dir():
+            files.update(
+                p for p in target.rglob('*')
+                if p.is_file() and p.suffix.lower() in SCAN_EXTENSIONS
+            )
+        elif target.is_file():
+            files.add(target)
+    return sorted(files)
 
-    if not scan_path.exists():
-        print(f"❌ 目录不存在: {scan_path}")
-        print(f"   请确认 SCAN_DIR = {SCAN_DIR!r} 配置是否正确")
-        sys.exit(1)
 
-    files = [
-        p for p in scan_path.rglob('*')
-        if p.is_file() and p.suffix.lower() in SCAN_EXTENSIONS
-    ]
+def polish_all(texts: list, jobs: int) -> list:
+    """批量格式化；文件较多且 jobs > 1 时使用进程池"""
+    return run_tasks(polish_text, texts, jobs)
 
+
+def main():
+    parser = argparse.ArgumentParser(description="JSONC 格式化工具（保留注释、统一字段顺序）")
+    parser.add_argument("paths", nargs="*", help=f"要处理的文件或目录（默认: 脚本目录下的 {SCAN_DIR}）")
+    parser.add_argument("--check", action="store_true", help="只检查并输出差异，不修改文件；有差异时退出码为 1")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="并行进程数（默认: CPU 核数，1 表示不并行）")
+    parser.add_argument("--no-cache", action="store_true", help="忽略增量缓存和解析缓存，重新格式化所有文件")
+    args = parser.parse_args()
+
+    if args.paths:
+        targets = [Path(p).resolve() for p in args.paths]
+        missing = [p for p in targets if not p.exists()]
+        if missing:
+            print(f"❌ 路径不存在: {', '.join(map(str, missing))}")
+            sys.exit(1)
+        base = targets[0] if len(targets) == 1 and targets[0].is_dir() else Path.cwd()
+    else:
+        script_dir = Path(sys.argv[0]).resolve().parent
+        # SCAN_DIR 按 Windows 风格书写，拆开后在各平台上都能拼出正确路径
+        scan_path = script_dir.joinpath(*SCAN_DIR.replace('\\', '/').split('/')).resolve()
+        if not scan_path.exists():
+            print(f"❌ 目录不存在: {scan_path}")
+            print(f"   请确认 SCAN_DIR = {SCAN_DIR!r} 配置是否正确")
+            sys.exit(1)
+        targets = [scan_path]
+        base = scan_path
+        print(f"📂 扫描目录: {scan_path}")
+
+    start = time.perf_counter()
+    files = collect_files(targets)
     if not files:
-        print(f"⚠️  目录下未找到 JSON 文件: {scan_path}")
+        print("⚠️  未找到 JSON 文件")
         sys.exit(0)
-
-    print(f"📂 扫描目录: {scan_path}")
     print(f"   共找到 {len(files)} 个文件\n")
 
-    changed = 0
-    for f in sorted(files):
-        rel = f.relative_to(scan_path)
-        modified = process_file(f)
-        if modified:
-            print(f"  ✅ 已更新: {rel}")
-            changed += 1
+    if args.no_cache:
+        # 同时关闭 jsonc_cst 的解析缓存（进程池 worker 继承环境变量）
+        os.environ["MAA_JSONC_CACHE"] = "0"
+    cache = {} if args.no_cache else load_cache()
+    new_cache = {}
+    pending = []  # (路径, 文本, 键, 原始字节摘要)
+    for f in files:
+        key = str(f)
+        try:
+            raw = f.read_bytes()
+        except OSError as e:
+            print(f"  ⚠️  读取失败: {_rel(f, base)}: {e}")
+            continue
+        digest = _digest(raw)
+        if cache.get(key) == digest:
+            new_cache[key] = digest
+            continue
+        try:
+            # 统一按 LF 比较，避免 Windows 下 CRLF 文件每次都被判定为有改动
+            pending.append((f, raw.decode('utf-8').replace('\r\n', '\n'), key, digest))
+        except UnicodeDecodeError as e:
+            print(f"  ⚠️  读取失败: {_rel(f, base)}: {e}")
+
+    results = polish_all([text for _, text, _, _ in pending], args.jobs)
+
+    changed = failed = 0
+    for (f, text, key, digest), (result, error) in zip(pending, results):
+        rel = _rel(f, base)
+        if error:
+            print(f"  ❌ {rel}: {error}")
+            failed += 1
+            continue
+        if result == text:
+            new_cache[key] = digest
+            continue
+
+        changed += 1
+        if args.check:
+            print(f"  ✏️  需要格式化: {rel}")
+            sys.stdout.writelines(difflib.unified_diff(
+                text.splitlines(keepends=True), result.splitlines(keepends=True),
+                fromfile=f"a/{rel}", tofile=f"b/{rel}",
+            ))
+            print()
         else:
-            print(f"  ─  无变化: {rel}")
+            f.write_text(result, encoding='utf-8', newline='\n')
+            new_cache[key] = _digest(result.encode('utf-8'))
+            print(f"  ✅ 已更新: {rel}")
+
+    # 保留本次未涉及的其他文件的缓存条目
+    save_cache({**{k: v for k, v in cache.items() if k not in new_cache}, **new_cache})
 
-    print(f"\n完成：{changed}/{len(files)} 个文件已更新")
+    elapsed = (time.perf_counter() - start) * 1000
+    skipped = len(files) - len(pending)
+    verb = "需要格式化" if args.check else "已更新"
+    print(f"\n完成：{changed}/{len(files)} 个文件{verb}，{skipped} 个命中缓存，耗时 {elapsed:.0f} ms")
+    if failed or (args.check and changed):
+        sys.exit(1)
+
+
+def _rel(path: Path, base: Path) -> str:
+    try:
+        return str(path.relative_to(base))
+    except ValueError:
+        return str(path)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
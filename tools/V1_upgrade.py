@@ -1,18 +1,53 @@
-from math import e
+"""
+Pipeline V1 -> V2 升级工具：把节点中平铺的 action / recognition 参数收进
+"action": {"type", "param"} 与 "recognition": {"type", "param"}。
+
+默认（索引模式）:
+    1. 扫描一遍所有 pipeline 文件和 interface.json，建立需要升级的节点索引
+       （已是 V2 写法的节点不会进入索引，重复运行不会改坏已升级的文件）
+    2. 只重写索引中涉及的文件，并且只替换其中需要升级的节点，其余内容和注释原样保留；
+       文件较多时用进程池并行
+       被升级的节点会重新序列化：字段前独占一行的注释随字段移到新位置，
+       行尾注释和字段值内部（如数组元素之间）的注释会丢失
+    --dry-run 只输出 unified diff，不写文件
+
+--full 为原来的整文件模式：每个文件都用 json.dump 重写（会丢失注释）。
+
+使用方法:
+    python tools/V1_upgrade.py [--dry-run] [--jobs N] [--full] [--assets 目录]
+"""
+
 import os
+import sys
 import json
+import time
+import difflib
+import argparse
+from pathlib import Path
+
+# 复用 agent/utils/jsonc.py 的 JSONC 解析与 jsonc_cst.py 的无损语法树，批量读取时使用磁盘解析缓存（cache=True）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "agent"))
+from utils import jsonc, jsonc_cst
+
+from _parallel import run_tasks
+
 
+def resolve_resource_path(path: str, current_dir: str) -> str:
+    """把 interface.json 中的资源路径（./resource、{PROJECT_DIR}/resource 等）解析为绝对路径"""
+    path = path.replace("{PROJECT_DIR}", current_dir)
+    return os.path.normpath(os.path.join(current_dir, path))
 
-def get_unique_resource_paths():
+
+def get_unique_resource_paths(current_dir=None):
     # 获取当前脚本所在目录
-    current_dir = os.path.join(os.getcwd(), "assets")
+    if current_dir is None:
+        current_dir = os.path.join(os.getcwd(), "assets")
     # 构建 interface.json 文件的路径
     json_file_path = os.path.join(current_dir, "interface.json")
 
     try:
         # 打开并读取 JSON 文件
-        with open(json_file_path, "r", encoding="utf-8") as file:
-            data = json.load(file)
+        data = jsonc.load(json_file_path, cache=True)
 
         # 提取 resource 键的值
         resource_list = data.get("resource", [])
@@ -21,9 +56,8 @@ def get_unique_resource_paths():
         for resource in resource_list:
             paths = resource.get("path", [])
             for path in paths:
-                # 替换 . 为当前工作目录
-                full_path = path.replace(".", current_dir)
-                unique_paths.add(full_path)
+                # 相对路径以 assets 目录为基准（不能简单替换 "."，否则 ../ 和带点的目录名会被改坏）
+                unique_paths.add(resolve_resource_path(path, current_dir))
 
         return sorted(list(unique_paths))
     except FileNotFoundError:
@@ -54,6 +88,54 @@ def get_pipeline_files(input_path):
     return file_paths
 
 
+# V1 中平铺在节点上、V2 中收进 action.param 的字段
+ACTION_FIELDS = [
+    "target",
+    "target_offset",
+    "begin",
+    "end",
+    "duration",
+    "begin_offset",
+    "end_offset",
+    "starting",
+    "key",
+    "package",
+    "input_text",
+    "custom_action",
+    "custom_action_param",
+    "exec",
+    "args",
+    "detach",
+]
+
+# V1 中平铺在节点上、V2 中收进 recognition.param 的字段
+RECOGNITION_FIELDS = [
+    "only_rec",
+    "roi",
+    "replace",
+    "roi_offset",
+    "expected",
+    "expected_code",
+    "template",
+    "template_code",
+    "green_mask",
+    "index",
+    "method",
+    "threshold",
+    "order_by",
+    "count",
+    "detector",
+    "connected",
+    "upper",
+    "lower",
+    "ratio",
+    "model",
+    "labels",
+    "custom_recognition",
+    "custom_recognition_param",
+]
+
+
 def process_node(node):
     """
     处理 JSON 节点中的 action 和 recognition 字段。
@@ -61,90 +143,46 @@ def process_node(node):
     :param node: JSON 节点
     :return: 处理后的 JSON 节点
     """
-    action_fields = [
-        "target",
-        "target_offset",
-        "begin",
-        "end",
-        "duration",
-        "begin_offset",
-        "end_offset",
-        "starting",
-        "key",
-        "package",
-        "input_text",
-        "custom_action",
-        "custom_action_param",
-        "exec",
-        "args",
-        "detach",
-    ]
-    recognition_fields = [
-        "only_rec",
-        "roi",
-        "replace",
-        "roi_offset",
-        "expected",
-        "expected_code",
-        "template",
-        "template_code",
-        "green_mask",
-        "index",
-        "method",
-        "threshold",
-        "order_by",
-        "count",
-        "detector",
-        "connected",
-        "upper",
-        "lower",
-        "ratio",
-        "model",
-        "labels",
-        "custom_recognition",
-        "custom_recognition_param",
-    ]
+    # 已是 V2 写法（action / recognition 为对象）的部分保持不变，重复运行不会再套一层
+    if not isinstance(node.get("action"), dict):
+        _upgrade_part(node, "action", ACTION_FIELDS)
+    if not isinstance(node.get("recognition"), dict):
+        _upgrade_part(node, "recognition", RECOGNITION_FIELDS)
 
-    # 处理 action 字段
-    action_params = {}
-    original_action_type = node.get("action")
-    for field in action_fields:
-        if field in node:
-            action_params[field] = node.pop(field)
-    # 当 type 和 action_params 都为空时，不写入action 字段
-    if original_action_type or action_params:
-        node["action"] = {
-            **(
-                {"type": original_action_type}
-                if original_action_type and original_action_type != "Unknown"
-                else {}
-            ),
-            **({"param": action_params} if action_params else {}),
-        }
-    else:
-        node.pop("action", None)
+    return node
 
-    # 处理 recognition 字段
-    recognition_params = {}
-    original_recognition_type = node.get("recognition")
-    for field in recognition_fields:
-        if field in node:
-            recognition_params[field] = node.pop(field)
 
-    # 当 type 和 recognition_params 都为空时，不写入 recognition 字段
-    if original_recognition_type or recognition_params:
-        node["recognition"] = {
+def _upgrade_part(node, name, fields):
+    """把平铺的参数收进 node[name] = {"type": ..., "param": {...}}"""
+    params = {}
+    original_type = node.get(name)
+    for field in fields:
+        if field in node:
+            params[field] = node.pop(field)
+    # 当 type 和 params 都为空时，不写入该字段
+    if original_type or params:
+        node[name] = {
             **(
-                {"type": original_recognition_type}
-                if original_recognition_type and original_recognition_type != "Unknown"
+                {"type": original_type}
+                if original_type and original_type != "Unknown"
                 else {}
             ),
-            **({"param": recognition_params} if recognition_params else {}),
+            **({"param": params} if params else {}),
         }
     else:
-        node.pop("recognition", None)
+        node.pop(name, None)
 
-    return node
+
+def needs_upgrade(node) -> bool:
+    """节点是否仍是 V1 写法（有平铺参数，或 action / recognition 为字符串）"""
+    if not isinstance(node, dict):
+        return False
+    for name, fields in (("action", ACTION_FIELDS), ("recognition", RECOGNITION_FIELDS)):
+        if isinstance(node.get(name), dict):
+            continue
+        if node.get(name) or any(field in node for field in fields):
+            return True
+    return False
 
 
 def process_pipeline_override(pipeline_override):
@@ -189,8 +227,7 @@ def modify_json_file(file_path):
     :return: 若操作成功返回 True，否则返回 False
     """
     try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            data = json.load(file)
+        data = jsonc.load(file_path, cache=True)
 
         if "interface.json" in file_path:
             data = traverse_and_modify(data)
@@ -209,9 +246,175 @@ def modify_json_file(file_path):
         return False
 
 
-def main():
-    # 获取唯一资源路径
-    resource_paths = get_unique_resource_paths()
+# ============================================================
+# 索引模式
+# ============================================================
+
+
+def find_upgrade_targets(data, is_interface: bool) -> list:
+    """返回文件中需要升级的节点路径，路径为从根开始的键 / 下标元组"""
+    if not is_interface:
+        if not isinstance(data, dict):
+            return []
+        return [(key,) for key, value in data.items() if needs_upgrade(value)]
+
+    # interface.json：与 traverse_and_modify 相同，查找任意层级的 pipeline_override
+    targets = []
+
+    def walk(obj, path):
+        if isinstance(obj, dict):
+            override = obj.get("pipeline_override")
+            if isinstance(override, dict):
+                for key, value in override.items():
+                    if needs_upgrade(value):
+                        targets.append(path + ("pipeline_override", key))
+            for key, value in obj.items():
+                walk(value, path + (key,))
+        elif isinstance(obj, list):
+            for index, item in enumerate(obj):
+                walk(item, path + (index,))
+
+    walk(data, ())
+    return targets
+
+
+def build_index(files: list) -> dict:
+    """扫描所有文件一次，返回 {文件路径: [需要升级的节点路径]}，只包含有待升级节点的文件"""
+    index = {}
+    for file_path in files:
+        try:
+            data = jsonc.load(file_path, cache=True)
+        except Exception as e:
+            print(f"扫描文件 {file_path} 时出错: {e}")
+            continue
+        targets = find_upgrade_targets(data, os.path.basename(file_path) == "interface.json")
+        if targets:
+            index[file_path] = targets
+    return index
+
+
+def _locate(container, path):
+    """沿路径在语法树中找到目标节点所在的成员 / 元素"""
+    child = None
+    for key in path:
+        if isinstance(container, jsonc_cst.Object):
+            child = container.member(key)
+        elif isinstance(container, jsonc_cst.Array) and isinstance(key, int):
+            child = container.children[key] if key < len(container.children) else None
+        else:
+            child = None
+        if child is None:
+            raise KeyError("/".join(map(str, path)))
+        container = child.value
+    return child
+
+
+def _dump_node(node, before: str) -> str:
+    """
+    序列化升级后的节点：原节点独占一行时按 4 空格缩进展开，续行接在原有缩进之后；
+    原节点写在一行内（如 interface.json 中内联的 pipeline_override）时保持单行
+    """
+    if "\n" not in before:
+        return json.dumps(node, ensure_ascii=False)
+    base_indent = jsonc_cst.indent_of(before)
+    return json.dumps(node, ensure_ascii=False, indent=4).replace("\n", "\n" + base_indent)
+
+
+def _find_member(obj, key: str):
+    """在对象及其嵌套对象中按层序查找第一个同名成员"""
+    pending = [obj]
+    while pending:
+        container = pending.pop(0)
+        for member in container.children:
+            if member.key == key:
+                return member
+            if isinstance(member.value, jsonc_cst.Object):
+                pending.append(member.value)
+    return None
+
+
+def _carry_comments(old, new) -> None:
+    """
+    把旧节点中字段前独占一行的注释移到新节点里的同名字段之前（字段可能已收进 action / recognition.param），
+    找不到同名字段时放到第一个字段之前；单行节点里放不下整行注释，不做迁移
+    """
+    if not isinstance(old, jsonc_cst.Object) or not isinstance(new, jsonc_cst.Object) or not new.children:
+        return
+    for member in old.children:
+        comments = member.comments()
+        if not comments:
+            continue
+        target = _find_member(new, member.key) or new.children[0]
+        if "\n" not in target.before:
+            continue
+        indent = jsonc_cst.indent_of(target.before)
+        target.before = "".join(f"\n{indent}{comment}" for comment in comments) + target.before
+
+
+def upgrade_file(task) -> tuple:
+    """
+    只替换文件中需要升级的节点，其余内容原样保留；节点内字段前的整行注释随字段迁移。
+    task 为 (文件路径, 节点路径列表, 是否试运行)，返回 (文件路径, 升级节点数, diff 文本, 错误信息)。
+    """
+    file_path, targets, dry_run = task
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            text = f.read()
+        doc = jsonc_cst.parse(text, cache=True)
+        for path in targets:
+            member = _locate(doc.value, path)
+            old = member.value
+            node = process_node(jsonc_cst.to_python(old))
+            member.value = jsonc_cst.parse_value(_dump_node(node, member.before))
+            _carry_comments(old, member.value)
+        result = doc.dumps()
+    except Exception as e:
+        return file_path, 0, None, str(e)
+
+    if dry_run:
+        diff = "".join(difflib.unified_diff(
+            text.splitlines(keepends=True), result.splitlines(keepends=True),
+            fromfile=file_path, tofile=file_path,
+        ))
+        return file_path, len(targets), diff, None
+
+    # 固定写出 LF，避免 Windows 下把整个文件改成 CRLF
+    with open(file_path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(result)
+    return file_path, len(targets), None, None
+
+
+def upgrade_indexed(files: list, dry_run: bool, jobs: int) -> None:
+    start = time.perf_counter()
+    index = build_index(files)
+    scan_ms = (time.perf_counter() - start) * 1000
+
+    node_count = sum(len(targets) for targets in index.values())
+    print(f"扫描 {len(files)} 个文件（{scan_ms:.0f} ms）：{len(index)} 个文件中共 {node_count} 个节点需要升级")
+    if not index:
+        return
+
+    tasks = [(file_path, targets, dry_run) for file_path, targets in index.items()]
+    start = time.perf_counter()
+    results = run_tasks(upgrade_file, tasks, jobs)
+    rewrite_ms = (time.perf_counter() - start) * 1000
+
+    failed = 0
+    for file_path, count, diff, error in results:
+        if error:
+            failed += 1
+            print(f"修改文件失败: {file_path}: {error}")
+        elif dry_run:
+            sys.stdout.write(diff)
+        else:
+            print(f"成功修改文件: {file_path}（{count} 个节点）")
+
+    verb = "需要升级" if dry_run else "已升级"
+    print(f"\n完成：{len(index) - failed} 个文件{verb}，{failed} 个失败，重写耗时 {rewrite_ms:.0f} ms")
+
+
+def upgrade_full(resource_paths: list, interface_file_path: str) -> None:
+    """原来的整文件模式：逐个文件读取、转换后用 json.dump 重写"""
     for path in resource_paths:
         # 获取每个路径下 pipeline 文件夹内的文件路径
         pipeline_files = get_pipeline_files(path)
@@ -225,8 +428,6 @@ def main():
                     print(f"修改文件失败: {file}")
 
     # 处理 interface.json 文件
-    current_dir = os.path.join(os.getcwd(), "assets")
-    interface_file_path = os.path.join(current_dir, "interface.json")
     if os.path.exists(interface_file_path):
         success = modify_json_file(interface_file_path)
         if success:
@@ -235,5 +436,33 @@ def main():
             print(f"修改文件失败: {interface_file_path}")
 
 
+def main():
+    parser = argparse.ArgumentParser(description="将 pipeline 从 V1 写法升级为 V2 的 action / recognition 对象写法")
+    parser.add_argument("--assets", default=os.path.join(os.getcwd(), "assets"), help="interface.json 所在目录（默认: ./assets）")
+    parser.add_argument("--dry-run", action="store_true", help="只输出将要进行的修改（unified diff），不写文件")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="重写阶段的并行进程数（默认: CPU 核数）")
+    parser.add_argument("--full", action="store_true", help="使用原来的整文件重写模式（不支持 --dry-run，会丢失注释）")
+    args = parser.parse_args()
+
+    current_dir = os.path.abspath(args.assets)
+    interface_file_path = os.path.join(current_dir, "interface.json")
+    # 获取唯一资源路径
+    resource_paths = get_unique_resource_paths(current_dir)
+
+    if args.full:
+        upgrade_full(resource_paths, interface_file_path)
+        return
+
+    files = [
+        file
+        for path in resource_paths
+        for file in get_pipeline_files(path)
+        if file.endswith(".json")
+    ]
+    if os.path.exists(interface_file_path):
+        files.append(interface_file_path)
+    upgrade_indexed(files, args.dry_run, args.jobs)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,17 @@
+"""
+tools 下批量脚本共用的任务调度：
+- 任务少于 POOL_THRESHOLD 或 jobs <= 1 时直接在当前进程执行，进程池的启动开销反而更大
+- 否则交给 ProcessPoolExecutor，按每个 worker 约 4 批划分 chunksize，结果与 tasks 顺序一致
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+POOL_THRESHOLD = 32
+
+
+def run_tasks(fn, tasks: list, jobs: int, mp_context=None) -> list:
+    """对每个任务调用 fn，返回结果列表；fn 和任务需要能被 pickle（fork 启动时任务除外）"""
+    if jobs <= 1 or len(tasks) < POOL_THRESHOLD:
+        return [fn(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks)), mp_context=mp_context) as pool:
+        return list(pool.map(fn, tasks, chunksize=max(1, len(tasks) // (jobs * 4))))
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+JSONC 解析性能对比
+
+用 agent/utils/jsonc.py 与原先散落在各处的几种实现分别解析同一批文件，
+输出每种实现的总耗时、相对倍数，以及解析结果是否与 jsonc 一致。
+旧实现原样保留在本脚本中，仅用于对比。
+计时前先用 REGRESSION_CASES 中的边界用例核对 jsonc 的结果，不一致时退出码为 1。
+
+使用方法:
+    python benchmark_jsonc.py [目录或文件 ...] [--repeat N]
+
+示例:
+    python tools/benchmark_jsonc.py                          # 默认 assets/resource/pipeline 与 assets/interface.json
+    python tools/benchmark_jsonc.py assets --repeat 50
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from collections import OrderedDict
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / "agent"))
+from utils import jsonc
+
+DEFAULT_TARGETS = [
+    PROJECT_DIR / "assets" / "resource" / "pipeline",
+    PROJECT_DIR / "assets" / "interface.json",
+]
+
+
+# ============================================================
+# 旧实现：agent/utils/env.py _parse_jsonc（逐字符状态机）
+# ============================================================
+def legacy_env(text: str):
+    result = []
+    i = 0
+    n = len(text)
+    while i < n:
+        c = text[i]
+        if c == '"':
+            result.append(c)
+            i += 1
+            while i < n:
+                sc = text[i]
+                result.append(sc)
+                if sc == "\\":
+                    i += 1
+                    if i < n:
+                        result.append(text[i])
+                elif sc == '"':
+                    break
+                i += 1
+            i += 1
+            continue
+        if text[i:i+2] == "/*":
+            i += 2
+            while i < n and text[i:i+2] != "*/":
+                i += 1
+            i += 2
+            continue
+        if text[i:i+2] == "//":
+            while i < n and text[i] != "\n":
+                i += 1
+            continue
+        result.append(c)
+        i += 1
+    cleaned = "".join(result)
+    cleaned = re.sub(r",\s*([}\]])", r"\1", cleaned)
+    return json.loads(cleaned)
+
+
+# ============================================================
+# 旧实现：tools/ConfigPolisher.py JSONCFormatter._strip_to_plain_json（逐行扫描）
+# ============================================================
+def _polisher_remove_line_comment(line):
+    in_string = False
+    i = 0
+    while i < len(line):
+        c = line[i]
+        if c == '\\' and in_string:
+            i += 2
+            continue
+        if c == '"':
+            in_string = not in_string
+        if not in_string and i + 1 < len(line) and line[i:i+2] == '//':
+            return line[:i]
+        i += 1
+    return line
+
+
+def legacy_polisher(text: str):
+    lines = [_polisher_remove_line_comment(l) for l in text.split('\n')]
+    plain = '\n'.join(lines)
+    plain = re.sub(r',\s*([}\]])', r'\1', plain)
+    return json.loads(plain, object_pairs_hook=OrderedDict)
+
+
+# ============================================================
+# 旧实现：tools/migrate_pipeline_v5.py parse_jsonc（两遍逐字符扫描）
+# ============================================================
+def _migrate_remove_comments(text: str) -> str:
+    result = []
+    i = 0
+    in_string = False
+    string_char = None
+    while i < len(text):
+        if in_string:
+            if text[i] == "\\" and i + 1 < len(text):
+                result.append(text[i : i + 2])
+                i += 2
+                continue
+            elif text[i] == string_char:
+                in_string = False
+                string_char = None
+                result.append(text[i])
+                i += 1
+                continue
+            else:
+                result.append(text[i])
+                i += 1
+                continue
+        if text[i] in ('"', "'"):
+            in_string = True
+            string_char = text[i]
+            result.append(text[i])
+            i += 1
+            continue
+        if text[i : i + 2] == "//":
+            while i < len(text) and text[i] != "\n":
+                i += 1
+            continue
+        if text[i : i + 2] == "/*":
+            i += 2
+            while i < len(text) and text[i : i + 2] != "*/":
+                i += 1
+            i += 2
+            continue
+        result.append(text[i])
+        i += 1
+    return "".join(result)
+
+
+def _migrate_remove_trailing_commas(text: str) -> str:
+    result = []
+    i = 0
+    in_string = False
+    while i < len(text):
+        if in_string:
+            if text[i] == "\\" and i + 1 < len(text):
+                result.append(text[i : i + 2])
+                i += 2
+                continue
+            elif text[i] == '"':
+                in_string = False
+            result.append(text[i])
+            i += 1
+            continue
+        if text[i] == '"':
+            in_string = True
+            result.append(text[i])
+            i += 1
+            continue
+        if text[i] == ",":
+            j = i + 1
+            while j < len(text) and text[j] in " \t\n\r":
+                j += 1
+            if j < len(text) and text[j] in "]}":
+                i += 1
+                continue
+        result.append(text[i])
+        i += 1
+    return "".join(result)
+
+
+def legacy_migrate(text: str):
+    clean_text = _migrate_remove_comments(text)
+    clean_text = _migrate_remove_trailing_commas(clean_text)
+    return json.loads(clean_text, object_pairs_hook=OrderedDict)
+
+
+# ============================================================
+# 旧实现：tools/ci/install.py load_json_with_comment_and_quote（纯正则，会改坏含 ' 或 # 的字符串）
+# ============================================================
+def legacy_install(text: str):
+    mask = "::COLON_SLASH::"
+    content = text.replace('://', mask)
+    content = re.sub(r"/\*[\s\S]*?\*/", "", content)
+    content = re.sub(r"//.*", "", content)
+    content = re.sub(r"#.*", "", content)
+    content = re.sub(r"'", '"', content)
+    content = "\n".join([line.strip() for line in content.splitlines() if line.strip()])
+    content = content.replace(mask, '://')
+    return json.loads(content)
+
+
+# 资源文件里不常见、但曾经解析错的写法：(JSONC 文本, 期望结果)
+REGRESSION_CASES = [
+    # 注释里的 ] / } 不能被当成尾逗号的结束
+    ('[1, // see [a]\n 2]', [1, 2]),
+    ('{"a": 1, // note {x}\n "b": 2}', {"a": 1, "b": 2}),
+    ('[1, /* ] */ 2]', [1, 2]),
+    # 块注释结束在第一个 */
+    ('[1, /* a */ 2 /* b */]', [1, 2]),
+    ('[1 /* ** */, /***/ 2]', [1, 2]),
+    # 真正的尾逗号，其后可以有注释
+    ('[1, 2, // end ]\n]', [1, 2]),
+    ('{"a": [1, 2, /* x */ ], }', {"a": [1, 2]}),
+    # 字符串中的注释符号和逗号原样保留
+    ('{"url": "http://a//b", "s": "x, ]"}', {"url": "http://a//b", "s": "x, ]"}),
+    ('["/* not */", "//"]', ["/* not */", "//"]),
+    ('{"q": "\\"", // c\n "r": 1}', {"q": '"', "r": 1}),
+]
+
+
+def check_regressions() -> bool:
+    failed = 0
+    for text, expected in REGRESSION_CASES:
+        try:
+            result = jsonc.loads(text)
+        except Exception as e:
+            result = e
+        if result != expected:
+            failed += 1
+            print(f"  ❌ {text!r}: 期望 {expected!r}，实际 {result!r}")
+    print(f"回归用例 {len(REGRESSION_CASES) - failed}/{len(REGRESSION_CASES)} 通过\n")
+    return not failed
+
+
+IMPLEMENTATIONS = [
+    ("jsonc", jsonc.loads),
+    ("jsonc（缓存命中）", lambda text: jsonc.loads(text, cache=True)),
+    ("env._parse_jsonc", legacy_env),
+    ("ConfigPolisher", legacy_polisher),
+    ("migrate_pipeline_v5", legacy_migrate),
+    ("install.load_json", legacy_install),
+]
+
+
+def collect_files(targets: list) -> list:
+    files = []
+    for target in targets:
+        target = Path(target)
+        if target.is_dir():
+            files.extend(sorted(p for p in target.rglob("*") if p.suffix.lower() in (".json", ".jsonc")))
+        elif target.is_file():
+            files.append(target)
+    return files
+
+
+def run(texts: list, func, repeat: int) -> tuple:
+    """返回 (总耗时秒, 结果列表)，解析失败的文件结果记为异常对象"""
+    results = []
+    for text in texts:
+        try:
+            results.append(func(text))
+        except Exception as e:
+            results.append(e)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            try:
+                func(text)
+            except Exception:
+                pass
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比 JSONC 解析实现的耗时与结果")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS, help="目录或文件，默认 pipeline 目录与 interface.json")
+    parser.add_argument("--repeat", type=int, default=20, help="每种实现重复解析的轮数（默认 20）")
+    args = parser.parse_args()
+
+    files = collect_files(args.targets)
+    if not files:
+        print("未找到 JSON 文件")
+        sys.exit(1)
+
+    regressions_ok = check_regressions()
+
+    texts = [f.read_text(encoding="utf-8") for f in files]
+    size = sum(len(t.encode("utf-8")) for t in texts)
+    print(f"{len(files)} 个文件，共 {size / 1024:.1f} KiB，每种实现重复 {args.repeat} 轮\n")
+
+    baseline_time, baseline = run(texts, jsonc.loads, args.repeat)
+    print(f"{'实现':<22}{'总耗时':>10}{'每文件':>12}{'相对':>8}  结果")
+    for name, func in IMPLEMENTATIONS:
+        if func is jsonc.loads:
+            elapsed, results = baseline_time, baseline
+        else:
+            elapsed, results = run(texts, func, args.repeat)
+
+        mismatched = [
+            files[i].name for i, (a, b) in enumerate(zip(results, baseline))
+            if isinstance(a, Exception) or a != b
+        ]
+        per_file = elapsed / (args.repeat * len(texts)) * 1e6
+        status = "一致" if not mismatched else f"{len(mismatched)} 个不一致: {', '.join(mismatched[:3])}"
+        print(
+            f"{name:<22}{elapsed * 1000:>8.1f}ms{per_file:>10.1f}us"
+            f"{elapsed / baseline_time:>7.1f}x  {status}"
+        )
+
+    if not regressions_ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,37 +1,174 @@
 import sys
+import json
+import time
+import hashlib
+import argparse
+import importlib.metadata
 
 from typing import List
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 from maa.resource import Resource
 from maa.tasker import Tasker, LoggingLevelEnum
 
+# Records the content hash of bundles that passed, so unchanged bundles are skipped next time
+CACHE_FILE = Path(__file__).resolve().parent.parent / ".cache" / "check_resource.json"
 
-def check(dirs: List[Path]) -> bool:
+
+def bundle_digest(dir: Path) -> str:
+    """Hash of every file path and content under the bundle, plus the maafw version."""
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        h.update(importlib.metadata.version("maafw").encode())
+    except importlib.metadata.PackageNotFoundError:
+        pass
+    for path in sorted(p for p in dir.rglob("*") if p.is_file()):
+        h.update(path.relative_to(dir).as_posix().encode("utf-8"))
+        h.update(b"\0")
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def load_cache() -> dict:
+    try:
+        cache = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_cache(cache: dict) -> None:
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        CACHE_FILE.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+    except OSError:
+        pass
+
+
+def check_bundle(dir: Path) -> tuple:
+    """Load one bundle into its own Resource. Returns (dir, succeeded, seconds)."""
     resource = Resource()
+    start = time.perf_counter()
+    status = resource.post_bundle(dir).wait().status
+    return dir, status.succeeded, time.perf_counter() - start
+
+
+def check(dirs: List[Path], jobs: int = 0, use_cache: bool = True) -> bool:
+    cache = load_cache() if use_cache else {}
 
     print(f"Checking {len(dirs)} directories...")
 
+    results = {}
+    digests = {}
+    pending = []
     for dir in dirs:
-        print(f"Checking {dir}...")
-        status = resource.post_bundle(dir).wait().status
-        if not status.succeeded:
-            print(f"Failed to check {dir}.")
-            return False
+        if not dir.is_dir():
+            results[dir] = (False, 0.0, "not a directory")
+            continue
+        key = str(dir.resolve())
+        digests[dir] = bundle_digest(dir)
+        if cache.get(key) == digests[dir]:
+            results[dir] = (True, 0.0, "unchanged, skipped")
+            continue
+        pending.append(dir)
+
+    if pending:
+        workers = min(jobs or len(pending), len(pending))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for dir, succeeded, seconds in pool.map(check_bundle, pending):
+                results[dir] = (succeeded, seconds, None)
+                key = str(dir.resolve())
+                if succeeded:
+                    cache[key] = digests[dir]
+                else:
+                    cache.pop(key, None)
+        if use_cache:
+            save_cache(cache)
+
+    return report(dirs, results)
+
+
+def check_stack(dirs: List[Path], use_cache: bool = True) -> bool:
+    """
+    Load the directories in order into one Resource, so each later directory is
+    validated as an overlay on top of the earlier ones.
+    """
+    cache = load_cache() if use_cache else {}
+
+    print(f"Checking {len(dirs)} directories as one stack...")
+
+    missing = [dir for dir in dirs if not dir.is_dir()]
+    if missing:
+        return report(dirs, {
+            dir: (False, 0.0, "not a directory" if dir in missing else "not loaded")
+            for dir in dirs
+        })
+
+    key = "stack:" + "|".join(str(dir.resolve()) for dir in dirs)
+    digest = hashlib.blake2b("|".join(bundle_digest(dir) for dir in dirs).encode(), digest_size=16).hexdigest()
+    if cache.get(key) == digest:
+        return report(dirs, {dir: (True, 0.0, "unchanged, skipped") for dir in dirs})
+
+    resource = Resource()
+    results = {}
+    for dir in dirs:
+        if results and not all(succeeded for succeeded, _, _ in results.values()):
+            results[dir] = (False, 0.0, "not loaded, an earlier layer failed")
+            continue
+        start = time.perf_counter()
+        succeeded = resource.post_bundle(dir).wait().status.succeeded
+        results[dir] = (succeeded, time.perf_counter() - start, None)
+
+    ok = report(dirs, results)
+    if use_cache:
+        if ok:
+            cache[key] = digest
+        else:
+            cache.pop(key, None)
+        save_cache(cache)
+    return ok
+
+
+def report(dirs: List[Path], results: dict) -> bool:
+    """Print one line per directory from {dir: (succeeded, seconds, note)}."""
+    print()
+    failed = 0
+    for dir in dirs:
+        succeeded, seconds, note = results[dir]
+        failed += not succeeded
+        mark = "OK  " if succeeded else "FAIL"
+        print(f"  {mark} {dir} ({note or f'{seconds * 1000:.0f} ms'})")
+
+    if failed:
+        print(f"{failed} of {len(dirs)} directories failed.")
+        return False
 
     print("All directories checked.")
     return True
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python check_resource.py <directories...>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Load each resource bundle with MaaFramework and report the ones that fail."
+    )
+    parser.add_argument("dirs", nargs="+", type=Path, help="resource bundle directories")
+    parser.add_argument("--jobs", "-j", type=int, default=0, help="concurrent checks (default: one per directory)")
+    parser.add_argument("--no-cache", action="store_true", help="check every bundle even if unchanged")
+    parser.add_argument(
+        "--stack",
+        action="store_true",
+        help="load the directories in order into one Resource, validating later ones as overlays",
+    )
+    args = parser.parse_args()
 
     Tasker.set_stdout_level(LoggingLevelEnum.All)
 
-    dirs = [Path(arg) for arg in sys.argv[1:]]
-    if not check(dirs):
+    if args.stack:
+        ok = check_stack(args.dirs, not args.no_cache)
+    else:
+        ok = check(args.dirs, args.jobs, not args.no_cache)
+    if not ok:
         sys.exit(1)
 
 
@@ -3,24 +3,37 @@
 """
 下载Python依赖到deps目录的脚本
 自动检测当前平台并下载对应架构的wheel文件
+
+- --platform 可重复指定，一次下载多个平台，各平台的 pip download 并发执行
+- 下载的 whl 按 sha256 存入内容寻址缓存（默认 .cache/wheels），再链接到 deps 目录；
+  纯 Python 的通用 whl（*-any.whl）在下载前预先链接到各平台的暂存目录，只需下载一次
+- deps/wheelhouse.json 按 解释器-平台（如 cp312-win_amd64）记录解析出的 whl 文件、版本和 sha256；
+  Linux 可以用 linux_x86_64 或 manylinux 标签，agent 会按 glibc 版本匹配 manylinux 条目
 """
 
 import os
+import re
 import sys
+import json
+import shutil
+import hashlib
+import threading
 import subprocess
 import argparse
 import platform
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 sys.stdout.reconfigure(encoding="utf-8")  # type: ignore[attr-defined]
 
 
-def get_platform_tag():
+def get_platform_tag(verbose=True):
     """自动检测当前平台并返回对应的平台标签"""
     os_type = platform.system()
     os_arch = platform.machine()
 
-    print(f"检测到操作系统: {os_type}, 架构: {os_arch}")
+    if verbose:
+        print(f"检测到操作系统: {os_type}, 架构: {os_arch}")
 
     if os_type == "Windows":
         # 在Windows ARM64环境中，platform.machine()可能错误返回AMD64
@@ -29,7 +42,8 @@ def get_platform_tag():
 
         # 检查是否为ARM64处理器
         if "ARMv8" in processor_identifier or "ARM64" in processor_identifier:
-            print(f"检测到ARM64处理器: {processor_identifier}")
+            if verbose:
+                print(f"检测到ARM64处理器: {processor_identifier}")
             os_arch = "ARM64"
 
         # 映射platform.machine()到pip的平台标签
@@ -62,17 +76,235 @@ def get_platform_tag():
     else:
         raise ValueError(f"不支持的操作系统: {os_type}")
 
-    print(f"使用平台标签: {platform_tag}")
+    if verbose:
+        print(f"使用平台标签: {platform_tag}")
     return platform_tag
 
 
-def download_dependencies(deps_dir, platform_tag):
-    """下载依赖到指定目录"""
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent.parent / ".cache" / "wheels"
+
+WHEELHOUSE_INDEX = "wheelhouse.json"
+WHEELHOUSE_VERSION = 2
+
+WHEEL_NAME = re.compile(
+    r"^(?P<name>[^-]+)-(?P<version>[^-]+)(?:-\d[^-]*)?-[^-]+-[^-]+-[^-]+\.whl$"
+)
+# pip download 输出中本次用到的 whl（新下载或已存在）
+PIP_WHEEL_LINE = re.compile(r"(?:Saved|File was already downloaded)\s+(.+?\.whl)\s*$", re.M)
+
+
+def python_tag(python_version=None):
+    """pip 的 --python-version 可以写成 312 或 3.12，统一成 cp312"""
+    if not python_version:
+        return f"cp{sys.version_info[0]}{sys.version_info[1]}"
+    return "cp" + python_version.replace(".", "")
+
+
+def index_key(platform_tag, python_version=None):
+    """wheelhouse.json 中的条目按解释器和平台区分，如 cp312-win_amd64"""
+    return f"{python_tag(python_version)}-{platform_tag}"
+
+
+def normalize_name(name):
+    """PEP 503 名称规范化"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def read_requirement_names(requirements_file):
+    """读取 requirements.txt 中的顶层依赖名"""
+    names = []
+    for line in Path(requirements_file).read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line or line.startswith("-"):
+            continue
+        m = re.match(r"[A-Za-z0-9][A-Za-z0-9._-]*", line)
+        if m:
+            names.append(normalize_name(m.group(0)))
+    return names
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def is_universal(filename):
+    """纯 Python 的 whl 与平台无关，所有平台共用同一个文件"""
+    return filename.endswith("-any.whl")
+
+
+def link_or_copy(src, dst):
+    """把 dst 替换为 src 的硬链接；跨文件系统等无法硬链接时复制"""
+    src, dst = Path(src), Path(dst)
+    if dst.exists() and os.path.samefile(src, dst):
+        return
+    tmp = dst.with_name(dst.name + ".tmp")
+    if tmp.exists():
+        tmp.unlink()
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+
+class WheelCache:
+    """
+    内容寻址的 whl 缓存：store/<sha256 前两位>/<sha256>/<文件名>
+    各平台在 staging/<平台标签> 中下载，完成后把用到的 whl 收入 store
+    """
+
+    def __init__(self, cache_dir):
+        self.root = Path(cache_dir)
+        self.store = self.root / "store"
+        self._lock = threading.Lock()
+
+    def staging_dir(self, platform_tag):
+        path = self.root / "staging" / platform_tag
+        shutil.rmtree(path, ignore_errors=True)
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def universal_wheels(self):
+        return [p for p in self.store.glob("*/*/*.whl") if is_universal(p.name)]
+
+    def prelink_universal(self, target_dir):
+        """把缓存中的通用 whl 链接到暂存目录，pip 会直接复用而不再下载。返回链接的文件名"""
+        linked = set()
+        for cached in self.universal_wheels():
+            target = target_dir / cached.name
+            if not target.exists():
+                link_or_copy(cached, target)
+                linked.add(cached.name)
+        return linked
+
+    def add(self, path):
+        """把 whl 收入缓存，返回 (sha256, 缓存中的路径)"""
+        digest = sha256_file(path)
+        cached = self.store / digest[:2] / digest / path.name
+        with self._lock:
+            if not cached.exists():
+                cached.parent.mkdir(parents=True, exist_ok=True)
+                link_or_copy(path, cached)
+        return digest, cached
+
+    def cleanup(self):
+        shutil.rmtree(self.root / "staging", ignore_errors=True)
+
+
+def run_pip_download(cmd):
+    """执行 pip download，返回 (是否成功, stdout, stderr)"""
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    return result.returncode == 0, result.stdout, result.stderr
+
+
+def download_platform(cache, requirements_file, platform_tag, python_version=None, allow_fallback=False):
+    """
+    下载单个平台的依赖到暂存目录并收入缓存。
+    返回 (平台标签, wheelhouse 条目或 None, {文件名: 缓存路径}, 日志文本)。
+    """
+    staging = cache.staging_dir(platform_tag)
+    prelinked = cache.prelink_universal(staging)
+    log = [f"[{platform_tag}] 开始下载（已从缓存预链接 {len(prelinked)} 个通用 whl）"]
+
+    base_cmd = [
+        sys.executable,
+        "-m",
+        "pip",
+        "download",
+        "-r",
+        str(requirements_file),
+        "-d",
+        str(staging),
+        "--only-binary=:all:",
+        "--progress-bar",
+        "off",
+    ]
+    cmd = base_cmd + ["--platform", platform_tag]
+    if python_version:
+        cmd += ["--python-version", python_version]
+
+    log.append(f"执行命令: {' '.join(cmd)}")
+    ok, stdout, stderr = run_pip_download(cmd)
+    if not ok and allow_fallback and (
+        "Could not find a version" in stderr or "No matching distribution" in stderr
+    ):
+        log.append("某些包可能不支持当前平台，尝试通用下载策略...")
+        log.append(f"执行回退命令: {' '.join(base_cmd)}")
+        ok, stdout, stderr = run_pip_download(base_cmd)
+
+    if stdout:
+        log.append(stdout.rstrip())
+    if stderr:
+        log.append(("警告信息:\n" if ok else "stderr:\n") + stderr.rstrip())
+    if not ok:
+        log.append(f"[{platform_tag}] 下载失败")
+        return platform_tag, None, {}, "\n".join(log)
+
+    used = {Path(p).name for p in PIP_WHEEL_LINE.findall(stdout)}
+    if not used:
+        # 无法从 pip 输出确定本次用到的文件时，退回到暂存目录中的全部 whl
+        used = {p.name for p in staging.glob("*.whl")}
+
+    wheels, files = {}, {}
+    for filename in sorted(used):
+        m = WHEEL_NAME.match(filename)
+        if not m or not (staging / filename).exists():
+            continue
+        digest, cached = cache.add(staging / filename)
+        files[filename] = cached
+        wheels[normalize_name(m.group("name"))] = {
+            "file": filename,
+            "version": m.group("version"),
+            "sha256": digest,
+        }
+
+    reused = len(used & prelinked)
+    log.append(f"[{platform_tag}] 完成：{len(wheels)} 个 whl，其中 {reused} 个通用 whl 来自缓存")
+    entry = {"python": python_tag(python_version), "platform": platform_tag, "dir": "", "wheels": wheels}
+    return platform_tag, entry, files, "\n".join(log)
+
+
+def write_wheelhouse_index(deps_path, entries, requirements_file):
+    """
+    生成/更新 deps 目录下的 wheelhouse.json：
+    按 解释器-平台（如 cp312-win_amd64）记录每个分发包对应的 whl 文件、版本和 sha256，
+    agent 启动时据此直接安装，不再经过 pip 依赖解析。
+    不同 --python-version 的下载结果各自占一个条目，不会互相覆盖。
+    """
+    index_file = deps_path / WHEELHOUSE_INDEX
+    index = {}
+    if index_file.exists():
+        try:
+            index = json.loads(index_file.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            index = {}
+    if index.get("version") != WHEELHOUSE_VERSION:
+        index = {"version": WHEELHOUSE_VERSION, "platforms": {}}
+
+    index["requirements"] = read_requirement_names(requirements_file)
+    index["platforms"].update(entries)
+    index_file.write_text(
+        json.dumps(index, indent=4, ensure_ascii=False), encoding="utf-8"
+    )
+    for key, entry in entries.items():
+        print(f"已写入 wheelhouse 索引: {index_file} ({key}, {len(entry['wheels'])} 个 whl)")
+
+
+def download_dependencies(deps_dir, platform_tags, cache_dir=DEFAULT_CACHE_DIR, python_version=None, jobs=0):
+    """下载依赖到指定目录；platform_tags 可以是单个平台标签或列表"""
+    if isinstance(platform_tags, str):
+        platform_tags = [platform_tags]
+    platform_tags = list(dict.fromkeys(platform_tags))
+
     # 创建deps目录
     deps_path = Path(deps_dir)
     deps_path.mkdir(parents=True, exist_ok=True)
 
-    print(f"开始下载平台 {platform_tag} 的依赖到 {deps_dir}")
+    print(f"开始下载平台 {', '.join(platform_tags)} 的依赖到 {deps_dir}")
 
     # 从requirements.txt读取依赖
     requirements_file = Path("requirements.txt")
@@ -80,107 +312,85 @@ def download_dependencies(deps_dir, platform_tag):
         print("错误: requirements.txt 文件不存在")
         return False
 
-    # 首先尝试下载平台特定的wheel文件
+    cache = WheelCache(cache_dir)
+    # 通用下载策略只对当前机器的平台和解释器有意义
+    native_tag = get_platform_tag(verbose=False) if python_version is None else None
+
+    def download(platform_tag):
+        return download_platform(
+            cache, requirements_file, platform_tag, python_version,
+            allow_fallback=platform_tag == native_tag,
+        )
+
+    results = []
+    pending = platform_tags
     try:
-        cmd = [
-            sys.executable,
-            "-m",
-            "pip",
-            "download",
-            "-r",
-            str(requirements_file),
-            "-d",
-            str(deps_path),
-            "--platform",
-            platform_tag,
-            "--only-binary=:all:",
-        ]
-
-        print(f"执行命令: {' '.join(cmd)}")
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        print(result.stdout)
-
-        if result.stderr:
-            print("警告信息:")
-            print(result.stderr)
-
-        # 列出下载的文件
-        whl_files = list(deps_path.glob("*.whl"))
-        print(f"\n下载的wheel文件 ({len(whl_files)} 个):")
-        for whl_file in whl_files:
-            print(f"  {whl_file.name}")
-
-        print(f"依赖下载完成到: {deps_path}")
-        return True
-
-    except subprocess.CalledProcessError as e:
-        print(f"平台特定下载失败: {e}")
-        if e.stderr and (
-            "Could not find a version" in e.stderr
-            or "No matching distribution" in e.stderr
-        ):
-            print("某些包可能不支持当前平台，尝试通用下载策略...")
-
-            # 回退到通用下载策略（不指定平台）
-            try:
-                cmd_fallback = [
-                    sys.executable,
-                    "-m",
-                    "pip",
-                    "download",
-                    "-r",
-                    str(requirements_file),
-                    "-d",
-                    str(deps_path),
-                    "--only-binary=:all:",
-                ]
-
-                print(f"执行回退命令: {' '.join(cmd_fallback)}")
-                result = subprocess.run(
-                    cmd_fallback, check=True, capture_output=True, text=True
-                )
-                print(result.stdout)
-
-                if result.stderr:
-                    print("警告信息:")
-                    print(result.stderr)
-
-                # 列出下载的文件
-                whl_files = list(deps_path.glob("*.whl"))
-                print(f"\n下载的wheel文件 ({len(whl_files)} 个):")
-                for whl_file in whl_files:
-                    print(f"  {whl_file.name}")
-
-                print(f"通用策略下载完成到: {deps_path}")
-                return True
-
-            except subprocess.CalledProcessError as e2:
-                print(f"通用策略也失败: {e2}")
-                if e2.stdout:
-                    print("stdout:", e2.stdout)
-                if e2.stderr:
-                    print("stderr:", e2.stderr)
-                return False
-        else:
-            if e.stdout:
-                print("stdout:", e.stdout)
-            if e.stderr:
-                print("stderr:", e.stderr)
-            return False
+        # 缓存中还没有通用 whl 时先单独下载第一个平台，其余平台即可复用它下载的通用 whl
+        if len(pending) > 1 and not cache.universal_wheels():
+            results.append(download(pending[0]))
+            print(results[-1][3])
+            pending = pending[1:]
+
+        if pending:
+            workers = min(jobs or len(pending), len(pending))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for result in pool.map(download, pending):
+                    results.append(result)
+                    print(result[3])
+    finally:
+        cache.cleanup()
+
+    entries, files, failed = {}, {}, []
+    for platform_tag, entry, platform_files, _ in results:
+        if entry is None:
+            failed.append(platform_tag)
+            continue
+        entries[index_key(platform_tag, python_version)] = entry
+        files.update(platform_files)
+
+    # 各平台的 whl 放在同一目录下，文件名不同；通用 whl 只有一份
+    for filename, cached in sorted(files.items()):
+        link_or_copy(cached, deps_path / filename)
+
+    print(f"\n下载的wheel文件 ({len(files)} 个):")
+    for filename in sorted(files):
+        print(f"  {filename}")
+
+    if entries:
+        write_wheelhouse_index(deps_path, entries, requirements_file)
+    if failed:
+        print(f"以下平台下载失败: {', '.join(failed)}")
+        return False
+
+    print(f"依赖下载完成到: {deps_path}")
+    return True
 
 
 def main():
     parser = argparse.ArgumentParser(description="下载Python依赖到deps目录")
     parser.add_argument("--deps-dir", default="deps", help="依赖下载目录 (默认: deps)")
+    parser.add_argument(
+        "--platform",
+        action="append",
+        dest="platforms",
+        help="平台标签，可重复指定以同时下载多个平台 (默认: 自动检测当前平台)",
+    )
+    parser.add_argument("--python-version", help="目标 Python 版本，如 312 或 3.12 (默认: 当前解释器)")
+    parser.add_argument(
+        "--cache-dir", default=str(DEFAULT_CACHE_DIR), help="whl 缓存目录 (默认: .cache/wheels)"
+    )
+    parser.add_argument("--jobs", "-j", type=int, default=0, help="并发下载的平台数 (默认: 全部)")
 
     args = parser.parse_args()
 
     try:
-        # 自动检测平台
-        platform_tag = get_platform_tag()
+        # 未指定平台时自动检测
+        platform_tags = args.platforms or [get_platform_tag()]
 
         # 下载依赖
-        success = download_dependencies(args.deps_dir, platform_tag)
+        success = download_dependencies(
+            args.deps_dir, platform_tags, args.cache_dir, args.python_version, args.jobs
+        )
 
         if success:
             print("✅ 依赖下载成功")
@@ -6,117 +6,226 @@
 在打包时调用，将远程 manifest 的时间戳信息保存到本地，
 使用户首次启动时可以跳过不必要的检查。
 
-注意：使用 urllib 而不是 requests，因为 CI 环境中的 embed Python 可能没有 requests。
+- 并发抓取整棵 manifest 树（线程数上限 MAX_WORKERS），每个线程复用自己的 keep-alive 连接
+- 输出目录中已有 manifest_cache.json 时，带 ETag / Last-Modified 发条件请求，
+  304 的 manifest 沿用上次记录的时间戳和子 manifest 列表
+- 获取失败的 manifest 记录在缓存的 errors 中；此时不写 root_updated，用户首次启动会完整检查
+- 测试：python -m unittest discover tests（用本地 HTTP 服务代替远程 API）
+
+注意：使用标准库（http.client）而不是 requests，因为 CI 环境中的 embed Python 可能没有 requests。
 """
 
 import json
-import urllib.request
-import urllib.error
+import threading
+import http.client
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
 
 API_BASE_URL = "https://api.1999.fan/api"
-MANIFEST_URL = f"{API_BASE_URL}/manifest.json"
+ROOT_MANIFEST = "manifest.json"
 REQUEST_TIMEOUT = 10
+MAX_WORKERS = 8
+MAX_REDIRECTS = 5
+REDIRECT_CODES = {301, 302, 303, 307, 308}
 
 # 忽略的目录（不需要热更新）
 IGNORED_DIRS = {"images"}
 
 
-def _fetch_json(opener, url: str) -> dict:
-    """获取 JSON 数据"""
-    with opener.open(url, timeout=REQUEST_TIMEOUT) as response:
-        return json.loads(response.read().decode("utf-8"))
+class KeepAliveClient:
+    """每个线程按主机各持有一个 HTTP/1.1 连接，请求之间复用"""
+
+    def __init__(self, timeout: float = REQUEST_TIMEOUT):
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def _connection(self, scheme: str, host: str) -> http.client.HTTPConnection:
+        connections = self._local.__dict__.setdefault("connections", {})
+        conn = connections.get((scheme, host))
+        if conn is None:
+            # 不读取系统代理（国内服务器直连更快）
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = connections[(scheme, host)] = cls(host, timeout=self.timeout)
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def get(self, url: str, headers: dict) -> http.client.HTTPResponse:
+        """
+        返回已读完 body 的响应（body 在 response.body 中）。
+        与 urllib 的 opener 一样跟随重定向，最多 MAX_REDIRECTS 次。
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._request(url, headers)
+            location = response.getheader("Location")
+            if response.status not in REDIRECT_CODES or not location:
+                return response
+            url = urllib.parse.urljoin(url, location)
+        raise RuntimeError(f"Too many redirects: {url}")
+
+    def _request(self, url: str, headers: dict) -> http.client.HTTPResponse:
+        parts = urllib.parse.urlsplit(url)
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        for attempt in range(2):
+            conn = self._connection(parts.scheme, parts.netloc)
+            try:
+                conn.request("GET", target, headers=headers)
+                response = conn.getresponse()
+                response.body = response.read()
+                return response
+            except (http.client.HTTPException, ConnectionError):
+                # 服务器关闭了空闲连接时重连重试一次
+                conn.close()
+                if attempt:
+                    raise
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+def _load_previous(cache_file: Path) -> dict:
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
 
 
-def _collect_all_manifests(opener, manifest_path: str, collected: dict):
+def _fetch_manifest(client: KeepAliveClient, url: str, previous: dict | None) -> tuple[dict | None, dict]:
     """
-    递归收集所有 manifest 的 updated 时间戳
-    
-    Args:
-        opener: urllib opener
-        manifest_path: manifest 路径（如 "resource/manifest.json"）
-        collected: 收集结果的字典 {manifest_path: updated}
+    获取一个 manifest。
+    返回 (manifest 内容, 校验信息)；服务器返回 304 时 manifest 内容为 None。
     """
-    url = f"{API_BASE_URL}/{manifest_path}"
-    print(f"  Fetching: {manifest_path}")
-    
-    try:
-        manifest = _fetch_json(opener, url)
-        collected[manifest_path] = manifest.get("updated", 0)
-        
-        # 如果有子目录，递归获取
-        for dir_info in manifest.get("directories", []):
-            sub_manifest = dir_info.get("manifest", "")
-            if sub_manifest:
-                _collect_all_manifests(opener, sub_manifest, collected)
-    except Exception as e:
-        print(f"  Warning: Failed to fetch {manifest_path}: {e}")
-
+    headers = {"Accept": "application/json"}
+    if previous:
+        if previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+
+    response = client.get(url, headers)
+    if response.status == 304 and previous:
+        return None, previous
+    if response.status != 200:
+        raise RuntimeError(f"HTTP {response.status} {response.reason}")
+    validators = {
+        "etag": response.getheader("ETag"),
+        "last_modified": response.getheader("Last-Modified"),
+    }
+    return json.loads(response.body.decode("utf-8")), {k: v for k, v in validators.items() if v}
+
+
+def collect_manifests(base_url: str, previous: dict, max_workers: int = MAX_WORKERS) -> tuple[dict, dict, dict]:
+    """
+    并发抓取整棵 manifest 树。
+    返回 ({manifest 路径: updated}, {manifest 路径: 校验信息}, {manifest 路径: 错误信息})。
+    """
+    client = KeepAliveClient()
+    old_manifests = previous.get("manifests", {})
+    old_validators = previous.get("validators", {})
+    collected, validators, errors = {}, {}, {}
+
+    def fetch(path: str) -> tuple[int, list[dict], dict, bool]:
+        # 只有上次同时记录了时间戳和校验信息时才发条件请求
+        old = old_validators.get(path) if path in old_manifests else None
+        manifest, info = _fetch_manifest(client, f"{base_url}/{path}", old)
+        if manifest is None:
+            return old_manifests[path], old.get("directories", []), info, False
+        directories = [
+            {"name": d.get("name", ""), "manifest": d["manifest"]}
+            for d in manifest.get("directories", [])
+            if d.get("manifest")
+        ]
+        return manifest.get("updated", 0), directories, {**info, "directories": directories}, True
 
-def generate_manifest_cache(output_dir: Path) -> bool:
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = {pool.submit(fetch, ROOT_MANIFEST): ROOT_MANIFEST}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    try:
+                        updated, directories, info, modified = future.result()
+                    except Exception as e:
+                        errors[path] = str(e)
+                        print(f"  Failed: {path}: {e}")
+                        continue
+                    collected[path] = updated
+                    validators[path] = info
+                    print(f"  Fetched: {path}" if modified else f"  Not modified: {path}")
+
+                    for d in directories:
+                        child = d["manifest"]
+                        # 只有根 manifest 下的目录按 IGNORED_DIRS 过滤
+                        if path == ROOT_MANIFEST and d["name"] in IGNORED_DIRS:
+                            print(f"  Skipping ignored directory: {d['name']}")
+                            continue
+                        if child not in collected and child not in errors and child not in pending.values():
+                            pending[pool.submit(fetch, child)] = child
+    finally:
+        client.close()
+
+    return collected, validators, errors
+
+
+def generate_manifest_cache(output_dir: Path, base_url: str = API_BASE_URL) -> bool:
     """
-    从远程递归获取所有 manifest 并生成缓存文件
+    从远程并发获取所有 manifest 并生成缓存文件
     
     Args:
         output_dir: 输出目录（如 install/config）
+        base_url: manifest 服务地址，根 manifest 为 {base_url}/manifest.json
         
     Returns:
-        bool: 是否成功
+        bool: 是否成功（根 manifest 获取失败时为 False，不生成缓存）
     """
+    cache_file = output_dir / "manifest_cache.json"
+    print(f"Fetching manifests from {base_url}/{ROOT_MANIFEST}...")
+    collected, validators, errors = collect_manifests(base_url, _load_previous(cache_file))
+
+    if ROOT_MANIFEST not in collected:
+        print(f"Warning: Failed to fetch root manifest: {errors.get(ROOT_MANIFEST)}")
+        print("Skipping manifest cache generation.")
+        return False
+
+    # 构建缓存数据（扁平结构，保存所有 manifest 的时间戳）
+    # 有 manifest 获取失败时不写 root_updated，用户首次启动会完整检查
+    cache = {
+        "root_updated": 0 if errors else collected[ROOT_MANIFEST],
+        "manifests": collected,
+        "validators": validators,
+    }
+    if errors:
+        cache["errors"] = errors
+
     try:
-        print(f"Fetching root manifest from {MANIFEST_URL}...")
-        # 创建不使用代理的 opener（国内服务器直连更快）
-        no_proxy_handler = urllib.request.ProxyHandler({})
-        opener = urllib.request.build_opener(no_proxy_handler)
-        
-        root_manifest = _fetch_json(opener, MANIFEST_URL)
-
-        # 构建缓存数据（扁平结构，保存所有 manifest 的时间戳）
-        cache = {
-            "root_updated": root_manifest.get("updated", 0),
-            "manifests": {
-                "manifest.json": root_manifest.get("updated", 0)
-            }
-        }
-
-        # 递归收集所有子 manifest 的时间戳
-        print("Collecting all sub-manifests...")
-        for dir_info in root_manifest.get("directories", []):
-            dir_name = dir_info["name"]
-            
-            # 跳过忽略的目录
-            if dir_name in IGNORED_DIRS:
-                print(f"  Skipping ignored directory: {dir_name}")
-                continue
-                
-            sub_manifest = dir_info.get("manifest", "")
-            if sub_manifest:
-                _collect_all_manifests(opener, sub_manifest, cache["manifests"])
-
-        # 确保目录存在
         output_dir.mkdir(parents=True, exist_ok=True)
-
-        # 写入缓存文件
-        cache_file = output_dir / "manifest_cache.json"
         with open(cache_file, "w", encoding="utf-8") as f:
             json.dump(cache, f, indent=2, ensure_ascii=False)
-
-        print(f"\nGenerated manifest cache: {cache_file}")
-        print(f"  root_updated: {cache['root_updated']}")
-        print(f"  Total manifests cached: {len(cache['manifests'])}")
-        for path, updated in cache["manifests"].items():
-            print(f"    {path}: {updated}")
-
-        return True
-
-    except urllib.error.URLError as e:
-        print(f"Warning: Failed to fetch manifest (URL error): {e}")
-        print("Skipping manifest cache generation.")
-        return False
-    except Exception as e:
-        print(f"Warning: Failed to generate manifest cache: {e}")
+    except OSError as e:
+        print(f"Warning: Failed to write manifest cache: {e}")
         return False
 
+    print(f"\nGenerated manifest cache: {cache_file}")
+    print(f"  root_updated: {cache['root_updated']}")
+    print(f"  Total manifests cached: {len(collected)}")
+    for path, updated in collected.items():
+        print(f"    {path}: {updated}")
+    if errors:
+        print(f"  Failed manifests: {len(errors)}")
+        for path, error in errors.items():
+            print(f"    {path}: {error}")
+
+    return True
+
 
 if __name__ == "__main__":
     import sys
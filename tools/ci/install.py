@@ -3,13 +3,17 @@ from pathlib import Path
 import shutil
 import sys
 import json
-import re
 import os
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(script_dir)
 
 from configure import configure_ocr_model
+
+# 复用 agent/utils/jsonc.py 的 JSONC 解析（字符串中的 ' 和 # 不会被误改）
+sys.path.insert(0, os.path.join(script_dir, "..", "..", "agent"))
+from utils import jsonc
+
 # from generate_manifest_cache import generate_manifest_cache
 
 working_dir = Path(__file__).parent.parent.parent
@@ -83,36 +87,6 @@ def install_chores():
     #     ignore=shutil.ignore_patterns("*.yaml"),
     # )
 
-# 万能带注释JSON解析函数：自动清理//注释、/*多行注释、#注释 + 单引号替换双引号
-def load_json_with_comment_and_quote(file_path, encoding="utf-8"):
-    # 1. 读取JSON文件全部内容
-    with open(file_path, 'r', encoding=encoding) as f:
-        content = f.read()
-    # 2. 保护常见 URL 模式，避免将 URL 中的 // 误判为注释起始
-    mask = "::COLON_SLASH::"
-    content = content.replace('://', mask)
-
-    # 3. 正则清理：删除 /*  */ 包裹的多行注释
-    content = re.sub(r"/\*[\s\S]*?\*/", "", content)
-    # 4. 正则清理：删除 // 开头的单行注释（现在不会影响 URL）
-    content = re.sub(r"//.*", "", content)
-    # 5. 正则清理：删除 # 开头的Python风格注释
-    content = re.sub(r"#.*", "", content)
-
-    # 6. 将单引号替换为双引号（注意：此替换仍然是简单替换，
-    #    若文件中大量使用单引号作为字符串边界且包含复杂转义，
-    #    更强健的解析器会更安全。）
-    content = re.sub(r"'", '"', content)
-
-    # 7. 清理多余空行和首尾空格
-    content = "\n".join([line.strip() for line in content.splitlines() if line.strip()])
-
-    # 8. 恢复被掩码的 URL
-    content = content.replace(mask, '://')
-
-    # 9. 用原生json解析处理后的纯净内容
-    return json.loads(content)
-
 def install_agent():
     shutil.copytree(
         working_dir / "agent",
@@ -120,7 +94,7 @@ def install_agent():
         dirs_exist_ok=True,
     )
 
-    interface = load_json_with_comment_and_quote(install_path / "interface.json")
+    interface = jsonc.load(install_path / "interface.json")
 
     if sys.platform.startswith("win"):
         interface["agent"]["child_exec"] = r"./python/python.exe"
@@ -3,12 +3,14 @@
 Pipeline JSON 迁移脚本 - 将旧版 is_sub/interrupt 转换为 v5.1 的 [JumpBack] 前缀格式
 
 使用方法:
-    python migrate_pipeline_v5.py <目录路径> [--dry-run] [--backup]
+    python migrate_pipeline_v5.py <目录路径> [--dry-run] [--backup] [--jobs N] [--timings]
 
 参数:
     目录路径: 包含 pipeline JSON 文件的目录
     --dry-run: 仅显示将要进行的更改，不实际修改文件
     --backup: 在修改前备份原文件（添加 .bak 后缀）
+    --jobs: 迁移阶段的并行进程数，默认为 CPU 核数
+    --timings: 列出每个文件的耗时（默认只列出最慢的 10 个）
 
 转换规则:
     1. interrupt 字段中的节点会被加上 `[JumpBack]` 前缀后合并到 next 字段
@@ -22,6 +24,8 @@ Pipeline JSON 迁移脚本 - 将旧版 is_sub/interrupt 转换为 v5.1 的 [Jump
     - 保持 JSON 字段顺序不变
     - 保持原文件的缩进风格
     - 支持跨文件节点引用
+    - 每个文件只解析一次：第一阶段解析并收集全局 is_sub 节点，第二阶段在同一份模型上迁移
+    - 文件较多时第二阶段用进程池并行迁移（--jobs），并输出每个文件的解析 / 迁移耗时
 
 示例:
     # 预览更改（不实际修改文件）
@@ -34,115 +38,20 @@ Pipeline JSON 迁移脚本 - 将旧版 is_sub/interrupt 转换为 v5.1 的 [Jump
     python migrate_pipeline_v5.py ./pipeline
 """
 
-import re
 import os
 import sys
+import time
 import shutil
 import argparse
+import multiprocessing
 from pathlib import Path
-from typing import Any
 from collections import OrderedDict
 
+# 复用 agent/utils/jsonc_cst.py 的无损语法树：一次解析同时得到数据和保留注释的文本模型
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "agent"))
+from utils import jsonc_cst
 
-def remove_jsonc_comments_for_parsing(text: str) -> str:
-    """
-    移除 JSONC 文件中的注释用于解析，但保留原文本用于重建
-    支持 // 和 /* */ 两种注释
-    """
-    result = []
-    i = 0
-    in_string = False
-    string_char = None
-
-    while i < len(text):
-        if in_string:
-            if text[i] == "\\" and i + 1 < len(text):
-                result.append(text[i : i + 2])
-                i += 2
-                continue
-            elif text[i] == string_char:
-                in_string = False
-                string_char = None
-                result.append(text[i])
-                i += 1
-                continue
-            else:
-                result.append(text[i])
-                i += 1
-                continue
-
-        if text[i] in ('"', "'"):
-            in_string = True
-            string_char = text[i]
-            result.append(text[i])
-            i += 1
-            continue
-
-        # 检查单行注释 //
-        if text[i : i + 2] == "//":
-            while i < len(text) and text[i] != "\n":
-                i += 1
-            continue
-
-        # 检查多行注释 /* */
-        if text[i : i + 2] == "/*":
-            i += 2
-            while i < len(text) and text[i : i + 2] != "*/":
-                i += 1
-            i += 2
-            continue
-
-        result.append(text[i])
-        i += 1
-
-    return "".join(result)
-
-
-def remove_trailing_commas(text: str) -> str:
-    """移除 JSON 中的尾逗号（在 ] 或 } 之前的逗号）"""
-    result = []
-    i = 0
-    in_string = False
-
-    while i < len(text):
-        if in_string:
-            if text[i] == "\\" and i + 1 < len(text):
-                result.append(text[i : i + 2])
-                i += 2
-                continue
-            elif text[i] == '"':
-                in_string = False
-            result.append(text[i])
-            i += 1
-            continue
-
-        if text[i] == '"':
-            in_string = True
-            result.append(text[i])
-            i += 1
-            continue
-
-        if text[i] == ",":
-            j = i + 1
-            while j < len(text) and text[j] in " \t\n\r":
-                j += 1
-            if j < len(text) and text[j] in "]}":
-                i += 1
-                continue
-
-        result.append(text[i])
-        i += 1
-
-    return "".join(result)
-
-
-def parse_jsonc(text: str) -> Any:
-    """解析 JSONC 文件内容，返回 OrderedDict 以保持字段顺序"""
-    import json
-
-    clean_text = remove_jsonc_comments_for_parsing(text)
-    clean_text = remove_trailing_commas(clean_text)
-    return json.loads(clean_text, object_pairs_hook=OrderedDict)
+from _parallel import run_tasks
 
 
 def detect_indent(text: str) -> str:
@@ -202,11 +111,22 @@ def rebuild_json_with_comments(
     """
     基于原始文本和迁移后的数据重建 JSON，保留注释
 
-    使用更精确的方式在原文本上进行替换操作
+    在原文本的语法树上就地修改节点，未改动的部分（注释、空白、字段顺序）原样输出
     """
-    result_text = original_text
+    doc = jsonc_cst.parse(original_text)
+    if not apply_migration(doc, original_data, migrated_data, indent):
+        return original_text
+    return doc.dumps()
+
+
+def apply_migration(
+    doc: jsonc_cst.Document, original_data: dict, migrated_data: dict, indent: str = "    "
+) -> bool:
+    """在已解析的语法树上就地应用迁移结果；根节点不是对象时返回 False"""
+    root = doc.value
+    if not isinstance(root, jsonc_cst.Object):
+        return False
 
-    # 遍历所有节点，应用修改
     for node_name, migrated_node_data in migrated_data.items():
         if not isinstance(migrated_node_data, dict):
             continue
@@ -215,238 +135,40 @@ def rebuild_json_with_comments(
         if not isinstance(original_node_data, dict):
             continue
 
-        # 首先提取该节点的文本范围
-        node_start_pattern = rf'("{re.escape(node_name)}"\s*:\s*\{{)'
-        node_matches = list(re.finditer(node_start_pattern, result_text))
-
-        if not node_matches:
+        member = root.member(node_name)
+        if member is None or not isinstance(member.value, jsonc_cst.Object):
             continue
+        node = member.value
 
-        # 找到节点范围（从节点开始到节点结束}）
-        for match in node_matches:
-            node_start_pos = match.start()
-
-            # 找到对应的结束括号
-            brace_count = 0
-            i = match.end()
-            node_end_pos = -1
-            in_string = False
-            escape_next = False
-
-            while i < len(result_text):
-                char = result_text[i]
-
-                if escape_next:
-                    escape_next = False
-                    i += 1
-                    continue
-
-                if char == "\\":
-                    escape_next = True
-                    i += 1
-                    continue
-
-                if char == '"' and not in_string:
-                    in_string = True
-                elif char == '"' and in_string:
-                    in_string = False
-                elif not in_string:
-                    if char == "{":
-                        brace_count += 1
-                    elif char == "}":
-                        if brace_count == 0:
-                            node_end_pos = i + 1
-                            break
-                        brace_count -= 1
-
-                i += 1
-
-            if node_end_pos == -1:
-                continue
-
-            # 提取节点文本
-            node_text = result_text[node_start_pos:node_end_pos]
-            modified_node_text = node_text
-
-            # 1. 删除 is_sub 字段（删除整行，包括前导空白和换行符）
-            if "is_sub" in original_node_data and "is_sub" not in migrated_node_data:
-                # 情况1: 有尾逗号（不是最后一个字段）
-                modified_node_text = re.sub(
-                    r'[ \t]*"is_sub"\s*:\s*[^,\n]+,\s*(?://[^\n]*)?\r?\n',
-                    "",
-                    modified_node_text,
-                )
-                # 情况2: 没有尾逗号（是最后一个字段），需要同时删除前一行的逗号
-                modified_node_text = re.sub(
-                    r',(\s*(?://[^\n]*)?\r?\n)[ \t]*"is_sub"\s*:\s*[^,\n]+\s*(?://[^\n]*)?\r?\n',
-                    r"\1",
-                    modified_node_text,
-                )
+        # 1. 删除 is_sub / interrupt 字段（连同行尾注释），写在字段之前的整行注释保留
+        for field in ("is_sub", "interrupt"):
+            if field in original_node_data and field not in migrated_node_data:
+                node.remove(field, keep_comments=True)
 
-            # 2. 删除 interrupt 字段（删除整行，包括前导空白和换行符）
-            if (
-                "interrupt" in original_node_data
-                and "interrupt" not in migrated_node_data
-            ):
-                # 数组格式 interrupt: [...] （支持多行数组）
-                # 情况1: 有尾逗号（不是最后一个字段）
-                modified_node_text = re.sub(
-                    r'[ \t]*"interrupt"\s*:\s*\[[\s\S]*?\],\s*(?://[^\n]*)?\r?\n',
-                    "",
-                    modified_node_text,
-                )
-                # 情况2: 没有尾逗号（是最后一个字段），需要同时删除前一行的逗号
-                modified_node_text = re.sub(
-                    r',(\s*(?://[^\n]*)?\r?\n)[ \t]*"interrupt"\s*:\s*\[[\s\S]*?\]\s*(?://[^\n]*)?\r?\n',
-                    r"\1",
-                    modified_node_text,
-                )
+        # 2. 更新 next / on_error 字段，保留字段前后的注释和逗号
+        for field in ("next", "on_error"):
+            if field not in migrated_node_data:
+                continue
+            new_value = migrated_node_data[field]
+            if original_node_data.get(field) == new_value:
+                continue
 
-                # 字符串格式 interrupt: "..."
-                # 情况1: 有尾逗号（不是最后一个字段）
-                modified_node_text = re.sub(
-                    r'[ \t]*"interrupt"\s*:\s*"[^"]*",\s*(?://[^\n]*)?\r?\n',
-                    "",
-                    modified_node_text,
-                )
-                # 情况2: 没有尾逗号（是最后一个字段），需要同时删除前一行的逗号
-                modified_node_text = re.sub(
-                    r',(\s*(?://[^\n]*)?\r?\n)[ \t]*"interrupt"\s*:\s*"[^"]*"\s*(?://[^\n]*)?\r?\n',
-                    r"\1",
-                    modified_node_text,
+            field_member = node.member(field)
+            if field_member is not None:
+                field_indent = jsonc_cst.indent_of(field_member.before)
+                field_member.value = jsonc_cst.parse_value(
+                    format_array_value(new_value, indent, field_indent)
                 )
-
-            # 3. 更新 next 字段
-            if "next" in migrated_node_data:
-                orig_next = original_node_data.get("next")
-                new_next = migrated_node_data["next"]
-
-                if orig_next != new_next:
-                    if "next" in original_node_data:
-                        # 替换现有的 next 字段
-                        # 先找到字段所在行，获取缩进（支持字符串和数组两种格式）
-                        # 尝试匹配数组格式：`"next": [...]`
-                        next_line_match = re.search(
-                            r'([ \t]*)"next"\s*:\s*\[[^\]]*\](,?)(\s*//[^\n]*)?',
-                            modified_node_text,
-                        )
-
-                        # 如果没匹配到数组格式，尝试匹配字符串格式：`"next": "..."`
-                        if not next_line_match:
-                            next_line_match = re.search(
-                                r'([ \t]*)"next"\s*:\s*"[^"]*"(,?)(\s*//[^\n]*)?',
-                                modified_node_text,
-                            )
-
-                        if next_line_match:
-                            field_indent = next_line_match.group(1)
-                            trailing_comma = next_line_match.group(2)
-                            inline_comment = next_line_match.group(3) or ""
-
-                            # 生成格式化的数组值
-                            new_next_str = format_array_value(
-                                new_next, indent, field_indent
-                            )
-
-                            # 构建新的字段文本
-                            if "\n" in new_next_str:
-                                # 多行格式
-                                new_field = f'{field_indent}"next": {new_next_str}{trailing_comma}{inline_comment}'
-                            else:
-                                # 单行格式
-                                new_field = f'{field_indent}"next": {new_next_str}{trailing_comma}{inline_comment}'
-
-                            # 替换
-                            modified_node_text = (
-                                modified_node_text[: next_line_match.start()]
-                                + new_field
-                                + modified_node_text[next_line_match.end() :]
-                            )
-                    else:
-                        # 添加新的 next 字段
-                        header_match = re.search(
-                            rf'("{re.escape(node_name)}"\s*:\s*\{{\s*(?://[^\n]*)?\n)(\s+)',
-                            modified_node_text,
-                        )
-                        if header_match:
-                            insert_pos = header_match.end() - len(header_match.group(2))
-                            field_indent = header_match.group(2)
-
-                            # 生成格式化的数组值
-                            new_next_str = format_array_value(
-                                new_next, indent, field_indent
-                            )
-
-                            # 构建新字段
-                            if "\n" in new_next_str:
-                                new_field = f'{field_indent}"next": {new_next_str},\n'
-                            else:
-                                new_field = f'{field_indent}"next": {new_next_str},\n'
-
-                            modified_node_text = (
-                                modified_node_text[:insert_pos]
-                                + new_field
-                                + modified_node_text[insert_pos:]
-                            )
-
-            # 4. 更新 on_error 字段
-            if "on_error" in migrated_node_data:
-                orig_on_error = original_node_data.get("on_error")
-                new_on_error = migrated_node_data["on_error"]
-
-                if orig_on_error != new_on_error:
-                    # 查找 on_error 字段（支持字符串和数组两种格式）
-                    # 尝试匹配数组格式
-                    on_error_match = re.search(
-                        r'([ \t]*)"on_error"\s*:\s*\[[^\]]*\](,?)(\s*//[^\n]*)?',
-                        modified_node_text,
-                    )
-
-                    # 如果没匹配到数组格式，尝试匹配字符串格式
-                    if not on_error_match:
-                        on_error_match = re.search(
-                            r'([ \t]*)"on_error"\s*:\s*"[^"]*"(,?)(\s*//[^\n]*)?',
-                            modified_node_text,
-                        )
-
-                    if on_error_match:
-                        field_indent = on_error_match.group(1)
-                        trailing_comma = on_error_match.group(2)
-                        inline_comment = on_error_match.group(3) or ""
-
-                        # 生成格式化的数组值
-                        new_on_error_str = format_array_value(
-                            new_on_error, indent, field_indent
-                        )
-
-                        # 构建新的字段文本
-                        if "\n" in new_on_error_str:
-                            new_field = f'{field_indent}"on_error": {new_on_error_str}{trailing_comma}{inline_comment}'
-                        else:
-                            new_field = f'{field_indent}"on_error": {new_on_error_str}{trailing_comma}{inline_comment}'
-
-                        # 替换
-                        modified_node_text = (
-                            modified_node_text[: on_error_match.start()]
-                            + new_field
-                            + modified_node_text[on_error_match.end() :]
-                        )
-
-            # 替换文本中的节点
-            if modified_node_text != node_text:
-                # 清理多余的连续空行（最多保留一个）
-                cleaned_text = re.sub(r"\n{3,}", "\n\n", modified_node_text)
-
-                result_text = (
-                    result_text[:node_start_pos]
-                    + cleaned_text
-                    + result_text[node_end_pos:]
+            elif field == "next":
+                # 添加新的 next 字段，放在节点的第一个位置
+                field_indent = node.child_indent()
+                node.set(
+                    field,
+                    format_array_value(new_value, indent, field_indent),
+                    index=0,
                 )
 
-            # 只处理第一个匹配
-            break
-
-    return result_text
+    return True
 
 
 def ensure_list(value: str | list | None) -> list:
@@ -602,38 +324,66 @@ def migrate_node(node_data: dict, is_sub_nodes: set) -> tuple[dict, list]:
     return result, changes
 
 
-def migrate_pipeline_file(
-    file_path: Path,
-    global_is_sub_nodes: set,
-    dry_run: bool = False,
-    backup: bool = False,
-) -> tuple[bool, list]:
+class PipelineFile:
+    """
+    一次解析得到的文件模型：原文、无损语法树和数据，第一阶段生成后两个阶段共用
     """
-    迁移单个 pipeline JSON 文件
 
-    Args:
-        file_path: 文件路径
-        global_is_sub_nodes: 全局的 is_sub 节点集合（跨所有文件收集）
-        dry_run: 是否为试运行模式
-        backup: 是否备份原文件
+    __slots__ = ("path", "text", "doc", "data", "indent", "error", "parse_ms")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.text = None
+        self.doc = None
+        self.data = None
+        self.indent = "    "
+        self.error = None
+        self.parse_ms = 0.0
 
-    返回: (是否有更改, 更改日志列表)
-    """
-    all_changes = []
 
+def load_pipeline_file(file_path: Path) -> PipelineFile:
+    """读取并解析文件（整个迁移过程中每个文件只解析这一次）"""
+    pf = PipelineFile(file_path)
+    start = time.perf_counter()
     try:
         with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-            # 检测原文件的缩进风格
-            original_indent = detect_indent(content)
-            # 使用 JSONC 解析器
-            data = parse_jsonc(content)
+            pf.text = f.read()
+        # 检测原文件的缩进风格
+        pf.indent = detect_indent(pf.text)
+        pf.doc = jsonc_cst.parse(pf.text, cache=True)
+        pf.data = pf.doc.to_python(OrderedDict)
     except Exception as e:
-        return False, [f"文件解析错误: {e}"]
+        pf.error = f"文件解析错误: {e}"
+    pf.parse_ms = (time.perf_counter() - start) * 1000
+    return pf
+
+
+def migrate_loaded_file(
+    pf: PipelineFile,
+    global_is_sub_nodes: set,
+    dry_run: bool = False,
+    backup: bool = False,
+) -> tuple[bool, list, float]:
+    """
+    迁移已解析的文件
+
+    返回: (是否有更改, 更改日志列表, 迁移耗时毫秒)
+    """
+    start = time.perf_counter()
+    has_changes, all_changes = _migrate_loaded(pf, global_is_sub_nodes, dry_run, backup)
+    return has_changes, all_changes, (time.perf_counter() - start) * 1000
 
+
+def _migrate_loaded(pf: PipelineFile, global_is_sub_nodes: set, dry_run: bool, backup: bool) -> tuple[bool, list]:
+    if pf.error:
+        return False, [pf.error]
+
+    data = pf.data
     if not isinstance(data, dict):
         return False, ["文件内容不是 JSON 对象"]
 
+    all_changes = []
+
     # 检查本文件中定义的 is_sub 节点
     local_is_sub_nodes = collect_is_sub_nodes(data)
     if local_is_sub_nodes:
@@ -656,17 +406,17 @@ def migrate_pipeline_file(
         return False, []
 
     if not dry_run:
+        file_path = pf.path
         # 备份原文件
         if backup:
             backup_path = file_path.with_suffix(file_path.suffix + ".bak")
             shutil.copy2(file_path, backup_path)
             all_changes.append(f"已备份到: {backup_path}")
 
-        # 使用保留注释的方式写入迁移后的数据
+        # 在第一阶段得到的语法树上修改，保留注释
+        apply_migration(pf.doc, data, migrated_data, pf.indent)
+        result_text = pf.doc.dumps()
         with open(file_path, "w", encoding="utf-8", newline="\n") as f:
-            result_text = rebuild_json_with_comments(
-                content, data, migrated_data, original_indent
-            )
             f.write(result_text)
             if not result_text.endswith("\n"):
                 f.write("\n")
@@ -675,6 +425,26 @@ def migrate_pipeline_file(
     return True, all_changes
 
 
+def migrate_pipeline_file(
+    file_path: Path,
+    global_is_sub_nodes: set,
+    dry_run: bool = False,
+    backup: bool = False,
+) -> tuple[bool, list]:
+    """
+    迁移单个 pipeline JSON 文件
+
+    Args:
+        file_path: 文件路径
+        global_is_sub_nodes: 全局的 is_sub 节点集合（跨所有文件收集）
+        dry_run: 是否为试运行模式
+        backup: 是否备份原文件
+
+    返回: (是否有更改, 更改日志列表)
+    """
+    return _migrate_loaded(load_pipeline_file(file_path), global_is_sub_nodes, dry_run, backup)
+
+
 def find_pipeline_files(directory: Path) -> list:
     """递归查找目录下所有 JSON 文件（排除以 . 开头的目录和文件）"""
     json_files = []
@@ -693,34 +463,59 @@ def find_pipeline_files(directory: Path) -> list:
     return json_files
 
 
-def collect_all_is_sub_nodes(json_files: list) -> set:
+def collect_all_is_sub_nodes(models: list) -> set:
     """
-    扫描所有 JSON 文件，收集全局的 is_sub 节点集合
+    从第一阶段解析好的文件中收集全局的 is_sub 节点集合
 
     Args:
-        json_files: JSON 文件路径列表
+        models: PipelineFile 列表
 
     Returns:
         所有 is_sub: true 的节点名称集合
     """
     global_is_sub_nodes = set()
 
-    for json_file in json_files:
-        try:
-            with open(json_file, "r", encoding="utf-8") as f:
-                content = f.read()
-                data = parse_jsonc(content)
-
-            if isinstance(data, dict):
-                is_sub_nodes = collect_is_sub_nodes(data)
-                global_is_sub_nodes.update(is_sub_nodes)
-        except Exception as e:
-            print(f"警告: 扫描文件 {json_file} 时出错: {e}")
+    for pf in models:
+        if pf.error:
+            print(f"警告: 扫描文件 {pf.path} 时出错: {pf.error}")
             continue
+        if isinstance(pf.data, dict):
+            global_is_sub_nodes.update(collect_is_sub_nodes(pf.data))
 
     return global_is_sub_nodes
 
 
+# ============================================================
+# 第二阶段进程池
+# POSIX 下用 fork 启动 worker，直接继承第一阶段的 _MODELS，只传下标；
+# 不支持 fork 的平台把模型序列化后发给 worker
+# ============================================================
+_MODELS: list = []
+
+
+def _migrate_task(task) -> tuple[bool, list, float]:
+    model, global_is_sub_nodes, dry_run, backup = task
+    if isinstance(model, int):
+        model = _MODELS[model]
+    return migrate_loaded_file(model, global_is_sub_nodes, dry_run, backup)
+
+
+def migrate_all(models: list, global_is_sub_nodes: set, dry_run: bool, backup: bool, jobs: int) -> list:
+    """迁移所有文件，返回与 models 对应的 [(是否有更改, 更改日志, 迁移耗时毫秒)]"""
+    _MODELS[:] = models
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+        tasks = [(i, global_is_sub_nodes, dry_run, backup) for i in range(len(models))]
+    else:
+        context = None
+        tasks = [(pf, global_is_sub_nodes, dry_run, backup) for pf in models]
+
+    try:
+        return run_tasks(_migrate_task, tasks, jobs, mp_context=context)
+    finally:
+        _MODELS.clear()
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="将旧版 pipeline JSON 的 is_sub/interrupt 转换为 v5.1 的 [JumpBack] 前缀格式"
@@ -730,6 +525,12 @@ def main():
         "--dry-run", action="store_true", help="仅显示将要进行的更改，不实际修改文件"
     )
     parser.add_argument("--backup", action="store_true", help="在修改前备份原文件")
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=os.cpu_count() or 1, help="迁移阶段的并行进程数（默认: CPU 核数）"
+    )
+    parser.add_argument(
+        "--timings", action="store_true", help="列出每个文件的解析 / 迁移耗时（默认只列出最慢的 10 个）"
+    )
 
     args = parser.parse_args()
 
@@ -750,9 +551,12 @@ def main():
 
     print(f"找到 {len(json_files)} 个 JSON 文件")
 
-    # 第一遍：收集全局的 is_sub 节点
-    print("正在扫描所有文件，收集 is_sub 节点...")
-    global_is_sub_nodes = collect_all_is_sub_nodes(json_files)
+    # 第一阶段：每个文件解析一次，收集全局的 is_sub 节点
+    print("正在解析所有文件，收集 is_sub 节点...")
+    phase_start = time.perf_counter()
+    models = [load_pipeline_file(f) for f in json_files]
+    global_is_sub_nodes = collect_all_is_sub_nodes(models)
+    parse_elapsed = (time.perf_counter() - phase_start) * 1000
 
     if global_is_sub_nodes:
         print(
@@ -764,30 +568,38 @@ def main():
     if args.dry_run:
         print("【DRY RUN 模式 - 不会实际修改文件】\n")
 
-    modified_count = 0
+    # 第二阶段：使用全局 is_sub 节点集合迁移所有文件
+    phase_start = time.perf_counter()
+    results = migrate_all(models, global_is_sub_nodes, args.dry_run, args.backup, args.jobs)
+    migrate_elapsed = (time.perf_counter() - phase_start) * 1000
 
-    # 第二遍：使用全局 is_sub 节点集合迁移所有文件
-    for json_file in json_files:
+    modified_count = 0
+    timings = []
+    for pf, (has_changes, changes, migrate_ms) in zip(models, results):
         relative_path = (
-            json_file.relative_to(directory)
-            if json_file.is_relative_to(directory)
-            else json_file
+            pf.path.relative_to(directory)
+            if pf.path.is_relative_to(directory)
+            else pf.path
         )
+        timings.append((relative_path, pf.parse_ms, migrate_ms))
 
-        has_changes, changes = migrate_pipeline_file(
-            json_file, global_is_sub_nodes, args.dry_run, args.backup
-        )
-
-        if has_changes:
-            modified_count += 1
+        if has_changes or pf.error:
+            modified_count += has_changes
             print(f"\n{'=' * 60}")
-            print(f"文件: {relative_path}")
+            print(f"文件: {relative_path}  (解析 {pf.parse_ms:.1f} ms, 迁移 {migrate_ms:.1f} ms)")
             print("-" * 60)
             for change in changes:
                 print(change)
 
     print(f"\n{'=' * 60}")
     print(f"总计: {modified_count}/{len(json_files)} 个文件需要迁移")
+    print(f"耗时: 解析 {parse_elapsed:.0f} ms, 迁移 {migrate_elapsed:.0f} ms")
+
+    timings.sort(key=lambda t: t[1] + t[2], reverse=True)
+    shown = timings if args.timings else timings[:10]
+    print(f"\n{'文件':<48}{'解析 ms':>10}{'迁移 ms':>10}")
+    for relative_path, parse_ms, migrate_ms in shown:
+        print(f"{str(relative_path):<48}{parse_ms:>10.1f}{migrate_ms:>10.1f}")
 
     if args.dry_run and modified_count > 0:
         print("\n提示: 使用不带 --dry-run 参数运行以实际执行迁移")
@@ -1,17 +1,172 @@
-import json
+#!/usr/bin/env python3
+"""
+JSON 压缩（去掉缩进、空白和注释）
+
+- 输入可以是文件、目录（递归查找 .json / .jsonc）或通配符（如 "assets/**/*.json"）
+- 使用 agent/utils/jsonc.py 解析，带注释 / 尾逗号的文件同样可以压缩
+- 默认原地压缩；--out-dir 时按输入目录的相对结构写到输出目录
+- 输出已是最新的文件会跳过；写出的文件保留源文件的修改时间
+- 文件较多时用进程池并行，最后输出总共节省的字节数
+
+使用方法:
+    python minify_json.py <输入 ...> [--out-dir 目录] [--jobs N] [--force]
+    python minify_json.py <input_file> [output_file]          # 旧用法：单个文件
+
+示例:
+    python tools/minify_json.py install/resource/pipeline
+    python tools/minify_json.py "assets/resource/**/*.json" --out-dir install/resource
+"""
+
+import os
 import sys
+import glob
+import json
+import argparse
+from pathlib import Path
+
+# 复用 agent/utils/jsonc.py 的 JSONC 解析
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "agent"))
+from utils import jsonc
+
+from _parallel import run_tasks
+
+SCAN_EXTENSIONS = {".json", ".jsonc"}
+
+
+def minify_text(text: str) -> str:
+    return json.dumps(jsonc.loads(text, cache=True), ensure_ascii=False, separators=(",", ":"))
+
+
+def minify_file(task) -> tuple:
+    """
+    task 为 (输入路径, 输出路径, 是否强制)。
+    返回 (输入路径, 原大小, 压缩后大小, 状态, 错误信息)，状态为 written / unchanged / skipped / failed。
+    """
+    src, dst, force = task
+    try:
+        st = os.stat(src)
+        # 输出在另一个文件时，修改时间与源文件一致即视为已是最新（写出时会同步修改时间）
+        if not force and dst != src:
+            try:
+                out = os.stat(dst)
+                if out.st_mtime_ns == st.st_mtime_ns and out.st_size > 0:
+                    return src, st.st_size, out.st_size, "skipped", None
+            except FileNotFoundError:
+                pass
+
+        with open(src, "rb") as f:
+            raw = f.read()
+        result = minify_text(raw.decode("utf-8")).encode("utf-8")
+
+        if dst == src and result == raw:
+            return src, len(raw), len(result), "unchanged", None
+
+        os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+        with open(dst, "wb") as f:
+            f.write(result)
+        os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+        return src, len(raw), len(result), "written", None
+    except Exception as e:
+        return src, 0, 0, "failed", str(e)
+
+
+def expand_inputs(inputs: list) -> list:
+    """展开输入，返回 [(文件路径, 相对路径基准目录)]"""
+    files = []
+    for item in inputs:
+        if glob.has_magic(item):
+            # 第一个通配符之前的目录作为相对路径基准
+            prefix = item.split("*", 1)[0].split("?", 1)[0].split("[", 1)[0]
+            base = Path(prefix) if prefix.endswith(("/", os.sep)) else Path(prefix).parent
+            for match in sorted(glob.glob(item, recursive=True)):
+                if Path(match).is_file():
+                    files.append((Path(match), base))
+            continue
+
+        path = Path(item)
+        if path.is_dir():
+            files.extend(
+                (p, path)
+                for p in sorted(path.rglob("*"))
+                if p.is_file() and p.suffix.lower() in SCAN_EXTENSIONS
+            )
+        elif path.is_file():
+            files.append((path, path.parent))
+        else:
+            print(f"⚠️  未找到: {item}")
+    return files
+
+
+def legacy_main(input_file: str, output_file: str) -> None:
+    """旧用法：python minify_json.py <input_file> [output_file]"""
+    src, _, _, status, error = minify_file((input_file, output_file, True))
+    if status == "failed":
+        print(f"压缩失败: {src}: {error}")
+        sys.exit(1)
+    print(f"Minified JSON written to {output_file}")
+
+
+def main():
+    argv = sys.argv[1:]
+    # 兼容旧用法：恰好两个位置参数且第一个是文件、第二个不是目录时，视为 <输入> <输出>
+    if not any(a.startswith("-") for a in argv):
+        if len(argv) == 1 and Path(argv[0]).is_file():
+            return legacy_main(argv[0], argv[0])
+        if len(argv) == 2 and Path(argv[0]).is_file() and not glob.has_magic(argv[1]) and not Path(argv[1]).is_dir():
+            return legacy_main(argv[0], argv[1])
+
+    parser = argparse.ArgumentParser(description="批量压缩 JSON / JSONC 文件")
+    parser.add_argument("inputs", nargs="+", help="文件、目录或通配符")
+    parser.add_argument("--out-dir", help="输出目录（默认原地压缩）")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="并行进程数（默认: CPU 核数）")
+    parser.add_argument("--force", action="store_true", help="忽略修改时间，全部重新压缩")
+    parser.add_argument("--quiet", "-q", action="store_true", help="只输出汇总")
+    args = parser.parse_args(argv)
+
+    files = expand_inputs(args.inputs)
+    if not files:
+        print("未找到 JSON 文件")
+        sys.exit(1)
+
+    tasks = []
+    for path, base in files:
+        if args.out_dir:
+            try:
+                rel = path.relative_to(base)
+            except ValueError:
+                rel = Path(path.name)
+            dst = str(Path(args.out_dir) / rel)
+        else:
+            dst = str(path)
+        tasks.append((str(path), dst, args.force))
 
-if len(sys.argv) < 2:
-    print("Usage: python minify_json.py <input_file> [output_file]")
-    sys.exit(1)
+    results = run_tasks(minify_file, tasks, args.jobs)
 
-input_file = sys.argv[1]
-output_file = sys.argv[2] if len(sys.argv) > 2 else input_file
+    counts = {"written": 0, "unchanged": 0, "skipped": 0, "failed": 0}
+    before = after = 0
+    for src, size, new_size, status, error in results:
+        counts[status] += 1
+        if status == "failed":
+            print(f"  ❌ {src}: {error}")
+            continue
+        if status != "written":
+            continue
+        # 只统计本次实际写出的文件，跳过和无变化的文件不算作节省
+        before += size
+        after += new_size
+        if not args.quiet:
+            print(f"  ✅ {src}: {size} -> {new_size} 字节")
 
-with open(input_file, 'r', encoding='utf-8') as f:
-    data = json.load(f)
+    saved = before - after
+    ratio = saved / before * 100 if before else 0.0
+    print(
+        f"\n完成：{counts['written']} 个已压缩，{counts['unchanged']} 个无变化，"
+        f"{counts['skipped']} 个已是最新，{counts['failed']} 个失败"
+    )
+    print(f"本次写出 {before} -> {after} 字节，节省 {saved} 字节（{ratio:.1f}%）")
+    if counts["failed"]:
+        sys.exit(1)
 
-with open(output_file, 'w', encoding='utf-8') as f:
-    json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
 
-print(f"Minified JSON written to {output_file}")
+if __name__ == "__main__":
+    main()
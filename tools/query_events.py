@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+结构化事件日志查询
+
+读取 agent 写入的 debug/events/events-*.jsonl，按条件筛选后
+按动作 / 节点 / 任务等字段分组统计耗时分位数，或直接输出匹配的事件。
+
+使用方法:
+    python query_events.py [目录或文件 ...] [--event E] [--action A] [--node N] [--task ID]
+                           [--since 时间] [--until 时间] [--by 字段] [--raw] [--limit N]
+
+示例:
+    python tools/query_events.py                                  # 按动作统计全部 action 事件
+    python tools/query_events.py --by node --since 2026-10-01     # 按节点统计
+    python tools/query_events.py --action TraverseAndClick --raw --limit 20
+    python tools/query_events.py --event swipe --by node
+"""
+
+import json
+import math
+import sys
+import argparse
+from pathlib import Path
+
+PERCENTILES = (50, 90, 99)
+DEFAULT_DIR = Path("debug") / "events"
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """最近秩法分位数，sorted_values 需已升序排列"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def collect_files(targets: list) -> list:
+    files = []
+    for target in targets:
+        target = Path(target)
+        if target.is_dir():
+            files.extend(sorted(target.glob("events-*.jsonl")))
+        elif target.is_file():
+            files.append(target)
+    return files
+
+
+def iter_events(files: list):
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def matches(event: dict, args) -> bool:
+    if args.event and event.get("event") != args.event:
+        return False
+    if args.action and event.get("action") != args.action:
+        return False
+    if args.node and event.get("node") != args.node:
+        return False
+    if args.task is not None and event.get("task_id") != args.task:
+        return False
+    # time 为 ISO 格式，可以直接按字符串比较
+    if args.since and event.get("time", "") < args.since:
+        return False
+    if args.until and event.get("time", "") >= args.until:
+        return False
+    return True
+
+
+def summarize(events: list, key: str) -> list:
+    """返回 [(分组值, 次数, 失败次数, 总耗时, {p: 毫秒}, 最大值)]，按总耗时降序"""
+    groups = {}
+    for event in events:
+        group = groups.setdefault(str(event.get(key)), {"count": 0, "durations": [], "failed": 0})
+        group["count"] += 1
+        if "duration_ms" in event:
+            group["durations"].append(event["duration_ms"])
+        if event.get("success") is False or event.get("ok") is False:
+            group["failed"] += 1
+
+    rows = []
+    for name, group in groups.items():
+        values = sorted(group["durations"])
+        rows.append((
+            name,
+            group["count"],
+            group["failed"],
+            sum(values),
+            {p: percentile(values, p) for p in PERCENTILES},
+            values[-1] if values else 0.0,
+        ))
+    rows.sort(key=lambda r: r[3], reverse=True)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="筛选并统计 agent 结构化事件日志")
+    parser.add_argument("targets", nargs="*", default=[DEFAULT_DIR], help="事件目录或文件 (默认: debug/events)")
+    parser.add_argument("--event", default="action", help="事件类型 (默认: action，传空串表示全部)")
+    parser.add_argument("--action", help="只看指定动作")
+    parser.add_argument("--node", help="只看指定节点")
+    parser.add_argument("--task", type=int, help="只看指定 task_id")
+    parser.add_argument("--since", help="起始时间（含），如 2026-10-01 或 2026-10-01T08:00")
+    parser.add_argument("--until", help="结束时间（不含）")
+    parser.add_argument("--by", default="action", help="分组字段 (默认: action，可用 node / task_id / entry 等)")
+    parser.add_argument("--raw", action="store_true", help="直接输出匹配的事件（JSON 行）")
+    parser.add_argument("--limit", type=int, default=0, help="--raw 时最多输出的条数，0 表示全部")
+    args = parser.parse_args()
+
+    files = collect_files(args.targets)
+    if not files:
+        print("未找到事件日志")
+        sys.exit(1)
+
+    selected = (e for e in iter_events(files) if matches(e, args))
+
+    if args.raw:
+        for count, event in enumerate(selected, 1):
+            print(json.dumps(event, ensure_ascii=False))
+            if args.limit and count >= args.limit:
+                break
+        return
+
+    events = list(selected)
+    if not events:
+        print("没有匹配的事件")
+        return
+
+    print(f"{len(files)} 个文件，匹配 {len(events)} 条事件，按 {args.by} 分组，单位 ms\n")
+    header = (
+        f"{args.by:<32}{'次数':>6}{'失败':>6}{'总耗时':>12}"
+        + "".join(f"{'p' + str(p):>10}" for p in PERCENTILES)
+        + f"{'max':>10}"
+    )
+    print(header)
+    print("-" * (56 + 10 * (len(PERCENTILES) + 1)))
+    for name, count, failed, total, values, peak in summarize(events, args.by):
+        print(
+            f"{name:<32}{count:>6}{failed:>6}{total:>12.1f}"
+            + "".join(f"{values[p]:>10.1f}" for p in PERCENTILES)
+            + f"{peak:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
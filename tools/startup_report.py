@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Agent 启动耗时汇总
+
+读取 agent 每次启动写入的 debug/startup_timing.jsonl，
+统计最近 N 次启动中各阶段及总耗时的分位数。
+
+使用方法:
+    python startup_report.py [日志文件] [--last N]
+
+示例:
+    python tools/startup_report.py                           # 默认读取 ./debug/startup_timing.jsonl
+    python tools/startup_report.py install/debug/startup_timing.jsonl --last 200
+"""
+
+import json
+import math
+import sys
+import argparse
+from pathlib import Path
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """最近秩法分位数，sorted_values 需已升序排列"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def load_records(path: Path, last: int) -> list:
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records[-last:] if last > 0 else records
+
+
+def summarize(records: list) -> list:
+    """返回 [(阶段名, 样本数, {p: 毫秒}), ...]，阶段按首次出现顺序，总耗时在最后"""
+    samples = {}
+    for record in records:
+        for phase, ms in record.get("phases", {}).items():
+            samples.setdefault(phase, []).append(ms)
+        samples.setdefault("total", []).append(record.get("total_ms", 0.0))
+
+    total = samples.pop("total", [])
+    rows = []
+    for phase, values in list(samples.items()) + [("total", total)]:
+        values.sort()
+        rows.append((phase, len(values), {p: percentile(values, p) for p in PERCENTILES}))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="汇总 agent 启动各阶段耗时分位数")
+    parser.add_argument(
+        "log_file",
+        nargs="?",
+        default="debug/startup_timing.jsonl",
+        help="启动计时日志 (默认: debug/startup_timing.jsonl)",
+    )
+    parser.add_argument("--last", type=int, default=100, help="统计最近 N 次启动，0 表示全部 (默认: 100)")
+    args = parser.parse_args()
+
+    log_file = Path(args.log_file)
+    if not log_file.exists():
+        print(f"错误: 文件不存在: {log_file}")
+        sys.exit(1)
+
+    records = load_records(log_file, args.last)
+    if not records:
+        print("没有可统计的启动记录")
+        sys.exit(0)
+
+    relaunched = sum(1 for r in records if r.get("relaunched"))
+    print(f"统计 {len(records)} 次启动（其中 {relaunched} 次经过虚拟环境重启），单位 ms\n")
+
+    header = f"{'阶段':<28}{'样本':>6}" + "".join(f"{'p' + str(p):>10}" for p in PERCENTILES)
+    print(header)
+    print("-" * (34 + 10 * len(PERCENTILES)))
+    for phase, count, values in summarize(records):
+        print(f"{phase:<28}{count:>6}" + "".join(f"{values[p]:>10.1f}" for p in PERCENTILES))
+
+
+if __name__ == "__main__":
+    main()